@@ -1,84 +1,298 @@
 
 import streamlit as st
+import io
+import logging
 import sys
 import os
+import threading
+import uuid
 from datetime import datetime
-from core.canonical import canonical_all, suggest_dynamic_assessments, suggest_subassessments_for
-from core.story import StrategyStory
-from core.export import export_json, export_docx_bytes
-
-# Load environment variables from config.env file if it exists (for local development)
-def load_env_file():
-    possible_paths = [
-        os.path.join(os.path.dirname(__file__), 'config.env'),
-        os.path.join(os.path.dirname(__file__), '.env'),
-        os.path.join(os.getcwd(), 'config.env'),
-        os.path.join(os.getcwd(), '.env')
-    ]
-    
-    for env_path in possible_paths:
-        if os.path.exists(env_path):
-            try:
-                with open(env_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            os.environ[key.strip()] = value.strip()
-                return
-            except Exception as e:
-                print(f"Error loading {env_path}: {e}")
+from core.canonical import CATALOG, canonical_all, suggest_dynamic_assessments, suggest_subassessments_for
+from core.export import export_json, export_docx_bytes, story_fingerprint
+from core.catalog import CANONICAL_CATEGORIES
+from core.prefetch import PREFETCH_ENABLED, Prefetcher, recommended_labels, step2_envelope, step3_envelope
+from core.session import SnapshotWriter, WorkbenchSession, restore
+from core.store import ProjectStore
+
+# Add mentat-protocol to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'mentat-protocol'))
+from mentat_protocol.env import load_env
 
-# Load config file for local development
-load_env_file()
+# Load config file for local development (once per process, before any protocol settings are read)
+load_env([os.path.dirname(__file__)])
 
 # For Streamlit Cloud deployment, use secrets
 if 'OPENAI_API_KEY' not in os.environ and hasattr(st, 'secrets'):
     if 'OPENAI_API_KEY' in st.secrets:
         os.environ['OPENAI_API_KEY'] = st.secrets['OPENAI_API_KEY']
 
-# Add mentat-protocol to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'mentat-protocol'))
-from mentat_protocol import run_step, ENVELOPES
+from mentat_protocol import run_step, warm_up, ENVELOPES
+from mentat_protocol.config import HTTP_WARM_UP
 
 st.set_page_config(page_title="Strategy Workbench (Steps 1–3)", layout="wide")
 
-# Initialize session state
-if "story" not in st.session_state:
-    st.session_state.story = StrategyStory()
-if "chat_messages" not in st.session_state:
-    st.session_state.chat_messages = []
-if "current_step" not in st.session_state:
-    st.session_state.current_step = 1
-if "assessments_recommended" not in st.session_state:
-    st.session_state.assessments_recommended = []
-if "sub_assessments_generated" not in st.session_state:
-    st.session_state.sub_assessments_generated = {}
-if "project_name" not in st.session_state:
-    st.session_state.project_name = ""
-if "project_started" not in st.session_state:
-    st.session_state.project_started = False
-if "show_project_naming" not in st.session_state:
-    st.session_state.show_project_naming = False
-if "step2_initialized" not in st.session_state:
-    st.session_state.step2_initialized = False
-
-story = st.session_state.story
-
-# Sidebar
-with st.sidebar:
-    # Add Mentat icon
-    st.image("icons/mentat_logo.png", width=300)
+# Parts of the page that rerun on their own when a widget inside them changes (st.fragment from 1.37)
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+LOGO_WIDTH = 300
+
+# st.image decodes and re-encodes the full-size PNG on every run; shrink it once (2x for high-DPI screens)
+@st.cache_resource
+def sidebar_logo():
+    from PIL import Image  # installed with streamlit
+    with Image.open("icons/mentat_logo.png") as im:
+        im = im.resize((2 * LOGO_WIDTH, round(im.height * 2 * LOGO_WIDTH / im.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    return buf.getvalue()
+
+# Open pooled connections to the model API once per process, in the background
+@st.cache_resource
+def start_warm_up():
+    if HTTP_WARM_UP and os.getenv("OPENAI_API_KEY"):
+        threading.Thread(target=warm_up, daemon=True).start()
+    return True
+
+start_warm_up()
+
+# One store per process; SQLite in WAL mode lets several app workers share the file
+@st.cache_resource
+def get_store():
+    return ProjectStore()
+
+# Step 2 priors from past projects, built offline with `python -m core.priors`; None until then
+@st.cache_resource
+def get_priors():
+    try:
+        from core.priors import PRIORS_PATH, AssessmentPriors  # needs numpy
+    except ImportError:
+        return None
+    if not os.path.exists(PRIORS_PATH):
+        return None
+    try:
+        return AssessmentPriors.load(PRIORS_PATH, CATALOG.version)
+    except ValueError as e:
+        # Built against an older catalog: its label indices no longer line up, so go without
+        logging.getLogger(__name__).warning("ignoring Step 2 priors: %s", e)
+        return None
+
+# Step 2/3 model calls started in the background while the user is still reading Step 1
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher(run_step)
+
+def prefetch_next_steps():
+    """Once Step 1 says it has enough, prefetch Step 2/3; work for superseded answers or revisions is dropped."""
+    response = session.mentat_response
+    if not PREFETCH_ENABLED or not response or not session.mentat_defer_signal:
+        return
+    prefetcher = get_prefetcher()
+    key = prefetcher.start(session.story.prompt, response, session.story.revision)
+    if session.prefetch_key not in (None, key):
+        prefetcher.discard(session.prefetch_key)
+    session.prefetch_key = key
+
+def step2_toggle_key(assessment):
+    return f"step2_{session.project_id}_{CATALOG.id_for(assessment)}"
+
+# Project records and session snapshots are written off the script thread, one writer per process
+@st.cache_resource
+def get_snapshot_writer():
+    return SnapshotWriter(get_store())
+
+def persist_project(step=None, response=None):
+    get_snapshot_writer().save(session, step, response)
+
+def initial_project_context(user_prompt):
+    return {
+        "title": user_prompt[:50] + "..." if len(user_prompt) > 50 else user_prompt,
+        "purpose": "",
+        "industry": "",
+        "geography": "",
+        "time_horizon": "",
+        "decision_outcomes": []
+    }
+
+def set_step1_response(response):
+    """Keep the latest Step 1 response and commit its fields to the story, so stored projects carry them."""
+    session.mentat_response = response
+    session.mentat_defer_signal = response.get("defer_to_next_step_signal", False)
+    session.story.update_clarifications(
+        focus_area=str(response.get("focus_area") or ""),
+        purpose=str(response.get("purpose") or ""),
+        industry=str(response.get("industry") or ""),
+        geography=str(response.get("geography") or ""),
+        time_horizon=str(response.get("time_horizon") or ""),
+        decision_outcomes=[str(o) for o in response.get("decision_outcomes") or []],
+    )
+
+def start_from_project(source_id, user_prompt):
+    """Begin Step 1 from a past project's Step 1 response instead of calling the model."""
+    record = get_store().load(source_id)
+    response = record and (record.responses.get("step_1_clarify") or record.state.get("mentat_response"))
+    if not response:
+        st.error("That project has no Step 1 analysis to reuse.")
+        return False
+    session.story.prompt = user_prompt
+    session.story.touch()
+    session.project_context = initial_project_context(user_prompt)
+    set_step1_response(response)
+    session.chat_messages.append({"role": "user", "content": user_prompt})
+    session.chat_messages.append({
+        "role": "assistant",
+        "content": response.get("initial_response", ""),
+        "full_response": response
+    })
+    session.current_step = 1.5
+    persist_project("step_1_clarify", response)
+    return True
+
+def resume_project(project_id):
+    resumed = restore(get_store(), project_id=project_id)
+    if resumed is None:
+        return False
+    # Same browser session, now on that project
+    resumed.id = session.id
+    get_prefetcher().discard(session.prefetch_key)
+    st.session_state.workbench = resumed
+    return True
+
+# All workflow state lives in one WorkbenchSession. Its id is kept in the URL, so a browser that reconnects
+# after a worker restart or redeploy (or opens ?project=<id>) picks up from the last snapshot
+if "workbench" not in st.session_state:
+    st.session_state.workbench = restore(get_store(), st.query_params.get("session"),
+                                         st.query_params.get("project")) or WorkbenchSession()
+session = st.session_state.workbench
+if st.query_params.get("session") != session.id:
+    st.query_params["session"] = session.id
+
+story = session.story
+
+FOCUS_TABLE_CSS = """
+<style>
+.category-header {
+    text-align: right;
+    font-weight: bold;
+    padding-right: 15px;
+    color: currentColor;
+    display: flex;
+    align-items: center;
+    justify-content: flex-end;
+    height: 40px;
+}
+.answer-container {
+    background-color: #262730;
+    border-radius: 8px;
+    padding: 8px 12px;
+    margin: 4px 0;
+    border: 1px solid #4a4a4a;
+    color: white;
+    min-height: 40px;
+    display: flex;
+    align-items: center;
+}
+</style>
+"""
+
+def step_mark(complete, current):
+    if complete:
+        return "✅"
+    return "🔵" if current and session.project_started else "⚪"
+
+def view_model():
+    """What the sidebar, Step 1.5 table and clarification prompt show; rebuilt only when their inputs change."""
+    story = session.story
+    response = session.mentat_response
+    step = session.current_step
+    key = (story.revision, step, session.project_started, session.mentat_defer_signal)
+    cached = st.session_state.get("view_model")
+    if cached and cached[0] is story and cached[1] is response and cached[2] == key:
+        return cached[3]
+
+    selected = set(story.assessments.get("selected", []))
+    step2_complete = bool(selected)
+    assessments = [("External", [(a in selected, a) for a in CATALOG.labels("external")]),
+                   ("Internal", [(a in selected, a) for a in CATALOG.labels("internal")])]
+    if step2_complete:
+        # One set lookup per item instead of a list scan
+        assessments.append(("Optional/Dynamic", [(a in selected, a) for a in suggest_dynamic_assessments(story)]))
+    else:
+        assessments.append(("Optional/Dynamic", None))
+
+    response = response or {}
+    outcomes = response.get("decision_outcomes", [])
+    questions = response.get("clarifying_questions", [])
+    if questions and not session.mentat_defer_signal:
+        clarification_text = "After thinking about your ask, it may help if you could tell me a little bit about:\n\n"
+        clarification_text += "".join(f"- **{q}**\n" for q in questions)
+    else:
+        clarification_text = "Below this you can tell me anything that needs changed or further nuance I should be aware of."
+
+    view = {
+        "status": [
+            (step_mark(story.clarifications_complete, step in (1, 1.5)), "Step 1: Strategic Focus"),
+            (step_mark(step2_complete, step == 2), "Step 2: Assessments"),
+            (step_mark(bool(story.sub_assessments.get("selected")), step == 3), "Step 3: Sub-assessments"),
+        ],
+        "assessments": assessments,
+        # Directly mapped from the Step 1 response (no fallbacks - only envelope returns)
+        "focus_rows": [
+            ("Mentat Summary:", response.get("brief_summary", "")),
+            ("Focus Area:", response.get("focus_area", "")),
+            ("Purpose:", response.get("purpose", "")),
+            ("Industry:", response.get("industry", "")),
+            ("Geography:", response.get("geography", "")),
+            ("Time Horizon:", response.get("time_horizon", "")),
+            ("Decision Outcomes:", ", ".join(outcomes) if isinstance(outcomes, list) else outcomes),
+        ],
+        "clarification_text": clarification_text,
+    }
+    st.session_state.view_model = (story, session.mentat_response, key, view)
+    return view
+
+def live_field_renderer():
+    """Placeholders that show Step 1 fields as they stream in, before the full response is validated."""
+    with st.chat_message("assistant", avatar="icons/bot_icon.png"):
+        placeholders = {
+            "initial_response": st.empty(),
+            "brief_summary": st.empty(),
+        }
+
+    def render(name, value):
+        if name in placeholders and value:
+            placeholders[name].markdown(value if name == "initial_response" else f"**Summary:** {value}")
+
+    return render
+
+def show_project_naming(show):
+    session.show_project_naming = show
+
+def reset_project(name="", project_id=None):
+    get_prefetcher().discard(session.prefetch_key)
+    session.reset(name, project_id)
+    # Clear project name input
+    st.session_state.pop("project_name_input", None)
+
+# Sidebar: typing a project name or picking a saved project only reruns this part
+@fragment
+def sidebar_panel():
+    st.image(sidebar_logo(), width=LOGO_WIDTH)
     
     # Small spacing below logo
     st.markdown("")
     
     # Project naming and initialization
-    if not st.session_state.project_started:
-        if not st.session_state.show_project_naming:
-            if st.button("Start a New Project", type="primary"):
-                st.session_state.show_project_naming = True
-                st.rerun()
+    if not session.project_started:
+        if not session.show_project_naming:
+            st.button("Start a New Project", type="primary", on_click=show_project_naming, args=(True,))
+
+            recent, _ = get_store().list_projects(limit=20)
+            if recent:
+                st.markdown("**Resume a Project**")
+                labels = {p.id: f"{p.name} · {p.updated_at[:10] or '—'}" for p in recent}
+                chosen = st.selectbox("Saved projects", list(labels), format_func=labels.get, label_visibility="collapsed")
+                if st.button("Resume", type="secondary") and resume_project(chosen):
+                    st.rerun()
         else:
             project_name = st.text_input("Project Name:", 
                                        placeholder="Enter project name...",
@@ -89,187 +303,312 @@ with st.sidebar:
                 # Button is always enabled - user can type and immediately click
                 if st.button("Begin Project", type="primary"):
                     if project_name.strip():
-                        st.session_state.project_name = project_name.strip()
-                        st.session_state.project_started = True
-                        st.session_state.show_project_naming = False
-                        st.session_state.story = StrategyStory()
-                        st.session_state.chat_messages = []
-                        st.session_state.current_step = 1
-                        st.session_state.assessments_recommended = []
-                        st.session_state.sub_assessments_generated = {}
-                        st.session_state.step2_initialized = False
-                        # Clear any cached responses to prevent cross-session contamination
-                        if "mentat_response" in st.session_state:
-                            del st.session_state["mentat_response"]
-                        if "mentat_defer_signal" in st.session_state:
-                            del st.session_state["mentat_defer_signal"]
-                        if "project_context" in st.session_state:
-                            del st.session_state["project_context"]
-                        # Clear project name input
-                        if "project_name_input" in st.session_state:
-                            del st.session_state["project_name_input"]
+                        reset_project(project_name.strip(), uuid.uuid4().hex)
                         st.rerun()
                     else:
                         st.error("Please enter a project name to continue")
             with col2:
-                if st.button("Cancel", type="secondary"):
-                    st.session_state.show_project_naming = False
-                    st.rerun()
+                st.button("Cancel", type="secondary", on_click=show_project_naming, args=(False,))
             
             if not project_name.strip():
                 st.info("Please enter a project name to continue")
     else:
-        st.markdown(f"**Current Project:** {st.session_state.project_name}")
+        st.markdown(f"**Current Project:** {session.project_name}")
         if st.button("Start New Project", type="secondary"):
-            st.session_state.project_name = ""
-            st.session_state.project_started = False
-            st.session_state.show_project_naming = False
-            st.session_state.story = StrategyStory()
-            st.session_state.chat_messages = []
-            st.session_state.current_step = 1
-            st.session_state.assessments_recommended = []
-            st.session_state.sub_assessments_generated = {}
-            st.session_state.step2_initialized = False
-            # Clear any cached responses to prevent cross-session contamination
-            if "mentat_response" in st.session_state:
-                del st.session_state["mentat_response"]
-            if "mentat_defer_signal" in st.session_state:
-                del st.session_state["mentat_defer_signal"]
-            if "project_context" in st.session_state:
-                del st.session_state["project_context"]
-            # Clear project name input
-            if "project_name_input" in st.session_state:
-                del st.session_state["project_name_input"]
+            reset_project()
             st.rerun()
 
+    view = view_model()
     st.markdown("### Project Status")
-    
-    # Step 1: Strategic Focus
-    step1_complete = story.clarifications_complete
-    if step1_complete:
-        st.markdown("✅ **Step 1: Strategic Focus**")
-    elif (st.session_state.current_step == 1 or st.session_state.current_step == 1.5) and st.session_state.get("project_started", False):
-        st.markdown("🔵 **Step 1: Strategic Focus**")
-    else:
-        st.markdown("⚪ **Step 1: Strategic Focus**")
-    
-    # Step 2: Assessments
-    step2_complete = bool(story.assessments.get('selected'))
-    if step2_complete:
-        st.markdown("✅ **Step 2: Assessments**")
-    elif st.session_state.current_step == 2 and st.session_state.get("project_started", False):
-        st.markdown("🔵 **Step 2: Assessments**")
-    else:
-        st.markdown("⚪ **Step 2: Assessments**")
-    
-    # Step 3: Sub-assessments
-    step3_complete = bool(story.sub_assessments.get('selected'))
-    if step3_complete:
-        st.markdown("✅ **Step 3: Sub-assessments**")
-    elif st.session_state.current_step == 3 and st.session_state.get("project_started", False):
-        st.markdown("🔵 **Step 3: Sub-assessments**")
-    else:
-        st.markdown("⚪ **Step 3: Sub-assessments**")
+    for mark, title in view["status"]:
+        st.markdown(f"{mark} **{title}**")
 
     st.markdown("### Strategic Assessments")
+    for title, items in view["assessments"]:
+        st.markdown(f"**{title}:**")
+        if items is None:
+            st.markdown("*Available after Step 2 completion*")
+        for selected, assessment in items or ():
+            st.markdown(f"{'✅' if selected else '⚪'} {assessment}")
+
+with st.sidebar:
+    sidebar_panel()
+
+def render_transcript(collapse_previous):
+    """Chat so far; with collapse_previous, earlier responses fold into expanders with their full envelope."""
+    messages = session.chat_messages
+    response_count = 0
+    for i, message in enumerate(messages):
+        if message["role"] != "assistant":
+            with st.chat_message("user", avatar="icons/user_icon.png"):
+                st.markdown(message["content"])
+            continue
+        welcome = i == 0 and "Welcome to the Strategy Workbench" in message["content"]
+        if not welcome:
+            response_count += 1
+        # Always show the initial welcome message (first assistant message) and the most recent response
+        if welcome or not collapse_previous or i == len(messages) - 1:
+            with st.chat_message("assistant", avatar="icons/bot_icon.png"):
+                st.markdown(message["content"])
+            continue
+
+        with st.expander(f"Previous Response #{response_count}", expanded=False):
+            with st.chat_message("assistant", avatar="icons/bot_icon.png"):
+                st.markdown(message["content"])
+            
+            # Show full envelope response if available
+            full_resp = message.get("full_response")
+            if full_resp:
+                st.markdown("**Full Response:**")
+                
+                # Display the summary
+                if "brief_summary" in full_resp:
+                    st.markdown(f"**Summary:** {full_resp['brief_summary']}")
+                
+                # Display strategic fields
+                for field in ["focus_area", "purpose", "industry", "geography", "time_horizon", "decision_outcomes"]:
+                    if full_resp.get(field):
+                        value = full_resp[field]
+                        if field == "decision_outcomes" and isinstance(value, list):
+                            value = ", ".join(value)
+                        st.markdown(f"**{field.replace('_', ' ').title()}:** {value}")
+                
+                # Display clarifying questions if any
+                if full_resp.get("clarifying_questions"):
+                    st.markdown("**Clarifying Questions:**")
+                    for q in full_resp["clarifying_questions"]:
+                        st.markdown(f"- {q}")
+
+def render_focus_table(view):
+    # Step 1 answers as a two-column table
+    st.markdown(FOCUS_TABLE_CSS, unsafe_allow_html=True)
+    for header, answer in view["focus_rows"]:
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.markdown(f'<div class="category-header">{header}</div>', unsafe_allow_html=True)
+        with col2:
+            st.markdown(f'<div class="answer-container">{answer}</div>', unsafe_allow_html=True)
     
-    # Group assessments by category
-    from core.canonical import CANONICAL_EXTERNAL, CANONICAL_INTERNAL, CANONICAL_OPTIONAL
+    # Add space after the table
+    st.markdown("")
+
+# Step 1 input: typing the prompt only reruns this part (and its similar-project search)
+@fragment
+def step1_input():
+    story = session.story
+    # User input for strategic prompt
+    with st.chat_message("user", avatar="icons/user_icon.png"):
+        st.markdown("### Share your strategic situation:")
+        # Fresh text area for each new project
+        user_prompt = st.text_area("", 
+                                  value="", 
+                                  placeholder="e.g., We are a laboratory products distribution business...",
+                                  height=120,
+                                  max_chars=None,
+                                  key="strategic_prompt_input")
     
-    # External Assessments
-    st.markdown("**External:**")
-    for assessment in CANONICAL_EXTERNAL:
-        if assessment in story.assessments.get("selected", []):
-            st.markdown(f"✅ {assessment}")
+    # Similar past projects can seed Step 1 from their stored response, skipping the model call
+    if user_prompt.strip():
+        similar = get_store().search(user_prompt, limit=3, exclude_id=session.project_id)
+        if similar:
+            st.markdown("**Similar past projects**")
+            for hit in similar:
+                col1, col2 = st.columns([4, 1])
+                with col1:
+                    st.markdown(f"**{hit.name}** · {hit.industry or '—'} · {hit.geography or '—'}  \n{hit.prompt[:160]}")
+                with col2:
+                    if st.button("Start from this one", key=f"reuse_{hit.id}") and start_from_project(hit.id, user_prompt):
+                        st.rerun()
+
+    if st.button("Submit Strategic Prompt", type="primary"):
+        if user_prompt.strip():
+            story.prompt = user_prompt
+            story.touch()
+            # Don't store in session state - let it clear after submission
+            
+            # Add user message
+            session.chat_messages.append({"role": "user", "content": user_prompt})
+            
+            # Use Mentat Protocol for structured ChatGPT analysis
+            try:
+                # Create project context for Mentat Protocol
+                project_context = initial_project_context(user_prompt)
+                
+                # Store project context in session state for clarifications
+                session.project_context = project_context
+                
+                # Use step1_clarify envelope for structured analysis
+                env = ENVELOPES.step1_clarify(
+                    project_context=project_context,
+                    user_input=user_prompt
+                )
+                
+                response = run_step(env, on_field=live_field_renderer())
+                
+                # Store structured response in session state
+                set_step1_response(response)
+                
+                # Use envelope response only - get initial_response field
+                ai_response = response.get("initial_response", "")
+                
+            except Exception as e:
+                # Fall back to simple analysis if API fails
+                st.error(f"AI analysis failed: {str(e)}")
+                ai_response = "I apologize, but I'm having trouble analyzing your strategic prompt right now. Please try again or contact support if the issue persists."
+                session.mentat_response = None
+                session.mentat_defer_signal = False
+                response = None
+            
+            session.chat_messages.append({
+                "role": "assistant", 
+                "content": ai_response,
+                "full_response": response  # Store the full envelope response
+            })
+            session.current_step = 1.5
+            persist_project("step_1_clarify", response)
+            st.rerun()
         else:
-            st.markdown(f"⚪ {assessment}")
+            st.error("Please enter a strategic prompt to continue.")
+
+# Step 1.5 input: typing a clarification doesn't re-render the transcript or table above it
+@fragment
+def clarification_panel():
+    st.markdown(view_model()["clarification_text"])
+    
+    # New conversational prompt for clarification
+    with st.chat_message("user", avatar="icons/user_icon.png"):
+        clarification_input = st.text_area("", 
+                                        placeholder="Provide additional details or clarifications about your strategic focus...",
+                                        height=100,
+                                        max_chars=None,
+                                        value="",
+                                        key="clarification_input")
     
-    # Internal Assessments
-    st.markdown("**Internal:**")
-    for assessment in CANONICAL_INTERNAL:
-        if assessment in story.assessments.get("selected", []):
-            st.markdown(f"✅ {assessment}")
+    if st.button("Submit Clarification", type="primary"):
+        if clarification_input.strip():
+            # Add user clarification to chat
+            session.chat_messages.append({"role": "user", "content": clarification_input})
+            
+            # Use step1_clarify envelope with conversation history for clarification
+            env = ENVELOPES.step1_clarify(
+                project_context=session.project_context,
+                user_input=clarification_input,
+                conversation_history=session.chat_messages[:-1]  # Exclude the current message
+            )
+            
+            response = run_step(env, on_field=live_field_renderer())
+            
+            # Store updated structured response in session state
+            set_step1_response(response)
+            
+            # Add AI response to chat
+            session.chat_messages.append({
+                "role": "assistant", 
+                "content": response.get("initial_response", ""),
+                "full_response": response  # Store the full envelope response
+            })
+            
+            # Clear the clarification input
+            if "clarification_input" in st.session_state:
+                del st.session_state["clarification_input"]
+            
+            persist_project("step_1_clarify", response)
+            st.rerun()
         else:
-            st.markdown(f"⚪ {assessment}")
+            st.error("Please provide clarification to continue.")
     
-    # Optional/Dynamic Assessments
-    st.markdown("**Optional/Dynamic:**")
-    if step2_complete:
-        dynamic = suggest_dynamic_assessments(story)
-        for assessment in dynamic:
-            if assessment in story.assessments.get("selected", []):
-                st.markdown(f"✅ {assessment}")
-            else:
-                st.markdown(f"⚪ {assessment}")
-    else:
-        st.markdown("*Available after Step 2 completion*")
+    # Add "or" text and Complete Step 1 button below Submit Clarification (outside the if block)
+    st.markdown("**or**")
+    if st.button("Complete Step 1", type="primary", help="Click to finish Step 1 and proceed to Step 2"):
+        session.current_step = 2
+        # Pre-set the Step 2 toggles from what similar past projects chose
+        priors = get_priors()
+        if priors is not None:
+            session.assessments_recommended = priors.preselect(
+                session.mentat_response or {}, only=CATALOG.labels())
+        persist_project()
+        st.rerun()
+
+# Step 2 toggles: flipping one only reruns this part
+@fragment
+def step2_panel():
+    story = session.story
+    with st.chat_message("assistant", avatar="icons/bot_icon.png"):
+        st.markdown("### Step 2: Assessments")
+        response = session.step2_response
+        priors = get_priors()
+        if response:
+            # The model refines the prior-based pre-selection
+            st.markdown(response.get("brief_summary", ""))
+            recommended = set(recommended_labels(response))
+        else:
+            recommended = set(session.assessments_recommended)
+            if recommended and priors is not None:
+                st.caption(f"Pre-selected from {priors.projects} past projects")
+        for category, title in [("external", "External"), ("internal", "Internal"),
+                                ("optional", "Optional"), ("dynamic", "Dynamic")]:
+            st.markdown(f"**{title}:**")
+            for assessment in CATALOG.labels(category):
+                st.toggle(assessment, value=assessment in recommended, key=step2_toggle_key(assessment))
+
+    if st.button("Continue to Step 3", type="primary"):
+        selected = [a for a in CATALOG.labels() if st.session_state.get(step2_toggle_key(a))]
+        if selected:
+            canonical = CATALOG.label_set(*CANONICAL_CATEGORIES)
+            story.assessments["canonical"] = [a for a in selected if a in canonical]
+            story.assessments["dynamic"] = suggest_dynamic_assessments(story)
+            story.assessments["selected"] = selected
+            story.touch()
+            get_prefetcher().retain(session.prefetch_key, selected)
+            session.current_step = 3
+            persist_project()
+            st.rerun()
+        else:
+            st.error("Please select at least one assessment to continue.")
+
+def prepare_export(kind, fingerprint):
+    st.session_state[f"export_{kind}_for"] = fingerprint
+
+# Export panel: preparing or downloading an export only reruns this part
+@fragment
+def export_panel():
+    story = session.story
+    st.divider()
+    st.subheader("Step 1: Strategic Focus Summary")
+    st.markdown(f"**Strategy Story:** {story.prompt or '—'}")
+    st.markdown(f"**Focus:** {story.clarifications.get('focus_area','—')}")
+    st.markdown(f"**Purpose:** {story.clarifications.get('purpose','—')}")
+    st.markdown(f"**Industry:** {story.clarifications.get('industry','—')}")
+    st.markdown(f"**Geography:** {story.clarifications.get('geography','—')}")
+    st.markdown(f"**Time Horizon:** {story.clarifications.get('time_horizon','—')}")
+    st.markdown(f"**Decision Outcomes:** {', '.join(story.clarifications.get('decision_outcomes',[])) or '—'}")
+
+    # Exports are memoized per story revision and only built once someone asks for them
+    fingerprint = story_fingerprint(story)
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.session_state.get("export_json_for") == fingerprint:
+            st.download_button("Download JSON", data=export_json(story), file_name="strategy_story.json")
+        else:
+            st.button("Prepare JSON export", on_click=prepare_export, args=("json", fingerprint))
+    with col2:
+        if st.session_state.get("export_docx_for") == fingerprint:
+            st.download_button("Download .docx", data=export_docx_bytes(story),
+                               file_name="strategy_story.docx",
+                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        else:
+            st.button("Prepare .docx export", on_click=prepare_export, args=("docx", fingerprint))
 
 # Main Content Area
-if st.session_state.get("project_started", False):
+if session.project_started:
     # Chat Interface
     chat_container = st.container()
     with chat_container:
-        st.markdown(f"### Strategy Project: {st.session_state.project_name}")
-        
-        # Display chat messages with step-aware logic
-        # Only show chat messages for the current step and previous steps
-        if st.session_state.current_step == 1:
-            # For Step 1, show all messages normally
-            total_messages = len(st.session_state.chat_messages)
-            response_count = 0
-            
-            for i, message in enumerate(st.session_state.chat_messages):
-                if message["role"] == "assistant":
-                    # Always show the initial welcome message (first assistant message)
-                    if i == 0 and "Welcome to the Strategy Workbench" in message["content"]:
-                        with st.chat_message("assistant", avatar="icons/bot_icon.png"):
-                            st.markdown(message["content"])
-                        continue
-                    
-                    response_count += 1
-                    # Show current response normally, collapse previous ones
-                    if i == total_messages - 1:  # Most recent response
-                        with st.chat_message("assistant", avatar="icons/bot_icon.png"):
-                            st.markdown(message["content"])
-                    else:  # Previous responses - show collapsed
-                        with st.expander(f"Previous Response #{response_count}", expanded=False):
-                            with st.chat_message("assistant", avatar="icons/bot_icon.png"):
-                                st.markdown(message["content"])
-                            
-                            # Show full envelope response if available
-                            if "full_response" in message and message["full_response"]:
-                                st.markdown("**Full Response:**")
-                                full_resp = message["full_response"]
-                                
-                                # Display the summary
-                                if "brief_summary" in full_resp:
-                                    st.markdown(f"**Summary:** {full_resp['brief_summary']}")
-                                
-                                # Display strategic fields
-                                fields_to_show = ["focus_area", "purpose", "industry", "geography", "time_horizon", "decision_outcomes"]
-                                for field in fields_to_show:
-                                    if field in full_resp and full_resp[field]:
-                                        if field == "decision_outcomes" and isinstance(full_resp[field], list):
-                                            st.markdown(f"**{field.replace('_', ' ').title()}:** {', '.join(full_resp[field])}")
-                                        else:
-                                            st.markdown(f"**{field.replace('_', ' ').title()}:** {full_resp[field]}")
-                                
-                                # Display clarifying questions if any
-                                if "clarifying_questions" in full_resp and full_resp["clarifying_questions"]:
-                                    st.markdown("**Clarifying Questions:**")
-                                    for q in full_resp["clarifying_questions"]:
-                                        st.markdown(f"- {q}")
-                else:
-                    # User messages - show normally
-                    with st.chat_message("user", avatar="icons/user_icon.png"):
-                        st.markdown(message["content"])
-        elif st.session_state.current_step >= 2:
-            # For Step 2 and beyond, don't show any previous chat messages
-            pass
+        st.markdown(f"### Strategy Project: {session.project_name}")
         
         # Step 1: Strategic Focus
-        if st.session_state.current_step == 1:
-            if not st.session_state.chat_messages:
+        if session.current_step == 1:
+            if not session.chat_messages:
                 # Initial AI message
                 initial_message = """### Welcome to the Strategy Workbench!
 
@@ -279,264 +618,72 @@ I'm here to help you structure your strategic analysis. Let's start with your st
 
 Please share your strategic situation or question, and I'll help extract the key clarifications we need."""
                 
-                st.session_state.chat_messages.append({"role": "assistant", "content": initial_message})
-                st.rerun()
+                session.chat_messages.append({"role": "assistant", "content": initial_message})
 
-            # User input for strategic prompt
-            with st.chat_message("user", avatar="icons/user_icon.png"):
-                st.markdown("### Share your strategic situation:")
-                # Fresh text area for each new project
-                user_prompt = st.text_area("", 
-                                          value="", 
-                                          placeholder="e.g., We are a laboratory products distribution business...",
-                                          height=120,
-                                          max_chars=None,
-                                          key="strategic_prompt_input")
-            
-            if st.button("Submit Strategic Prompt", type="primary"):
-                if user_prompt.strip():
-                    story.prompt = user_prompt
-                    # Don't store in session state - let it clear after submission
-                    
-                    # Add user message
-                    st.session_state.chat_messages.append({"role": "user", "content": user_prompt})
-                    
-                    # Use Mentat Protocol for structured ChatGPT analysis
-                    try:
-                        # Create project context for Mentat Protocol
-                        project_context = {
-                            "title": user_prompt[:50] + "..." if len(user_prompt) > 50 else user_prompt,
-                            "purpose": "",
-                            "industry": "",
-                            "geography": "",
-                            "time_horizon": "",
-                            "decision_outcomes": []
-                        }
-                        
-                        # Store project context in session state for clarifications
-                        st.session_state.project_context = project_context
-                        
-                        # Use step1_clarify envelope for structured analysis
-                        env = ENVELOPES.step1_clarify(
-                            project_context=project_context,
-                            user_input=user_prompt
-                        )
-                        
-                        response = run_step(env)
-                        
-                        # Extract structured data from response
-                        brief_summary = response.get("brief_summary", "")
-                        assumption_gaps = response.get("assumption_gaps", [])
-                        clarifying_questions = response.get("clarifying_questions", [])
-                        defer_signal = response.get("defer_to_next_step_signal", False)
-                        
-                        # Store structured response in session state
-                        st.session_state.mentat_response = response
-                        st.session_state.mentat_defer_signal = defer_signal
-                        
-                        # Use envelope response only - get initial_response field
-                        initial_response = response.get("initial_response", "")
-                        ai_response = initial_response
-                        
-                    except Exception as e:
-                        # Fall back to simple analysis if API fails
-                        st.error(f"AI analysis failed: {str(e)}")
-                        ai_response = "I apologize, but I'm having trouble analyzing your strategic prompt right now. Please try again or contact support if the issue persists."
-                        st.session_state.mentat_response = None
-                        st.session_state.mentat_defer_signal = False
-                    
-                    st.session_state.chat_messages.append({
-                        "role": "assistant", 
-                        "content": ai_response,
-                        "full_response": response  # Store the full envelope response
-                    })
-                    st.session_state.current_step = 1.5
-                    st.rerun()
-                else:
-                    st.error("Please enter a strategic prompt to continue.")
+            # Only the current step's messages are shown; previous responses are collapsed
+            render_transcript(collapse_previous=True)
+            step1_input()
 
         # Step 1.5: Conversational Clarification
-        elif st.session_state.current_step == 1.5:
+        elif session.current_step == 1.5:
+            prefetch_next_steps()
+
             # Display all chat messages including the initial response
-            for message in st.session_state.chat_messages:
-                if message["role"] == "assistant":
-                    with st.chat_message("assistant", avatar="icons/bot_icon.png"):
-                        st.markdown(message["content"])
-                else:
-                    with st.chat_message("user", avatar="icons/user_icon.png"):
-                        st.markdown(message["content"])
-            
-            # Create containers for each category with visual attention
-            st.markdown("""
-            <style>
-            .category-header {
-                text-align: right;
-                font-weight: bold;
-                padding-right: 15px;
-                color: currentColor;
-                display: flex;
-                align-items: center;
-                justify-content: flex-end;
-                height: 40px;
-            }
-            .answer-container {
-                background-color: #262730;
-                border-radius: 8px;
-                padding: 8px 12px;
-                margin: 4px 0;
-                border: 1px solid #4a4a4a;
-                color: white;
-                min-height: 40px;
-                display: flex;
-                align-items: center;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            
-            # Use structured Mentat Protocol response data
-            mentat_response = st.session_state.get("mentat_response", {})
-            
-            # Handle case where mentat_response might be None
-            if mentat_response is None:
-                mentat_response = {}
-            
-            # Extract data from structured response or use defaults
-            mentat_summary = mentat_response.get("brief_summary", "")
-            assumption_gaps = mentat_response.get("assumption_gaps", [])
-            
-            # Use a more structured approach with proper alignment
-            # Directly map from mentat response (no fallbacks - only envelope returns)
-            mentat_focus_area = mentat_response.get("focus_area", "")
-            mentat_purpose = mentat_response.get("purpose", "")
-            mentat_industry = mentat_response.get("industry", "")
-            mentat_geography = mentat_response.get("geography", "")
-            mentat_time_horizon = mentat_response.get("time_horizon", "")
-            mentat_decision_outcomes = mentat_response.get("decision_outcomes", [])
-            
-            for i, (header, answer) in enumerate([
-                ("Mentat Summary:", mentat_summary),
-                ("Focus Area:", mentat_focus_area),
-                ("Purpose:", mentat_purpose),
-                ("Industry:", mentat_industry),
-                ("Geography:", mentat_geography),
-                ("Time Horizon:", mentat_time_horizon),
-                ("Decision Outcomes:", ", ".join(mentat_decision_outcomes) if isinstance(mentat_decision_outcomes, list) else mentat_decision_outcomes)
-            ]):
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    st.markdown(f'<div class="category-header">{header}</div>', unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f'<div class="answer-container">{answer}</div>', unsafe_allow_html=True)
-            
-            # Add space after the table
-            st.markdown("")
-            
-            # Run ChatGPT analysis with full assessment context
-            from core.canonical import CANONICAL_EXTERNAL, CANONICAL_INTERNAL, CANONICAL_OPTIONAL, DEFAULT_SUBS
-            
-            assessment_context = f"""
-            STRATEGIC FOCUS ANALYSIS CONTEXT:
-            
-            Current Strategic Focus:
-            - Focus Area: {mentat_focus_area}
-            - Purpose: {mentat_purpose}
-            - Industry: {mentat_industry}
-            - Geography: {mentat_geography}
-            - Time Horizon: {mentat_time_horizon}
-            - Decision Outcomes: {', '.join(mentat_decision_outcomes) if isinstance(mentat_decision_outcomes, list) else mentat_decision_outcomes}
-            
-            AVAILABLE ASSESSMENTS:
-            
-            External Assessments:
-            {chr(10).join(f"- {assessment}" for assessment in CANONICAL_EXTERNAL)}
-            
-            Internal Assessments:
-            {chr(10).join(f"- {assessment}" for assessment in CANONICAL_INTERNAL)}
-            
-            Optional/Dynamic Assessments:
-            {chr(10).join(f"- {assessment}" for assessment in CANONICAL_OPTIONAL)}
-            
-            SUB-ASSESSMENT DETAILS:
-            {chr(10).join(f"- {main}: {', '.join(subs)}" for main, subs in DEFAULT_SUBS.items())}
-            
-            Based on this comprehensive assessment framework, analyze if the current strategic focus needs additional clarification for effective assessment planning.
-            """
-            
-            # Use structured clarifying questions from Mentat Protocol
-            clarifying_questions = mentat_response.get("clarifying_questions", [])
-            defer_signal = st.session_state.get("mentat_defer_signal", False)
-            
-            if clarifying_questions and not defer_signal:
-                # Show structured clarifying questions from Mentat Protocol
-                clarification_text = "After thinking about your ask, it may help if you could tell me a little bit about:\n\n"
-                for i, question in enumerate(clarifying_questions, 1):
-                    clarification_text += f"- **{question}**\n"
-            else:
-                clarification_text = "Below this you can tell me anything that needs changed or further nuance I should be aware of."
-            
-            st.markdown(clarification_text)
-            
-            # New conversational prompt for clarification
-            with st.chat_message("user", avatar="icons/user_icon.png"):
-                clarification_input = st.text_area("", 
-                                                placeholder="Provide additional details or clarifications about your strategic focus...",
-                                                height=100,
-                                                max_chars=None,
-                                                value="",
-                                                key="clarification_input")
-            
-            if st.button("Submit Clarification", type="primary"):
-                if clarification_input.strip():
-                    # Add user clarification to chat
-                    st.session_state.chat_messages.append({"role": "user", "content": clarification_input})
-                    
-                    # Use step1_clarify envelope with conversation history for clarification
-                    env = ENVELOPES.step1_clarify(
-                        project_context=st.session_state.project_context,
-                        user_input=clarification_input,
-                        conversation_history=st.session_state.chat_messages[:-1]  # Exclude the current message
-                    )
-                    
-                    response = run_step(env)
-                    
-                    # Extract structured data from response
-                    brief_summary = response.get("brief_summary", "")
-                    assumption_gaps = response.get("assumption_gaps", [])
-                    clarifying_questions = response.get("clarifying_questions", [])
-                    defer_signal = response.get("defer_to_next_step_signal", False)
-                    initial_response = response.get("initial_response", "")
-                    
-                    # Store updated structured response in session state
-                    st.session_state.mentat_response = response
-                    st.session_state.mentat_defer_signal = defer_signal
-                    
-                    # Add AI response to chat
-                    st.session_state.chat_messages.append({
-                        "role": "assistant", 
-                        "content": initial_response,
-                        "full_response": response  # Store the full envelope response
-                    })
-                    
-                    # Clear the clarification input
-                    if "clarification_input" in st.session_state:
-                        del st.session_state["clarification_input"]
-                    
-                    st.rerun()
-                else:
-                    st.error("Please provide clarification to continue.")
-            
-            # Add "or" text and Complete Step 1 button below Submit Clarification (outside the if block)
-            st.markdown("**or**")
-            if st.button("Complete Step 1", type="primary", help="Click to finish Step 1 and proceed to Step 2"):
-                st.session_state.current_step = 2
-                st.rerun()
+            render_transcript(collapse_previous=False)
+            render_focus_table(view_model())
+            clarification_panel()
 
         # Step 2: Assessments
-        elif st.session_state.current_step == 2:
-            # Chat Interface for Step 2
+        elif session.current_step == 2:
+            if not session.step2_initialized and session.mentat_response:
+                # Usually prefetched while the user read Step 1; otherwise make the call now
+                with st.spinner("Refining the selection..."):
+                    response = get_prefetcher().step2(session.prefetch_key)
+                    if response is None:
+                        try:
+                            response = run_step(step2_envelope(story.prompt, session.mentat_response))
+                        except Exception as e:
+                            st.error(f"AI analysis failed: {str(e)}")
+                session.step2_initialized = True
+                if response:
+                    session.step2_response = response
+                    persist_project("step_2_assessment_toggle", response)
+            step2_panel()
+
+        # Step 3: Sub-assessments
+        elif session.current_step == 3:
             with st.chat_message("assistant", avatar="icons/bot_icon.png"):
-                st.markdown("### Step 2: Assessments")
-                st.markdown("TBD")
+                st.markdown("### Step 3: Sub-assessments")
+                selected = story.assessments.get("selected", [])
+                if not story.sub_assessments.get("by_assessment"):
+                    generated = session.sub_assessments_generated
+                    with st.spinner("Gathering sub-assessments..."):
+                        # Prefetched one assessment at a time; whatever wasn't is fetched in one call
+                        prefetcher, key = get_prefetcher(), session.prefetch_key
+                        for assessment in selected:
+                            response = prefetcher.step3(key, assessment)
+                            if response:
+                                generated.update(response.get("subassessments_by_assessment", {}))
+                        missing = [a for a in selected if a not in generated]
+                        if missing:
+                            try:
+                                response = run_step(step3_envelope(story.prompt, session.mentat_response or {}, missing))
+                                generated.update(response.get("subassessments_by_assessment", {}))
+                                persist_project("step_3_subassessments", response)
+                            except Exception as e:
+                                st.error(f"AI analysis failed: {str(e)}")
+                    by_assessment = {
+                        a: [sub["name"] for sub in generated.get(a, [])] or suggest_subassessments_for(a, story.prompt)
+                        for a in selected
+                    }
+                    story.sub_assessments["by_assessment"] = by_assessment
+                    story.sub_assessments["selected"] = {a: list(subs) for a, subs in by_assessment.items()}
+                    story.touch()
+                    persist_project()
+
+                for assessment in selected:
+                    st.markdown(f"**{assessment}**")
+                    st.markdown("\n".join(f"- {sub}" for sub in story.sub_assessments["by_assessment"].get(assessment, [])))
 
 else:
     # Welcome section with minimal top spacing
@@ -544,21 +691,5 @@ else:
     st.markdown("Please start a new project from the sidebar to begin your strategic analysis.")
 
 # Live Summary and Export
-if st.session_state.get("project_started", False) and story.clarifications_complete:
-    st.divider()
-    st.subheader("Step 1: Strategic Focus Summary")
-    st.markdown(f"**Strategy Story:** {story.prompt or '—'}")
-    st.markdown(f"**Focus:** {story.clarifications.get('focus_area','—')}")
-    st.markdown(f"**Purpose:** {story.clarifications.get('purpose','—')}")
-    st.markdown(f"**Industry:** {story.clarifications.get('industry','—')}")
-    st.markdown(f"**Geography:** {story.clarifications.get('geography','—')}")
-    st.markdown(f"**Time Horizon:** {story.clarifications.get('time_horizon','—')}")
-    st.markdown(f"**Decision Outcomes:** {', '.join(story.clarifications.get('decision_outcomes',[])) or '—'}")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.download_button("Download JSON", data=export_json(story), file_name="strategy_story.json")
-    with col2:
-        st.download_button("Download .docx", data=export_docx_bytes(story),
-                           file_name="strategy_story.docx",
-                           mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
\ No newline at end of file
+if session.project_started and story.clarifications_complete:
+    export_panel()
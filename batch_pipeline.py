@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Headless Step 1 → Step 2 → Step 3 pipeline over a file of strategic prompts.
+
+Usage:
+  python batch_pipeline.py prompts.jsonl --out runs/portfolio --concurrency 8
+
+Input is JSONL (one {"prompt": ..., "id": ...} object per line) or CSV with a
+"prompt" column and an optional "id" column. Each prompt produces
+<out>/<id>.json (a StrategyStory). Progress is checkpointed after every step
+in <out>/checkpoints/<id>.json, so re-running the same command resumes
+without repeating finished model calls.
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'mentat-protocol'))
+from mentat_protocol.env import load_env
+
+# MENTAT_* settings are read when mentat_protocol.config is first imported, so load config.env before anything can
+load_env([os.path.dirname(os.path.abspath(__file__))])
+
+from core.canonical import CATALOG, suggest_dynamic_assessments
+from core.catalog import CANONICAL_CATEGORIES
+from core.export import export_json
+from core.story import StrategyStory
+
+import mentat_protocol
+from mentat_protocol import ENVELOPES
+
+STEPS = ["step1", "step2", "step3"]
+
+def read_prompts(path: str) -> List[Dict[str, str]]:
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    prompts = []
+    seen: Dict[str, str] = {}
+    for line, row in enumerate(rows, start=1):
+        prompt = (row.get("prompt") or "").strip()
+        if not prompt:
+            continue
+        # Stable id from the prompt text so resumed runs find their checkpoints
+        pid = str(row.get("id") or hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12])
+        # One task per id: two would race on the same checkpoint and output files
+        if pid in seen:
+            if seen[pid] != prompt:
+                print(f"⚠️  row {line}: id {pid} already used by another prompt; skipped", file=sys.stderr)
+            continue
+        seen[pid] = prompt
+        prompts.append({"id": pid, "prompt": prompt})
+    return prompts
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+def write_atomic(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def project_context_for(story: StrategyStory) -> Dict[str, Any]:
+    c = story.clarifications
+    return {
+        "title": story.prompt[:50] + "..." if len(story.prompt) > 50 else story.prompt,
+        "purpose": c.get("purpose", ""),
+        "industry": c.get("industry", ""),
+        "geography": c.get("geography", ""),
+        "time_horizon": c.get("time_horizon", ""),
+        "decision_outcomes": c.get("decision_outcomes", []),
+    }
+
+def build_story(prompt: str, checkpoint: Dict[str, Any]) -> StrategyStory:
+    story = StrategyStory(prompt=prompt)
+
+    step1 = checkpoint.get("step1")
+    if step1:
+        story.update_clarifications(
+            focus_area=step1.get("focus_area", ""),
+            purpose=step1.get("purpose", ""),
+            industry=step1.get("industry", ""),
+            geography=step1.get("geography", ""),
+            time_horizon=step1.get("time_horizon", ""),
+            decision_outcomes=step1.get("decision_outcomes", []),
+        )
+
+    step2 = checkpoint.get("step2")
+    if step2:
+        # Resolve by catalog id where the model returned one; unknown items keep their label
+        selected = []
+        for item in step2.get("recommended_assessments", []):
+            entry = CATALOG.resolve(item)
+            selected.append(entry.label if entry else item["label"])
+        canonical = CATALOG.label_set(*CANONICAL_CATEGORIES)
+        story.assessments["canonical"] = [a for a in selected if a in canonical]
+        story.assessments["dynamic"] = suggest_dynamic_assessments(story)
+        story.assessments["selected"] = selected
+        story.touch()
+
+    step3 = checkpoint.get("step3")
+    if step3:
+        by_assessment = {
+            a: [sub["name"] for sub in subs]
+            for a, subs in step3.get("subassessments_by_assessment", {}).items()
+        }
+        story.sub_assessments["by_assessment"] = by_assessment
+        story.sub_assessments["selected"] = by_assessment
+        story.touch()
+    return story
+
+async def run_prompt(item: Dict[str, str], out_dir: str, semaphore: asyncio.Semaphore) -> None:
+    ckpt_path = os.path.join(out_dir, "checkpoints", f"{item['id']}.json")
+    checkpoint = load_checkpoint(ckpt_path)
+    prompt = item["prompt"]
+
+    async with semaphore:
+        for step in STEPS:
+            if step in checkpoint:
+                continue
+            story = build_story(prompt, checkpoint)
+            if step == "step1":
+                env = ENVELOPES.step1_clarify(project_context=project_context_for(story), user_input=prompt)
+            elif step == "step2":
+                env = ENVELOPES.step2_assessment_toggle(
+                    project_context=project_context_for(story),
+                    user_input=prompt,
+                    canonical=CATALOG.envelope(),
+                )
+            else:
+                env = ENVELOPES.step3_subassessments(
+                    project_context=project_context_for(story),
+                    user_input=prompt,
+                    selected_assessments=story.assessments["selected"],
+                )
+            checkpoint[step] = await mentat_protocol.arun_step(env)
+            write_atomic(ckpt_path, json.dumps(checkpoint, indent=2))
+
+    story = build_story(prompt, checkpoint)
+    write_atomic(os.path.join(out_dir, f"{item['id']}.json"), export_json(story))
+
+async def run_batch(prompts: List[Dict[str, str]], out_dir: str, concurrency: int) -> Dict[str, str]:
+    os.makedirs(os.path.join(out_dir, "checkpoints"), exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(run_prompt(item, out_dir, semaphore) for item in prompts),
+        return_exceptions=True,
+    )
+    return {item["id"]: repr(r) for item, r in zip(prompts, results) if isinstance(r, Exception)}
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Steps 1–3 over a JSONL/CSV file of strategic prompts.")
+    parser.add_argument("input", help="JSONL or CSV file with a 'prompt' field")
+    parser.add_argument("--out", default="batch_output", help="output directory for stories and checkpoints")
+    parser.add_argument("--concurrency", type=int, default=4, help="prompts processed in parallel")
+    args = parser.parse_args(argv)
+
+    prompts = read_prompts(args.input)
+    failures = asyncio.run(run_batch(prompts, args.out, args.concurrency))
+
+    print(f"✅ {len(prompts) - len(failures)}/{len(prompts)} prompts completed → {args.out}")
+    for pid, err in failures.items():
+        print(f"❌ {pid}: {err}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Interaction latency of the Streamlit app, measured the way a browser sees it.
+
+Starts `streamlit run` against the mock model server, drives it over the
+app's websocket like the frontend does (widget states in, deltas out) and
+times each interaction from sending it to the server's `script_finished`.
+Fragment-scoped interactions are sent with their fragment id, exactly as the
+frontend sends them. Browser rendering time is not included; the first line
+is Streamlit's own floor, one toggle in an otherwise empty app.
+
+  python benchmarks/bench_app.py                  # app.py
+  python benchmarks/bench_app.py --app old_app.py --rounds 50
+
+The app file must live in the repository root (it loads icons/ relative to it).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'mentat-protocol'))
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from core.canonical import CATALOG
+from mentat_protocol.mock_server import start_mock_server
+
+DONE = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+        ForwardMsg.FINISHED_WITH_COMPILE_ERROR}
+WIDGETS = ("button", "text_input", "text_area", "checkbox", "selectbox", "download_button")
+
+# Clarification rounds submitted before measuring Step 1.5, so the transcript has some length
+TRANSCRIPT_ROUNDS = 6
+
+FLOOR_APP = """
+import streamlit as st
+st.toggle("t")
+"""
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class AppDriver:
+    """A minimal Streamlit frontend: remembers widgets by label and sends their states back."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.widgets: Dict[str, Tuple[str, str]] = {}   # label -> (widget id, fragment id)
+        self.values: Dict[str, WidgetState] = {}        # widget id -> last value sent
+        self.cache: Dict[str, ForwardMsg] = {}
+
+    async def send(self, widget: Optional[str] = None, **value) -> float:
+        """Set `widget` (by label) to `value` and rerun; seconds until the run finished."""
+        msg = BackMsg()
+        fragment = ""
+        trigger = None
+        if widget is not None:
+            wid, fragment = self.widgets[widget]
+            state = WidgetState(id=wid, **value)
+            if "trigger_value" in value:
+                trigger = state
+            else:
+                self.values[wid] = state
+        states = list(self.values.values()) + ([trigger] if trigger else [])
+        msg.rerun_script.widget_states.widgets.extend(states)
+        msg.rerun_script.fragment_id = fragment
+        start = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        await self._until_finished()
+        return time.perf_counter() - start
+
+    async def _until_finished(self) -> None:
+        while True:
+            raw = await self.conn.read_message()
+            if raw is None:
+                raise RuntimeError("server closed the connection")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            if fwd.WhichOneof("type") == "ref_hash":
+                fwd = self.cache[fwd.ref_hash]
+            elif fwd.hash:
+                self.cache[fwd.hash] = fwd
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                name = element.WhichOneof("type")
+                if name == "exception":
+                    raise RuntimeError(f"app raised: {element.exception.message}")
+                if name in WIDGETS:
+                    w = getattr(element, name)
+                    self.widgets[w.label] = (w.id, fwd.delta.fragment_id)
+            elif kind == "script_finished" and fwd.script_finished in DONE:
+                return
+
+def summarize(name: str, samples: List[float]) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    print(f"{name:<34}{statistics.median(ms):>9.1f}{p95:>9.1f}{len(ms):>6}")
+
+async def floor(port: int, rounds: int) -> None:
+    conn = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream")
+    app = AppDriver(conn)
+    await app.send()
+    summarize("streamlit floor: flip a toggle", [await app.send("t", bool_value=i % 2 == 0) for i in range(rounds)])
+    conn.close()
+
+async def scenario(port: int, rounds: int) -> None:
+    conn = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream")
+    app = AppDriver(conn)
+    await app.send()
+
+    await app.send("Start a New Project", trigger_value=True)
+    summarize("sidebar: type project name", [await app.send("Project Name:", string_value=f"Lab unit {i}")
+                                             for i in range(rounds)])
+    await app.send("Begin Project", trigger_value=True)
+
+    summarize("step 1: type prompt", [await app.send("", string_value=f"We are a laboratory products distributor, v{i}")
+                                      for i in range(rounds)])
+    await app.send("Submit Strategic Prompt", trigger_value=True)
+    for i in range(TRANSCRIPT_ROUNDS):
+        await app.send("", string_value=f"The deadline is the end of quarter {i}.")
+        await app.send("Submit Clarification", trigger_value=True)
+
+    summarize("step 1.5: type clarification", [await app.send("", string_value=f"Only the acute-care unit, v{i}")
+                                               for i in range(rounds)])
+    await app.send("", string_value="")
+    await app.send("Complete Step 1", trigger_value=True)
+
+    toggle = CATALOG.labels("external")[0]
+    summarize("step 2: flip a toggle", [await app.send(toggle, bool_value=i % 2 == 0) for i in range(rounds)])
+    conn.close()
+
+@contextlib.contextmanager
+def serve(app: str, env: Dict[str, str]):
+    """`streamlit run app` on a free port, run from the repository root; yields the port."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield port
+    finally:
+        server.terminate()
+        server.wait()
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="p50/p95 interaction latency of the Streamlit app")
+    parser.add_argument("--app", default="app.py", help="app file in the repository root")
+    parser.add_argument("--rounds", type=int, default=30, help="samples per interaction")
+    args = parser.parse_args(argv)
+
+    _, base_url = start_mock_server(latency="fixed:0")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "sk-bench", "MENTAT_WARM_UP": "0",
+               "WORKBENCH_STORE_PATH": os.path.join(tmp, "projects.sqlite3"),
+               "PYTHONPATH": os.pathsep.join([os.path.abspath(ROOT), os.path.join(os.path.abspath(ROOT), "mentat-protocol")])}
+        floor_app = os.path.join(tmp, "floor_app.py")
+        with open(floor_app, "w") as f:
+            f.write(FLOOR_APP)
+
+        print(f"{'interaction':<34}{'p50 ms':>9}{'p95 ms':>9}{'n':>6}")
+        with serve(floor_app, env) as port:
+            asyncio.run(floor(port, args.rounds))
+        with serve(args.app, env) as port:
+            asyncio.run(scenario(port, args.rounds))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
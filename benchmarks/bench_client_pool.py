@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Per-call latency against the local mock server: a fresh OpenAI client per call
+(the old _call_openai behaviour) vs. the shared pooled client.
+
+  python benchmarks/bench_client_pool.py [--calls 200] [--latency fixed:0]
+
+Plain HTTP on localhost, so this measures client construction and TCP setup
+only; against the real API the fresh-client path also pays a TLS handshake.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'mentat-protocol'))
+from openai import OpenAI
+from mentat_protocol import ENVELOPES
+from mentat_protocol.backends import get_client
+from mentat_protocol.client import _build_messages
+from mentat_protocol.config import MODEL, RESPONSE_FORMAT
+from mentat_protocol.mock_server import start_mock_server
+
+def timed_calls(make_client, messages, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        make_client().chat.completions.create(model=MODEL, messages=messages, response_format=RESPONSE_FORMAT)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def report(label: str, samples: list) -> None:
+    q = statistics.quantiles(samples, n=100)
+    print(f"{label:<22} p50 {q[49]:7.2f} ms   p95 {q[94]:7.2f} ms   mean {statistics.mean(samples):7.2f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", default="fixed:0")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(latency=args.latency)
+    messages = _build_messages(ENVELOPES.step1_clarify({"title": "Lab unit"}, "We are a lab products distributor."))
+    try:
+        fresh = timed_calls(lambda: OpenAI(api_key="mock", base_url=base_url), messages, args.calls)
+        pooled = timed_calls(lambda: get_client(api_key="mock", base_url=base_url), messages, args.calls)
+    finally:
+        server.shutdown()
+    report("fresh client per call", fresh)
+    report("pooled client", pooled)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Memory and round-trip cost of keeping many stories: StrategyStory vs the
+compact typed model, and the msgpack / JSON codecs.
+
+  python benchmarks/bench_compact.py            # 100k stories (a few minutes; tracemalloc is slow)
+  python benchmarks/bench_compact.py --n 10000
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.canonical import CANONICAL_EXTERNAL, CANONICAL_INTERNAL, CANONICAL_OPTIONAL, DEFAULT_SUBS
+from core.compact import CompactStory, dumps_json, dumps_msgpack, loads_json, loads_msgpack, read_msgpack, write_msgpack
+from core.story import StrategyStory
+
+INDUSTRIES = ["laboratory/healthcare", "industrial distribution", "specialty chemicals", "B2B software", "logistics"]
+GEOGRAPHIES = ["United States", "EU", "North America", "Global", "APAC"]
+HORIZONS = ["6-12 months", "12-24 months", "2-3 years"]
+OUTCOMES = ["Whether to divest", "How to restructure", "What to renegotiate", "Where to invest", "Which segments to exit"]
+
+def story_dicts(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    labels = CANONICAL_EXTERNAL + CANONICAL_INTERNAL + CANONICAL_OPTIONAL
+    out = []
+    for i in range(n):
+        selected = rng.sample(labels, rng.randint(3, 6))
+        subs = {a: list(DEFAULT_SUBS.get(a, ["Custom sub-assessment"])) for a in selected}
+        out.append({
+            "prompt": f"Story {i}: we are a {rng.choice(INDUSTRIES)} business weighing options for a unit. " * 3,
+            "clarifications": {
+                "focus_area": f"Business unit {i % 500}", "purpose": "Decide whether to retain or divest",
+                "industry": rng.choice(INDUSTRIES), "geography": rng.choice(GEOGRAPHIES),
+                "time_horizon": rng.choice(HORIZONS), "decision_outcomes": rng.sample(OUTCOMES, 3),
+            },
+            "assessments": {"canonical": list(selected), "dynamic": [], "selected": selected},
+            "sub_assessments": {"by_assessment": subs, "selected": {a: list(v) for a, v in subs.items()}},
+            "updated_at": "2026-01-01T00:00:00", "revision": rng.randint(1, 20),
+        })
+    return out
+
+def retained_mb(build: Callable[[], Any]) -> tuple[float, Any]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / 1e6, result
+
+def timed(fn: Callable[[], Any]) -> tuple[float, Any]:
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - started, result
+    finally:
+        gc.enable()
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="StrategyStory vs CompactStory at scale")
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    n = args.n
+
+    dicts = story_dicts(n)
+    # Every model is built from JSON text (fresh strings, as when loading from disk), so
+    # neither the input dicts nor string sharing with them count towards retained memory
+    raw = [json.dumps(d) for d in dicts]
+    del dicts
+
+    dict_mb, dicts = retained_mb(lambda: [json.loads(r) for r in raw])
+    story_mb, _ = retained_mb(lambda: [StrategyStory.from_dict(json.loads(r)) for r in raw])
+    compact_mb, compacts = retained_mb(lambda: [CompactStory.from_dict(json.loads(r)) for r in raw])
+
+    print(f"{n:,} stories — retained memory")
+    print(f"  plain dicts                 {dict_mb:8.1f} MB  ({dict_mb * 1e6 / n:,.0f} B/story)")
+    print(f"  StrategyStory               {story_mb:8.1f} MB  ({story_mb * 1e6 / n:,.0f} B/story)")
+    print(f"  CompactStory                {compact_mb:8.1f} MB  ({compact_mb * 1e6 / n:,.0f} B/story)")
+
+    rows = []
+    t, models = timed(lambda: [StrategyStory.from_dict(d) for d in dicts])
+    rows.append(("StrategyStory.from_dict", t))
+    t, _ = timed(lambda: [s.to_dict() for s in models])
+    rows.append(("StrategyStory.to_dict", t))
+    del models
+    t, _ = timed(lambda: [CompactStory.from_dict(d) for d in dicts])
+    rows.append(("CompactStory.from_dict", t))
+    t, _ = timed(lambda: [c.to_dict() for c in compacts])
+    rows.append(("CompactStory.to_dict", t))
+
+    t, packed = timed(lambda: [dumps_msgpack(c) for c in compacts])
+    rows.append(("msgpack encode", t))
+    t, decoded = timed(lambda: [loads_msgpack(b) for b in packed])
+    rows.append(("msgpack decode", t))
+    assert decoded == compacts
+
+    t, encoded = timed(lambda: [dumps_json(c) for c in compacts])
+    rows.append(("compact JSON encode", t))
+    t, decoded = timed(lambda: [loads_json(b) for b in encoded])
+    rows.append(("compact JSON decode", t))
+    assert decoded == compacts
+
+    t, dict_json = timed(lambda: [json.dumps(d) for d in dicts])
+    rows.append(("json.dumps(to_dict) baseline", t))
+    t, _ = timed(lambda: [json.loads(s) for s in dict_json])
+    rows.append(("json.loads baseline", t))
+    # Like for like with compact decode: text to a validated model
+    t, _ = timed(lambda: [StrategyStory.from_dict(json.loads(s)) for s in dict_json])
+    rows.append(("json.loads + StrategyStory", t))
+
+    buf = io.BytesIO()
+    t, _ = timed(lambda: write_msgpack(compacts, buf))
+    rows.append(("msgpack stream write", t))
+    buf.seek(0)
+    t, streamed = timed(lambda: sum(1 for _ in read_msgpack(buf)))
+    rows.append(("msgpack stream read", t))
+    assert streamed == n
+
+    print(f"\n{'round trip':<32}{'total s':>9}{'µs/story':>10}")
+    for name, t in rows:
+        print(f"{name:<32}{t:>9.2f}{t * 1e6 / n:>10.1f}")
+
+    size = lambda items: sum(len(b) for b in items) / 1e6
+    print(f"\nencoded size: dict JSON {size(s.encode() for s in dict_json):.1f} MB · "
+          f"compact JSON {size(encoded):.1f} MB · msgpack {size(packed):.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
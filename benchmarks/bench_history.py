@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Prompt size across clarification rounds, with and without history compaction.
+Exits non-zero if the compacted history grows past HISTORY_TOKEN_BUDGET, which
+it reaches around round 25; tests/test_history.py asserts the same bound.
+
+  python benchmarks/bench_history.py
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'mentat-protocol'))
+from mentat_protocol import ENVELOPES
+from mentat_protocol.client import _build_messages
+from mentat_protocol.config import HISTORY_TOKEN_BUDGET
+from mentat_protocol.history import estimate_tokens
+
+WELCOME = "### Welcome to the Strategy Workbench!\n\n" + "I'm here to help you structure your strategic analysis. " * 6
+
+def fake_step1_response(round_no: int) -> dict:
+    return {
+        "brief_summary": f"Round {round_no}: a lab products distributor weighing divestiture of its acute-care unit. " * 8,
+        "assumption_gaps": ["Margin by segment", "Contract terms"],
+        "clarifying_questions": ["Which segments are in scope?", "What is the deadline?"],
+        "defer_to_next_step_signal": False,
+        "initial_response": "Thank you for that clarification, but I still need a bit more detail.",
+        "focus_area": "Acute-care distribution unit",
+        "purpose": "Decide whether to retain or divest",
+        "industry": "laboratory/healthcare",
+        "geography": "United States",
+        "time_horizon": "12-24 months",
+        "decision_outcomes": ["Whether to divest", "How to restructure"],
+    }
+
+def prompt_tokens(history: list, compacted: bool) -> tuple[int, int]:
+    """(tokens for the whole prompt minus the system prompt, tokens for the history content alone)"""
+    env = ENVELOPES.step1_clarify({"title": "Lab unit"}, "More detail on the deadline.", history)
+    if not compacted:
+        # Pre-compaction behaviour: history sent verbatim as messages and again inside the envelope
+        env["conversation_history"] = history
+        messages = history + [{"role": "user", "content": str(env)}]
+    else:
+        messages = _build_messages(env)[1:]
+    sent_history = env["conversation_history"]
+    return (
+        sum(estimate_tokens(str(m)) for m in messages),
+        sum(estimate_tokens(m["content"]) for m in sent_history),
+    )
+
+def main(rounds: int = 40) -> int:
+    chat = [{"role": "assistant", "content": WELCOME}]
+    chat.append({"role": "user", "content": "We are a laboratory products distribution business considering options. " * 4})
+    worst = 0
+    print(f"{'round':>5}{'verbatim prompt':>18}{'compacted prompt':>19}{'history':>10}")
+    for r in range(1, rounds + 1):
+        resp = fake_step1_response(r)
+        chat.append({"role": "assistant", "content": resp["initial_response"], "full_response": resp})
+        chat.append({"role": "user", "content": f"Clarification {r}: the deadline is end of quarter {r}. " * 3})
+        raw, _ = prompt_tokens(chat[:-1], False)
+        compact, history = prompt_tokens(chat[:-1], True)
+        worst = max(worst, history)
+        print(f"{r:>5}{raw:>18}{compact:>19}{history:>10}")
+
+    print(f"max compacted history: {worst} tokens (budget {HISTORY_TOKEN_BUDGET})")
+    return 0 if worst <= HISTORY_TOKEN_BUDGET else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
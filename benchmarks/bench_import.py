@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Cold-start import times. Runs each import in a fresh interpreter with
+-X importtime, warns when one exceeds its budget and fails if it pulls in a
+heavy dependency that should only load on first use. Wall-clock budgets are
+too noisy to gate on; tests/test_imports.py checks the module sets.
+
+  python benchmarks/bench_import.py
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY = ("openai", "httpx", "jsonschema", "docx", "lxml")
+
+# (statement, budget in ms)
+CASES = [
+    ("import mentat_protocol", 15),
+    ("from mentat_protocol import run_step", 60),
+    ("import core.export", 25),
+]
+
+def import_ms(stmt: str) -> tuple[float, list]:
+    code = f"import sys; sys.path.append('mentat-protocol'); {stmt}; print(','.join(sorted(m for m in sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    # Sum the cumulative time of top-level imports triggered by the statement (not interpreter startup)
+    total_us, started = 0, False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not started and name.strip() in ("site",):
+            started = True
+            continue
+        if started and not name.startswith("  "):
+            total_us += int(cumulative)
+    loaded = [m for m in proc.stdout.strip().split(",") if m.split(".")[0] in HEAVY]
+    return total_us / 1000.0, loaded
+
+def main(runs: int = 5) -> int:
+    failed = False
+    for stmt, budget in CASES:
+        results = [import_ms(stmt) for _ in range(runs)]
+        best = min(ms for ms, _ in results)
+        heavy = sorted({m.split(".")[0] for _, loaded in results for m in loaded})
+        failed |= bool(heavy)
+        note = f"  heavy imports: {', '.join(heavy)}" if heavy else ""
+        mark = "❌" if heavy else "⚠️ " if best > budget else "✅"
+        print(f"{mark} {stmt:<40} {best:7.1f} ms (budget {budget} ms){note}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Per-response schema validation cost: compiled fast path vs. cached jsonschema
+validator vs. the old per-call jsonschema.validate().
+
+  python benchmarks/bench_validation.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'mentat-protocol'))
+from jsonschema import validate
+from mentat_protocol.client import SCHEMA_BY_STEP, validation_errors
+from mentat_protocol.validation import jsonschema_validator
+
+SAMPLES = {
+    "step_1_clarify": {
+        "brief_summary": "A lab products distributor is weighing a divestiture of its acute-care unit. " * 5,
+        "assumption_gaps": ["Margin by segment", "Contract terms", "Buyer appetite"],
+        "clarifying_questions": ["Which segments are in scope?"],
+        "defer_to_next_step_signal": False,
+        "initial_response": "I've analyzed your strategic situation.",
+        "focus_area": "Acute-care distribution unit",
+        "purpose": "Decide whether to retain or divest",
+        "industry": "laboratory/healthcare",
+        "geography": "United States",
+        "time_horizon": "12-24 months",
+        "decision_outcomes": ["Whether to divest", "How to restructure"],
+    },
+    "step_2_assessment_toggle": {
+        "brief_summary": "Customer dependency and margin structure dominate the decision.",
+        "recommended_assessments": [
+            {"id": f"a{i}", "label": f"Assessment {i}", "reason": "Relevant to the divestiture case", "priority": "high"}
+            for i in range(8)
+        ],
+        "clarifying_questions": [],
+        "defer_to_next_step_signal": True,
+    },
+    "step_3_subassessments": {
+        "brief_summary": "Sub-assessments per selected assessment.",
+        "subassessments_by_assessment": {
+            f"Assessment {i}": [
+                {"name": f"Sub {j}", "why_it_matters": "Drives valuation", "required_inputs": ["P&L", "Contracts"], "effort": "medium"}
+                for j in range(5)
+            ]
+            for i in range(6)
+        },
+        "clarifying_questions": [],
+        "defer_to_next_step_signal": True,
+    },
+}
+
+def main(number: int = 2000) -> None:
+    print(f"{'step':<28}{'fast (µs)':>12}{'cached js (µs)':>16}{'validate() (µs)':>17}")
+    for step, payload in SAMPLES.items():
+        schema = SCHEMA_BY_STEP[step]
+        compiled = jsonschema_validator(schema)
+        assert not validation_errors(step, payload)
+        fast = timeit.timeit(lambda: validation_errors(step, payload), number=number)
+        cached = timeit.timeit(lambda: list(compiled.iter_errors(payload)), number=number)
+        naive = timeit.timeit(lambda: validate(payload, schema), number=number // 10) * 10
+        print(f"{step:<28}{fast / number * 1e6:>12.1f}{cached / number * 1e6:>16.1f}{naive / number * 1e6:>17.1f}")
+
+if __name__ == "__main__":
+    main()
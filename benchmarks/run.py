@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Local-overhead benchmark suite for the protocol pipeline and exports, with the
+network replaced by an in-process backend.
+
+  python benchmarks/run.py                 # run and compare against baseline.json
+  python benchmarks/run.py --save          # run and overwrite baseline.json
+  python benchmarks/run.py -k docx         # only cases whose name contains "docx"
+
+Timings are compared after scaling the baseline by a reference loop measured
+in the same run, so the gate tracks the code rather than how fast the machine
+(or this moment on a shared one) is. Exits non-zero if any case is slower than
+the scaled baseline × --threshold and by more than --min-delta µs.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'mentat-protocol'))
+
+from core.canonical import (CATALOG, DYNAMIC_RULES, DynamicRules, suggest_dynamic_assessments,
+                            suggest_dynamic_assessments_batch)
+from core.export import _render_docx, _render_json, export_docx_bytes, story_fingerprint
+from core.priors import AssessmentPriors
+from core.ranker import SubAssessmentRanker, default_ranker
+from core.session import WorkbenchSession, encode_snapshot, restore
+from core.store import ProjectStore
+from core.story import StrategyStory
+from mentat_protocol import ENVELOPES, run_step
+from mentat_protocol.backends import Completion, set_backend
+from mentat_protocol.client import SCHEMA_BY_STEP, _build_messages, enforce_fields_only, validate_response
+from mentat_protocol.mock_server import example_for
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Slowdowns smaller than this (µs/op) are never flagged; sub-µs cases flap past any ratio
+MIN_DELTA_US = 5.0
+
+# Fixed JSON/dict/string work, the same kinds the cases do; timed with every run as the machine's yardstick
+REFERENCE_DOC = {"items": [{"id": i, "name": f"item {i}", "tags": ["alpha", "beta", "gamma"], "score": i / 7}
+                           for i in range(200)]}
+
+def reference() -> None:
+    json.loads(json.dumps(REFERENCE_DOC, sort_keys=True))
+
+CANONICAL = CATALOG.envelope()
+PROMPT = ("We are a laboratory products distribution business serving acute health systems. "
+          "Margins have compressed and we are weighing a sale, a contract renegotiation or a retain-and-optimize plan. ") * 3
+
+class CannedBackend:
+    """Returns prepared replies instantly; a reply list is served round-robin per step."""
+
+    def __init__(self, replies: Dict[str, List[str]]):
+        self.replies = replies
+        self.calls: Dict[str, int] = {}
+
+    def _next(self, messages) -> Completion:
+        step = json.loads(messages[-1]["content"])["step"]
+        n = self.calls.get(step, 0)
+        self.calls[step] = n + 1
+        options = self.replies[step]
+        return Completion(options[n % len(options)], {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0})
+
+    def complete(self, messages, model, temperature, response_format):
+        return self._next(messages)
+
+    def stream(self, messages, model, temperature, response_format):
+        yield self._next(messages).content, None
+
+    async def acomplete(self, messages, model, temperature, response_format):
+        return self._next(messages)
+
+def history(turns: int) -> List[Dict[str, Any]]:
+    msgs: List[Dict[str, Any]] = [{"role": "assistant", "content": "### Welcome to the Strategy Workbench!\n\n" + "Intro text. " * 40}]
+    reply = step1_reply()
+    for i in range(turns):
+        msgs.append({"role": "user", "content": f"Clarification {i}: " + "more detail on scope and timing. " * 6})
+        msgs.append({"role": "assistant", "content": reply["initial_response"], "full_response": reply})
+    return msgs
+
+def step1_reply() -> Dict[str, Any]:
+    env = ENVELOPES.step1_clarify({}, PROMPT)
+    reply = example_for(SCHEMA_BY_STEP["step_1_clarify"], "$", env)
+    reply["brief_summary"] = (PROMPT * 2)[:1000]
+    return reply
+
+def step3_reply(assessments: int, subs: int) -> Dict[str, Any]:
+    return {
+        "brief_summary": PROMPT[:900],
+        "subassessments_by_assessment": {
+            f"Assessment {a}": [
+                {"name": f"Sub-assessment {a}.{s}", "why_it_matters": "Drives the valuation and the negotiation position. " * 3,
+                 "required_inputs": ["P&L by segment", "Customer contracts", "Volume history"], "effort": "medium"}
+                for s in range(subs)
+            ]
+            for a in range(assessments)
+        },
+        "clarifying_questions": [],
+        "defer_to_next_step_signal": True,
+    }
+
+def story(assessments: int, subs: int) -> StrategyStory:
+    s = StrategyStory(prompt=PROMPT)
+    s.update_clarifications("Acute-care distribution unit", "Decide whether to retain or divest", "laboratory/healthcare",
+                            "United States", "12-24 months", ["Whether to divest", "How to restructure", "What to renegotiate"])
+    labels = [f"Assessment {a}" for a in range(assessments)]
+    s.assessments.update({"canonical": labels, "dynamic": [], "selected": labels})
+    by = {a: [f"Sub-assessment {a}.{i}" for i in range(subs)] for a in labels}
+    s.sub_assessments.update({"by_assessment": by, "selected": by})
+    return s
+
+def build_cases() -> Dict[str, Callable[[], Any]]:
+    history10, history50 = history(10), history(50)
+    env1 = ENVELOPES.step1_clarify({"title": "Lab unit"}, PROMPT, history10)
+    env1_stress = ENVELOPES.step1_clarify({"title": "Lab unit"}, PROMPT, history50)
+    env3 = ENVELOPES.step3_subassessments({"title": "Lab unit"}, PROMPT, [f"Assessment {a}" for a in range(10)])
+    r1, r3, r3_stress = step1_reply(), step3_reply(3, 3), step3_reply(10, 10)
+    r1_text, r3_stress_text = json.dumps(r1), json.dumps(r3_stress)
+    s_real, s_stress = story(4, 3), story(10, 10)
+    d_stress = s_stress.to_dict()
+    s_touch = story(10, 10)
+
+    stories1000 = [story(4, 3) for _ in range(1000)]
+    # Synthetic rule table at the size the catalog is expected to grow to
+    rules400 = DynamicRules(DYNAMIC_RULES + [(f, (f"kw{i}a", f"kw{i}b", f"kw{i}c"), f"Dynamic {i}")
+                                             for i, f in enumerate(["prompt", "industry", "purpose"] * 132)])
+
+    store = ProjectStore(":memory:")
+    store.bulk_insert((f"p{i}", f"Project {i}", story(4, 3)) for i in range(2000))
+    store.save("p0", "Project 0", s_real, history10)
+
+    ranker = default_ranker()
+    ranker_2000 = SubAssessmentRanker.from_catalog(CATALOG, store.iter_stories())
+
+    labels = CATALOG.labels()
+    priors = AssessmentPriors.build(({"clarifications": s_real.clarifications,
+                                      "assessments": {"selected": [labels[i % len(labels)], labels[(i * 7) % len(labels)]]}}
+                                     for i in range(2000)), CATALOG)
+
+    env2 = ENVELOPES.step2_assessment_toggle({"title": "Lab unit"}, PROMPT, CANONICAL)
+    r2 = example_for(SCHEMA_BY_STEP["step_2_assessment_toggle"], "$", env2)
+
+    # A session finished through Step 3 after ten clarification turns
+    session = WorkbenchSession("s0", "p0", "Project 0", True, story=s_real, chat_messages=history10, current_step=3,
+                               mentat_response=r1, step2_initialized=True, step2_response=r2,
+                               sub_assessments_generated=r3["subassessments_by_assessment"])
+    snapshot = session.snapshot()
+    store.save_snapshot(session.id, session.project_id, encode_snapshot(snapshot))
+    # step_2 replies alternate structurally invalid / valid, so every call takes the retry path
+    set_backend(CannedBackend({
+        "step_1_clarify": [r1_text],
+        "step_2_assessment_toggle": [json.dumps({"brief_summary": "missing fields"}), json.dumps(r2)],
+        "step_3_subassessments": [r3_stress_text],
+    }))
+
+    return {
+        "envelope.step1_history10": lambda: ENVELOPES.step1_clarify({"title": "Lab unit"}, PROMPT, history10),
+        "envelope.step1_history50": lambda: ENVELOPES.step1_clarify({"title": "Lab unit"}, PROMPT, history50),
+        "envelope.step2": lambda: ENVELOPES.step2_assessment_toggle({"title": "Lab unit"}, PROMPT, CANONICAL),
+        "envelope.step3": lambda: ENVELOPES.step3_subassessments({"title": "Lab unit"}, PROMPT, [f"Assessment {a}" for a in range(10)]),
+        "messages.step1_history10": lambda: _build_messages(env1),
+        "messages.step1_history50": lambda: _build_messages(env1_stress),
+        "dumps.envelope_history50": lambda: json.dumps(env1_stress),
+        "loads.step1_reply": lambda: json.loads(r1_text),
+        "loads.step3_reply_10x10": lambda: json.loads(r3_stress_text),
+        "enforce_fields.step1": lambda: enforce_fields_only(r1, env1["fields"]),
+        "validate.step1": lambda: validate_response("step_1_clarify", r1),
+        "validate.step3_3x3": lambda: validate_response("step_3_subassessments", r3),
+        "validate.step3_10x10": lambda: validate_response("step_3_subassessments", r3_stress),
+        "run_step.step1_history10": lambda: run_step(env1, use_cache=False),
+        "run_step.step3_10x10": lambda: run_step(env3, use_cache=False),
+        "run_step.retry_path": lambda: run_step(env2, use_cache=False),
+        "store.load_history10": lambda: store.load("p0"),
+        "store.list_page_by_assessment": lambda: store.list_projects(assessment="Assessment 1", limit=20),
+        "store.search_prompt_2000": lambda: store.search(PROMPT, limit=5),
+        "session.snapshot_history10": lambda: session.snapshot(),
+        "session.encode_history10": lambda: encode_snapshot(snapshot),
+        "session.restore_history10": lambda: restore(store, session_id="s0"),
+        "catalog.resolve_step2": lambda: [CATALOG.resolve(item) for item in r2["recommended_assessments"]],
+        "catalog.sidebar_marks": lambda: [a in selected for selected in [set(s_real.assessments["selected"])]
+                                          for a in CATALOG.labels("external", "internal")],
+        "priors.rank_step1": lambda: priors.rank(s_real.clarifications),
+        "ranker.subs_catalog": lambda: ranker.rank(PROMPT, 3, focus="Supplier concentration risk"),
+        "ranker.subs_enriched_2000": lambda: ranker_2000.rank(PROMPT, 3, focus="Supplier concentration risk"),
+        "rules.dynamic_single": lambda: suggest_dynamic_assessments(s_real),
+        "rules.dynamic_400rules": lambda: rules400.match(s_real),
+        "rules.dynamic_batch1000": lambda: suggest_dynamic_assessments_batch(stories1000),
+        "story.to_dict_10x10": lambda: s_stress.to_dict(),
+        "story.from_dict_10x10": lambda: StrategyStory.from_dict(d_stress),
+        "story.touch_unchanged_10x10": lambda: s_stress.touch(),
+        "story.touch_prompt_edit_10x10": lambda: (setattr(s_touch, "prompt", s_touch.prompt[::-1]), s_touch.touch()),
+        "export.json_realistic": lambda: _render_json(s_real),
+        "export.json_10x10": lambda: _render_json(s_stress),
+        "export.docx_realistic": lambda: _render_docx(s_real),
+        "export.docx_10x10": lambda: _render_docx(s_stress),
+        "export.fingerprint_10x10": lambda: story_fingerprint(s_stress),
+        "export.docx_memo_hit_10x10": lambda: export_docx_bytes(s_stress),
+    }
+
+def measure(fn: Callable[[], Any], min_time: float = 0.3, repeats: int = 7) -> float:
+    """Best seconds per call over `repeats` batches, together taking about min_time.
+
+    The minimum is the least noisy estimate on shared machines; GC is paused while timing.
+    """
+    fn()
+    number, elapsed = 1, 0.0
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5 or number >= 1_000_000:
+            break
+        number *= 2
+    number = max(1, int(number * (min_time / repeats) / max(elapsed, 1e-9)))
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        gc.enable()
+    return min(samples)
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float,
+            min_delta: float = MIN_DELTA_US * 1e-6, scale: float = 1.0) -> List[Tuple[str, float]]:
+    """(name, ratio) of cases slower than their baseline, after scaling it by this machine's speed."""
+    return [(name, t / (baseline[name] * scale)) for name, t in results.items()
+            if name in baseline and t > baseline[name] * scale * threshold and t - baseline[name] * scale > min_delta]
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mentat local-overhead benchmarks")
+    parser.add_argument("-k", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown factor vs. baseline")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_US, help="ignore slowdowns below this many µs/op")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    saved: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+    baseline: Dict[str, float] = saved.get("results", {})
+
+    ref = measure(reference)
+    # Baselines saved without a reference are compared as recorded
+    scale = ref / saved["reference"] if saved.get("reference") else 1.0
+    print(f"reference loop {ref * 1e6:.1f} µs/op · baselines scaled ×{scale:.2f}")
+
+    results: Dict[str, float] = {}
+    print(f"{'case':<30}{'µs/op':>12}{'baseline':>12}{'ratio':>8}")
+    for name, fn in build_cases().items():
+        if args.k not in name:
+            continue
+        results[name] = measure(fn)
+        base = baseline.get(name, 0.0) * scale
+        ratio = f"{results[name] / base:.2f}" if base else "—"
+        print(f"{name:<30}{results[name] * 1e6:>12.1f}{base * 1e6:>12.1f}{ratio:>8}")
+
+    if args.save:
+        # Cases not run this time keep their old numbers, rescaled to this run's reference
+        merged = {**{k: v * scale for k, v in baseline.items()}, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "reference": ref,
+                       "results": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline → {args.baseline}")
+        return 0
+
+    # Re-measure suspected regressions once, longer, to filter out scheduler noise
+    cases = build_cases()
+    min_delta = args.min_delta * 1e-6
+    for name, _ in compare(results, baseline, args.threshold, min_delta, scale):
+        results[name] = min(results[name], measure(cases[name], min_time=1.0))
+    regressions = compare(results, baseline, args.threshold, min_delta, scale)
+    for name, ratio in regressions:
+        print(f"❌ {name}: {ratio:.2f}× slower than the scaled baseline (threshold {args.threshold}×)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
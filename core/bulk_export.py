@@ -0,0 +1,157 @@
+"""
+Bulk export of stored StrategyStory JSON files into a single zip review pack.
+
+  python -m core.bulk_export stories/ more/story.json --out review_pack.zip --workers 8 --json
+
+Documents are rendered in a process pool and written into the zip as they
+complete, with at most `max_in_flight` rendered documents held in memory.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from .export import _render_docx, _render_json
+from .story import StrategyStory
+
+@dataclass
+class BulkExportReport:
+    total: int = 0
+    exported: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+    bytes_written: int = 0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.exported / self.seconds if self.seconds else 0.0
+
+def iter_story_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand directories to the *.json files inside them (recursively, sorted)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".json"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def render_story_file(path: str, include_json: bool = False) -> Tuple[bytes, str | None]:
+    """Worker: load one story file and return (docx bytes, json text or None)."""
+    with open(path, encoding="utf-8") as f:
+        story = StrategyStory.from_dict(json.load(f))
+    # Each document is rendered once, so skip the export memo cache
+    return _render_docx(story), (_render_json(story) if include_json else None)
+
+def bulk_export(
+    paths: Iterable[str],
+    out_zip: str,
+    workers: int | None = None,
+    include_json: bool = False,
+    max_in_flight: int | None = None,
+    on_progress: Callable[[BulkExportReport], None] | None = None,
+) -> BulkExportReport:
+    """Render every story file to DOCX (and optionally JSON) into `out_zip`.
+
+    Failures are collected per file in the report instead of aborting the run.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    report = BulkExportReport()
+    names: Set[str] = set()
+    started = time.perf_counter()
+
+    # Names are assigned in input order, before rendering, so duplicates get the same suffix on every run
+    def arcname(path: str) -> str:
+        base = os.path.splitext(os.path.basename(path))[0]
+        name, n = base, 1
+        while name in names:
+            n += 1
+            name = f"{base}-{n}"
+        names.add(name)
+        return name
+
+    def write(zf: zipfile.ZipFile, name: str, result: Tuple[bytes, str | None]) -> None:
+        docx, text = result
+        # DOCX is already deflated internally; storing it avoids compressing twice
+        zf.writestr(f"{name}.docx", docx, compress_type=zipfile.ZIP_STORED)
+        report.bytes_written += len(docx)
+        if text is not None:
+            zf.writestr(f"{name}.json", text, compress_type=zipfile.ZIP_DEFLATED)
+            report.bytes_written += len(text)
+        report.exported += 1
+
+    def fail(path: str, exc: BaseException) -> None:
+        report.failures[path] = f"{type(exc).__name__}: {exc}"
+
+    def progress() -> None:
+        report.seconds = time.perf_counter() - started
+        if on_progress:
+            on_progress(report)
+
+    with zipfile.ZipFile(out_zip, "w") as zf:
+        if workers == 1:
+            for path in paths:
+                report.total += 1
+                name = arcname(path)
+                try:
+                    write(zf, name, render_story_file(path, include_json))
+                except Exception as exc:
+                    fail(path, exc)
+                progress()
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Dict[Future, Tuple[str, str]] = {}
+
+                def drain(block_until: int) -> None:
+                    # Write finished documents until fewer than block_until are in flight
+                    while len(pending) >= block_until and pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            path, name = pending.pop(fut)
+                            try:
+                                write(zf, name, fut.result())
+                            except Exception as exc:
+                                fail(path, exc)
+                            progress()
+
+                for path in paths:
+                    report.total += 1
+                    pending[pool.submit(render_story_file, path, include_json)] = (path, arcname(path))
+                    drain(max_in_flight)
+                drain(1)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export stored StrategyStory JSON files into a zip of DOCX documents.")
+    parser.add_argument("paths", nargs="+", help="story JSON files or directories containing them")
+    parser.add_argument("--out", default="strategy_stories.zip", help="zip archive to write")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count; 1 = in-process)")
+    parser.add_argument("--json", action="store_true", help="also include each story's JSON export")
+    args = parser.parse_args(argv)
+
+    def show(report: BulkExportReport) -> None:
+        done = report.exported + len(report.failures)
+        print(f"\r{done} documents · {report.docs_per_second:.1f} docs/s", end="", flush=True)
+
+    report = bulk_export(iter_story_files(args.paths), args.out, workers=args.workers,
+                         include_json=args.json, on_progress=show)
+    print()
+    print(f"✅ {report.exported}/{report.total} exported → {args.out} "
+          f"({report.bytes_written / 1e6:.1f} MB in {report.seconds:.1f}s, {report.docs_per_second:.1f} docs/s)")
+    for path, err in report.failures.items():
+        print(f"❌ {path}: {err}")
+    return 1 if report.failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
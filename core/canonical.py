@@ -1,118 +1,228 @@
-from typing import List, Dict
+import re
+from bisect import bisect_right
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
+from core.catalog import CANONICAL_CATEGORIES, AssessmentCatalog, assessment
 from core.story import StrategyStory
 
-CANONICAL_EXTERNAL = [
-    "Market size & demand growth",
-    "Competitive intensity",
-    "Customer adoption/dependency",
-    "Regulatory/contracting environment",
-]
-
-CANONICAL_INTERNAL = [
-    "Profitability & cost structure",
-    "Capabilities / Fit with core business",
-    "Organizational readiness",
-]
-
-CANONICAL_OPTIONAL = [
-    "Bargaining leverage potential",
-    "Strategic optionality",
-    "Partnerships / Ecosystem / Brand / Talent",
-]
-
-def canonical_all() -> List[str]:
-    return CANONICAL_EXTERNAL + CANONICAL_INTERNAL + CANONICAL_OPTIONAL
-
-def suggest_dynamic_assessments(story: StrategyStory) -> List[str]:
-    dynamic: List[str] = []
-    prompt = (story.prompt or "").lower()
-    industry = (story.clarifications.get("industry") or "").lower()
-    purpose = (story.clarifications.get("purpose") or "").lower()
-
-    if any(k in prompt for k in ["divest", "sale", "spin", "carve"]):
-        dynamic.append("Buyer landscape & valuation drivers")
-    if any(k in prompt for k in ["negotia", "leverage", "contract"]):
-        dynamic.append("Negotiation leverage mapping")
-    if any(k in industry for k in ["health", "lab", "medical", "biotech"]):
-        dynamic.append("Quality & compliance implications")
-    if any(k in purpose for k in ["moat", "advantage", "defensible"]):
-        dynamic.append("Differentiation & defensibility levers")
-
-    seen = set(canonical_all())
-    return [d for d in dynamic if d not in seen]
-
-DEFAULT_SUBS: Dict[str, List[str]] = {
-    "Market size & demand growth": [
+# Assessment ids are part of the STEP2 contract; never rename or reuse one
+CATALOG = AssessmentCatalog([
+    assessment("market_size", "external", "Market size & demand growth", [
         "Segment growth rates",
         "Price/mix stability",
         "Structural shifts (consolidation, automation)",
-    ],
-    "Competitive intensity": [
+    ]),
+    assessment("competition", "external", "Competitive intensity", [
         "Share of top competitors",
         "Entry/exit dynamics",
         "Price-based vs. service-based competition",
-    ],
-    "Customer adoption/dependency": [
+    ]),
+    assessment("customer_dependency", "external", "Customer adoption/dependency", [
         "Revenue concentration",
         "Criticality of category to operations",
         "Switching costs & substitution risk",
-    ],
-    "Regulatory/contracting environment": [
+    ]),
+    assessment("regulatory", "external", "Regulatory/contracting environment", [
         "Contract term constraints",
         "Compliance cost footprint",
         "Regulatory outlook (2–3y)",
-    ],
-    "Profitability & cost structure": [
+    ]),
+    assessment("profitability", "internal", "Profitability & cost structure", [
         "Contribution margin by segment",
         "Fixed vs. variable allocation",
         "Logistics & service cost drivers",
-    ],
-    "Capabilities / Fit with core business": [
+    ]),
+    assessment("capability_fit", "internal", "Capabilities / Fit with core business", [
         "Strategic synergies (volume, suppliers)",
         "Distraction vs. capability building",
         "Alignment with brand & focus",
         "Customer needs vs. internal capability gap",
-    ],
-    "Organizational readiness": [
+    ]),
+    assessment("org_readiness", "internal", "Organizational readiness", [
         "Systems & data separation",
         "Legal/contract unwind risk",
         "Change management capacity",
-    ],
-    "Bargaining leverage potential": [
+    ]),
+    assessment("bargaining_leverage", "optional", "Bargaining leverage potential", [
         "Supplier leverage from combined volumes",
         "Customer dependency if exited",
         "Cross-leverage in broader contracts",
-    ],
-    "Strategic optionality": [
+    ]),
+    assessment("optionality", "optional", "Strategic optionality", [
         "Retain & optimize scenario",
         "Divestiture/Buyer types & multiples",
         "JV/partnership alternative",
         "Cost of historical underinvestment",
-    ],
-    "Partnerships / Ecosystem / Brand / Talent": [
+    ]),
+    assessment("partnerships", "optional", "Partnerships / Ecosystem / Brand / Talent", [
         "Required partners for scale",
         "Brand credibility with target buyers",
         "Talent availability for key roles",
-    ],
-    "Buyer landscape & valuation drivers": [
+    ]),
+    assessment("buyer_landscape", "dynamic", "Buyer landscape & valuation drivers", [
         "Strategic buyers vs. financial buyers",
         "Synergy narratives",
         "DCF vs. market comps sensitivities",
-    ],
-    "Negotiation leverage mapping": [
+    ]),
+    assessment("negotiation_leverage", "dynamic", "Negotiation leverage mapping", [
         "BATNA analysis (us vs. counterpart)",
-    ],
-    "Quality & compliance implications": [
+    ]),
+    assessment("quality_compliance", "dynamic", "Quality & compliance implications", [
         "Accreditation/quality dependencies",
         "Audit exposure",
         "Cost of non-compliance risk",
-    ],
-    "Differentiation & defensibility levers": [
+    ]),
+    assessment("defensibility", "dynamic", "Differentiation & defensibility levers", [
         "Proprietary data/processes",
         "Switching costs & workflow embedding",
         "Speed/experience advantages",
-    ],
-}
+    ]),
+])
+
+CANONICAL_EXTERNAL = list(CATALOG.labels("external"))
+CANONICAL_INTERNAL = list(CATALOG.labels("internal"))
+CANONICAL_OPTIONAL = list(CATALOG.labels("optional"))
+
+def canonical_all() -> List[str]:
+    return list(CATALOG.labels(*CANONICAL_CATEGORIES))
+
+# Dynamic assessment rules: (story field, keywords, assessment). A rule fires when any keyword
+# occurs (case-insensitive substring) in the field; "prompt" is story.prompt, anything else a clarification.
+DYNAMIC_RULES: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("prompt", ("divest", "sale", "spin", "carve"), "Buyer landscape & valuation drivers"),
+    ("prompt", ("negotia", "leverage", "contract"), "Negotiation leverage mapping"),
+    ("industry", ("health", "lab", "medical", "biotech"), "Quality & compliance implications"),
+    ("purpose", ("moat", "advantage", "defensible"), "Differentiation & defensibility levers"),
+]
+
+# Fields with fewer distinct keywords are checked with plain substring tests, which beat
+# any regex at that size; larger ones get a single trie-shaped regex scan
+SCAN_MIN_KEYWORDS = 24
+
+# Separates stories when a batch is scanned as one string; keywords never contain it
+_BATCH_SEP = "\x00"
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    # Alternation factored by common prefix, so the regex engine branches once per character
+    # instead of trying every keyword at every position
+    root: Dict[str, Any] = {}
+    for kw in keywords:
+        node = root
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 and "" not in node else "(?:" + "|".join(alts) + ")"
+        return body + ("?" if "" in node else "")
+
+    return build(root)
+
+class DynamicRules:
+    """DYNAMIC_RULES compiled once: keywords deduplicated per field and, for large tables, one regex per field."""
+
+    def __init__(self, rules: List[Tuple[str, Tuple[str, ...], str]], exclude: Iterable[str] = ()):
+        self.assessments = [assessment for _, _, assessment in rules]
+        self.exclude = frozenset(exclude)
+        # field -> (regex or None, keyword -> indices of the rules it fires)
+        self.fields: Dict[str, Tuple["re.Pattern[str] | None", Dict[str, FrozenSet[int]]]] = {}
+
+        by_field: Dict[str, Dict[str, Set[int]]] = {}
+        for i, (field, keywords, _) in enumerate(rules):
+            for kw in keywords:
+                by_field.setdefault(field, {}).setdefault(kw.lower(), set()).add(i)
+
+        for field, keyword_rules in by_field.items():
+            if len(keyword_rules) < SCAN_MIN_KEYWORDS:
+                self.fields[field] = (None, {kw: frozenset(ids) for kw, ids in keyword_rules.items()})
+                continue
+            # The scan reports the longest keyword at each match start; every keyword contained
+            # in it occurs too, so a match fires the rules of all its substrings
+            fires = {kw: frozenset(i for other, ids in keyword_rules.items() if other in kw for i in ids)
+                     for kw in keyword_rules}
+            self.fields[field] = (re.compile(_trie_pattern(keyword_rules)), fires)
+
+    def _text(self, story: StrategyStory, field: str) -> str:
+        value = story.prompt if field == "prompt" else story.clarifications.get(field)
+        return (value or "").lower()
+
+    def _scan(self, pattern: "re.Pattern[str]", fires: Dict[str, FrozenSet[int]], text: str) -> Iterator[Tuple[int, FrozenSet[int]]]:
+        # Resume one character past each match start, so overlapping keywords are found too
+        m = pattern.search(text)
+        while m:
+            yield m.start(), fires[m.group()]
+            m = pattern.search(text, m.start() + 1)
+
+    def _suggestions(self, fired: Set[int]) -> List[str]:
+        out: List[str] = []
+        for i in sorted(fired):
+            a = self.assessments[i]
+            if a not in self.exclude and a not in out:
+                out.append(a)
+        return out
+
+    def match(self, story: StrategyStory) -> List[str]:
+        fired: Set[int] = set()
+        for field, (pattern, fires) in self.fields.items():
+            text = self._text(story, field)
+            if not text:
+                continue
+            if pattern is None:
+                for kw, ids in fires.items():
+                    if kw in text:
+                        fired |= ids
+            else:
+                for _, ids in self._scan(pattern, fires, text):
+                    fired |= ids
+        return self._suggestions(fired)
+
+    def match_many(self, stories: List[StrategyStory]) -> List[List[str]]:
+        """Suggestions for each story; regex fields are scanned once across the whole batch."""
+        fired: List[Set[int]] = [set() for _ in stories]
+        for field, (pattern, fires) in self.fields.items():
+            texts = [self._text(s, field) for s in stories]
+            if pattern is None:
+                for kw, ids in fires.items():
+                    for f, text in zip(fired, texts):
+                        if kw in text:
+                            f |= ids
+                continue
+            starts, pos = [], 0
+            for t in texts:
+                starts.append(pos)
+                pos += len(t) + len(_BATCH_SEP)
+            for start, ids in self._scan(pattern, fires, _BATCH_SEP.join(texts)):
+                fired[bisect_right(starts, start) - 1] |= ids
+        return [self._suggestions(f) for f in fired]
+
+_dynamic_rules: DynamicRules | None = None
+
+def dynamic_rules() -> DynamicRules:
+    # Compiled on first use; rebuild with DynamicRules(...) after changing DYNAMIC_RULES at runtime
+    global _dynamic_rules
+    if _dynamic_rules is None:
+        _dynamic_rules = DynamicRules(DYNAMIC_RULES, exclude=CATALOG.label_set(*CANONICAL_CATEGORIES))
+    return _dynamic_rules
+
+def suggest_dynamic_assessments(story: StrategyStory) -> List[str]:
+    return dynamic_rules().match(story)
+
+def suggest_dynamic_assessments_batch(stories: List[StrategyStory]) -> List[List[str]]:
+    return dynamic_rules().match_many(stories)
+
+DEFAULT_SUBS: Dict[str, List[str]] = {a.label: list(a.sub_labels) for a in CATALOG.entries if a.subs}
+
+GENERIC_SUBS = ["Define scope", "Identify KPIs", "Data sources & timeline"]
 
-def suggest_subassessments_for(assessment: str) -> List[str]:
-    return DEFAULT_SUBS.get(assessment, ["Define scope", "Identify KPIs", "Data sources & timeline"])
+def suggest_subassessments_for(assessment: str, context: str = "", k: int = 3) -> List[str]:
+    """Catalog defaults, else the k catalog sub-assessments closest to the assessment and `context` (prompt, clarifications)."""
+    subs = CATALOG.subs_for(assessment)
+    if subs:
+        return list(subs)
+    try:
+        from core.ranker import default_ranker  # needs numpy
+    except ImportError:
+        return list(GENERIC_SUBS)
+    return [sub for _, sub, _ in default_ranker().rank(context, k, focus=assessment)] or list(GENERIC_SUBS)
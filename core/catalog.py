@@ -0,0 +1,127 @@
+"""
+Immutable catalog of assessments and their default sub-assessments.
+
+Every assessment has a stable id (part of the STEP2 contract: the model is
+shown ids and asked to return them) and every sub-assessment an id derived
+from its parent's id and its label. Lookups by id, label and category are
+dict hits; label tuples and sets per category are built once.
+
+The catalog's version is a digest of its content, so anything persisted with
+ids (stores, checkpoints) can tell which catalog it was resolved against.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+# Category order as presented to the model and in the sidebar
+CATEGORIES = ("external", "internal", "optional", "dynamic")
+# Categories offered to the model as the canonical set in STEP2
+CANONICAL_CATEGORIES = ("external", "internal", "optional")
+
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+def slug(label: str) -> str:
+    return _SLUG.sub("-", label.lower()).strip("-")
+
+@dataclass(frozen=True, slots=True)
+class SubAssessment:
+    id: str
+    label: str
+    assessment_id: str
+
+@dataclass(frozen=True, slots=True)
+class Assessment:
+    id: str
+    category: str
+    label: str
+    subs: Tuple[SubAssessment, ...] = ()
+
+    @property
+    def sub_labels(self) -> Tuple[str, ...]:
+        return tuple(s.label for s in self.subs)
+
+def assessment(id: str, category: str, label: str, subs: Iterable[str] = ()) -> Assessment:
+    """Catalog entry; sub-assessment ids are `<assessment id>.<label slug>`."""
+    return Assessment(id, category, label, tuple(SubAssessment(f"{id}.{slug(s)}", s, id) for s in subs))
+
+class AssessmentCatalog:
+    __slots__ = ("entries", "version", "_by_id", "_by_label", "_subs_by_id", "_labels", "_ids", "_label_sets")
+
+    def __init__(self, entries: Iterable[Assessment], version: Optional[str] = None):
+        self.entries: Tuple[Assessment, ...] = tuple(entries)
+        by_id: Dict[str, Assessment] = {}
+        by_label: Dict[str, Assessment] = {}
+        subs_by_id: Dict[str, SubAssessment] = {}
+        for a in self.entries:
+            if a.category not in CATEGORIES:
+                raise ValueError(f"{a.id}: unknown category {a.category!r}")
+            if a.id in by_id or a.label in by_label:
+                raise ValueError(f"duplicate assessment: {a.id} / {a.label!r}")
+            by_id[a.id] = by_label[a.label] = a
+            for s in a.subs:
+                if s.id in subs_by_id:
+                    raise ValueError(f"duplicate sub-assessment id: {s.id}")
+                subs_by_id[s.id] = s
+        self._by_id = MappingProxyType(by_id)
+        self._by_label = MappingProxyType(by_label)
+        self._subs_by_id = MappingProxyType(subs_by_id)
+        self._labels = {c: tuple(a.label for a in self.entries if a.category == c) for c in CATEGORIES}
+        self._ids = {c: tuple(a.id for a in self.entries if a.category == c) for c in CATEGORIES}
+        self._label_sets = {c: frozenset(labels) for c, labels in self._labels.items()}
+        self.version = version or hashlib.sha256(
+            repr([(a.id, a.category, a.label, a.sub_labels) for a in self.entries]).encode("utf-8")).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_id or key in self._by_label
+
+    def get(self, key: str) -> Optional[Assessment]:
+        """Assessment by id or exact label."""
+        return self._by_id.get(key) or self._by_label.get(key)
+
+    def label_for(self, id: str) -> Optional[str]:
+        a = self._by_id.get(id)
+        return a.label if a else None
+
+    def id_for(self, label: str) -> Optional[str]:
+        a = self._by_label.get(label)
+        return a.id if a else None
+
+    def category_of(self, key: str) -> Optional[str]:
+        a = self.get(key)
+        return a.category if a else None
+
+    def labels(self, *categories: str) -> Tuple[str, ...]:
+        if len(categories) == 1:
+            return self._labels[categories[0]]
+        return tuple(label for c in (categories or CATEGORIES) for label in self._labels[c])
+
+    def ids(self, *categories: str) -> Tuple[str, ...]:
+        if len(categories) == 1:
+            return self._ids[categories[0]]
+        return tuple(i for c in (categories or CATEGORIES) for i in self._ids[c])
+
+    def label_set(self, *categories: str) -> FrozenSet[str]:
+        if len(categories) == 1:
+            return self._label_sets[categories[0]]
+        return frozenset(self.labels(*categories))
+
+    def sub(self, id: str) -> Optional[SubAssessment]:
+        return self._subs_by_id.get(id)
+
+    def subs_for(self, key: str) -> Tuple[str, ...]:
+        a = self.get(key)
+        return a.sub_labels if a else ()
+
+    def resolve(self, item: Mapping[str, Any]) -> Optional[Assessment]:
+        """Catalog entry for a STEP2 `recommended_assessments` item: by id, else by exact label."""
+        return self._by_id.get(item.get("id") or "") or self._by_label.get(item.get("label") or "")
+
+    def envelope(self, categories: Tuple[str, ...] = CANONICAL_CATEGORIES) -> Dict[str, List[Dict[str, str]]]:
+        """The STEP2 `canonical` block: [{id, label}] per category."""
+        return {c: [{"id": a.id, "label": a.label} for a in self.entries if a.category == c] for c in categories}
@@ -0,0 +1,224 @@
+"""
+Compact, typed, read-only StrategyStory representation for bulk analytics.
+
+CompactStory uses slotted frozen dataclasses with tuples instead of nested
+dicts and lists, and interns repeated labels. Codecs:
+
+  dumps_msgpack / loads_msgpack          one story ⇄ bytes (needs msgpack)
+  write_msgpack / read_msgpack           a stream of stories in one file
+  dumps_json / loads_json                positional JSON (orjson when installed)
+
+Both codecs encode the same positional row (see to_row), not the dict form.
+
+The win is size: about a quarter of the retained memory of StrategyStory or
+plain dicts, and encodings 12-18% smaller than dict JSON. Decoding is not
+faster than a bare json.loads, because it also validates, interns and builds
+the typed objects; it is only ahead of json.loads + StrategyStory.from_dict
+(see benchmarks/bench_compact.py).
+"""
+
+import json
+import sys
+from dataclasses import dataclass
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from .story import StrategyStory
+
+FORMAT_VERSION = 1
+
+CLARIFICATION_FIELDS = ("focus_area", "purpose", "industry", "geography", "time_horizon")
+
+# Labels repeat across thousands of stories; interning stores each one once
+_intern = sys.intern
+
+# Error locations are passed as (where, key) and only formatted on failure; decoding is hot
+
+def _str(value: Any, where: str, key: Any = None, intern: bool = True) -> str:
+    if type(value) is not str:
+        raise TypeError(f"{_at(where, key)}: expected str, got {type(value).__name__}")
+    return _intern(value) if intern else value
+
+def _strs(value: Any, where: str, key: Any = None) -> Tuple[str, ...]:
+    if type(value) is not list and type(value) is not tuple:
+        raise TypeError(f"{_at(where, key)}: expected a list of strings, got {type(value).__name__}")
+    try:
+        # sys.intern only accepts exact str, so this validates and interns in one C-level pass
+        return tuple(map(_intern, value))
+    except TypeError:
+        raise TypeError(f"{_at(where, key)}: expected a list of strings") from None
+
+def _groups(value: Any, where: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    if isinstance(value, dict):
+        value = value.items()
+    return tuple((_str(name, where), _strs(items, where, name)) for name, items in value)
+
+def _fields(value: Any, n: int, where: str) -> Any:
+    if (type(value) is not list and type(value) is not tuple) or len(value) != n:
+        got = f"{len(value)} items" if isinstance(value, (list, tuple)) else type(value).__name__
+        raise ValueError(f"{where}: expected a list of {n} items, got {got}")
+    return value
+
+def _at(where: str, key: Any) -> str:
+    return where if key is None else f"{where}[{key!r}]"
+
+@dataclass(frozen=True, slots=True)
+class Clarifications:
+    focus_area: str = ""
+    purpose: str = ""
+    industry: str = ""
+    geography: str = ""
+    time_horizon: str = ""
+    decision_outcomes: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Clarifications":
+        # Unknown keys are dropped; StrategyStory never writes any
+        return cls(*[_str(d.get(k, ""), "clarifications", k) for k in CLARIFICATION_FIELDS],
+                   _strs(d.get("decision_outcomes") or [], "clarifications", "decision_outcomes"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {k: getattr(self, k) for k in CLARIFICATION_FIELDS}
+        d["decision_outcomes"] = list(self.decision_outcomes)
+        return d
+
+@dataclass(frozen=True, slots=True)
+class Assessments:
+    canonical: Tuple[str, ...] = ()
+    dynamic: Tuple[str, ...] = ()
+    selected: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Assessments":
+        return cls(_strs(d.get("canonical") or [], "assessments", "canonical"),
+                   _strs(d.get("dynamic") or [], "assessments", "dynamic"),
+                   _strs(d.get("selected") or [], "assessments", "selected"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"canonical": list(self.canonical), "dynamic": list(self.dynamic), "selected": list(self.selected)}
+
+@dataclass(frozen=True, slots=True)
+class SubAssessments:
+    # (assessment, sub-assessment names) pairs in the original order
+    by_assessment: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    selected: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SubAssessments":
+        return cls(_groups(d.get("by_assessment") or {}, "sub_assessments.by_assessment"),
+                   _groups(d.get("selected") or {}, "sub_assessments.selected"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"by_assessment": {a: list(subs) for a, subs in self.by_assessment},
+                "selected": {a: list(subs) for a, subs in self.selected}}
+
+@dataclass(frozen=True, slots=True)
+class CompactStory:
+    prompt: str = ""
+    clarifications: Clarifications = Clarifications()
+    assessments: Assessments = Assessments()
+    sub_assessments: SubAssessments = SubAssessments()
+    updated_at: str = ""
+    revision: int = 0
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CompactStory":
+        """Validate and copy a StrategyStory.to_dict() payload; raises TypeError on malformed input."""
+        revision = d.get("revision", 0)
+        if not isinstance(revision, int):
+            raise TypeError(f"revision: expected int, got {type(revision).__name__}")
+        return cls(
+            _str(d.get("prompt", ""), "prompt", intern=False),
+            Clarifications.from_dict(d.get("clarifications") or {}),
+            Assessments.from_dict(d.get("assessments") or {}),
+            SubAssessments.from_dict(d.get("sub_assessments") or {}),
+            _str(d.get("updated_at", ""), "updated_at", intern=False),
+            revision,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt": self.prompt,
+            "clarifications": self.clarifications.to_dict(),
+            "assessments": self.assessments.to_dict(),
+            "sub_assessments": self.sub_assessments.to_dict(),
+            "updated_at": self.updated_at,
+            "revision": self.revision,
+        }
+
+    @classmethod
+    def from_story(cls, story: StrategyStory) -> "CompactStory":
+        return cls.from_dict(story.to_dict())
+
+    def to_story(self) -> StrategyStory:
+        return StrategyStory.from_dict(self.to_dict())
+
+    def to_row(self) -> List[Any]:
+        """Positional form shared by both codecs: field names aren't repeated per story."""
+        c, a, s = self.clarifications, self.assessments, self.sub_assessments
+        return [
+            FORMAT_VERSION,
+            self.prompt,
+            [*(getattr(c, k) for k in CLARIFICATION_FIELDS), c.decision_outcomes],
+            [a.canonical, a.dynamic, a.selected],
+            s.by_assessment,
+            s.selected,
+            self.updated_at,
+            self.revision,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "CompactStory":
+        """Decode a to_row() row; raises ValueError on a row of the wrong version or shape, TypeError on bad values."""
+        if type(row) is not list and type(row) is not tuple:
+            raise ValueError(f"compact story row: expected a list, got {type(row).__name__}")
+        if not row or row[0] != FORMAT_VERSION:
+            raise ValueError(f"unsupported compact story format: {row[0] if row else None!r}")
+        _, prompt, clar, assess, by_assessment, selected, updated_at, revision = _fields(row, 8, "compact story row")
+        _fields(clar, len(CLARIFICATION_FIELDS) + 1, "clarifications")
+        _fields(assess, 3, "assessments")
+        return cls(
+            _str(prompt, "prompt", intern=False),
+            Clarifications(*[_str(v, "clarifications", k) for k, v in zip(CLARIFICATION_FIELDS, clar)],
+                           _strs(clar[5], "clarifications", "decision_outcomes")),
+            Assessments(_strs(assess[0], "assessments", "canonical"), _strs(assess[1], "assessments", "dynamic"),
+                        _strs(assess[2], "assessments", "selected")),
+            SubAssessments(_groups(by_assessment, "sub_assessments.by_assessment"),
+                           _groups(selected, "sub_assessments.selected")),
+            _str(updated_at, "updated_at", intern=False),
+            int(revision),
+        )
+
+def dumps_msgpack(story: CompactStory) -> bytes:
+    import msgpack  # optional dependency: pip install msgpack
+    return msgpack.packb(story.to_row(), use_bin_type=True)
+
+def loads_msgpack(data: bytes) -> CompactStory:
+    import msgpack
+    return CompactStory.from_row(msgpack.unpackb(data, raw=False))
+
+def write_msgpack(stories: Iterable[CompactStory], fp: IO[bytes]) -> int:
+    """Append stories to a binary stream back to back; returns how many were written."""
+    import msgpack
+    packer, n = msgpack.Packer(use_bin_type=True), 0
+    for story in stories:
+        fp.write(packer.pack(story.to_row()))
+        n += 1
+    return n
+
+def read_msgpack(fp: IO[bytes]) -> Iterator[CompactStory]:
+    import msgpack
+    for row in msgpack.Unpacker(fp, raw=False):
+        yield CompactStory.from_row(row)
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+def dumps_json(story: CompactStory) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(story.to_row())
+    return json.dumps(story.to_row(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def loads_json(data: bytes | str) -> CompactStory:
+    return CompactStory.from_row(_orjson.loads(data) if _orjson is not None else json.loads(data))
@@ -1,41 +1,94 @@
 import json
+import threading
+from collections import OrderedDict
 from io import BytesIO
-from docx import Document
+from typing import Callable, Dict, Tuple
 from .story import StrategyStory
 
+# Rendered exports per (format, story fingerprint); DOCX files are a few tens of KB each
+EXPORT_CACHE_ENTRIES = 32
+
+_cache: "OrderedDict[Tuple[str, str], str | bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def story_fingerprint(story: StrategyStory) -> str:
+    """Identifies the story's committed revision (call touch() after editing); costs nothing to compute."""
+    instance, revision = story.cache_key
+    return f"{instance}:{revision}"
+
+def _memoized(kind: str, render: Callable[[StrategyStory], str | bytes], story: StrategyStory):
+    key = (kind, story_fingerprint(story))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    # Render outside the lock; a concurrent duplicate render is harmless
+    value = render(story)
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > EXPORT_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return value
+
+def clear_export_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
 def export_json(story: StrategyStory) -> str:
-    return json.dumps(story.to_dict(), indent=2)
+    return _memoized("json", _render_json, story)
 
 def export_docx_bytes(story: StrategyStory) -> bytes:
+    return _memoized("docx", _render_docx, story)
+
+def _render_json(story: StrategyStory) -> str:
+    return json.dumps(story.to_dict(), indent=2)
+
+def _render_docx(story: StrategyStory) -> bytes:
+    # python-docx (and lxml) are only needed when someone actually exports
+    from docx import Document
     doc = Document()
-    doc.add_heading('Strategy Story — Steps 1–3', 0)
+    # python-docx resolves a style name by scanning every style on each paragraph; resolve each id once
+    style_ids: Dict[str, str] = {}
+
+    def styled(text: str, style: str):
+        if style not in style_ids:
+            style_ids[style] = doc.styles[style].style_id
+        p = doc.add_paragraph(text)
+        p._p.style = style_ids[style]
+        return p
+
+    def heading(text: str, level: int):
+        return styled(text, "Title" if level == 0 else f"Heading {level}")
+
+    heading('Strategy Story — Steps 1–3', 0)
 
-    doc.add_heading('Prompt', level=1)
+    heading('Prompt', 1)
     doc.add_paragraph(story.prompt or "—")
 
     c = story.clarifications
-    doc.add_heading('Clarifications (Step 1)', level=1)
+    heading('Clarifications (Step 1)', 1)
     for k in ["focus_area", "purpose", "industry", "geography", "time_horizon"]:
         doc.add_paragraph(f"{k.replace('_',' ').title()}: {c.get(k) or '—'}")
     outcomes = c.get("decision_outcomes", [])
     doc.add_paragraph("Decision Outcomes: " + (", ".join(outcomes) if outcomes else "—"))
 
-    doc.add_heading('Assessments (Step 2)', level=1)
+    heading('Assessments (Step 2)', 1)
     sel = story.assessments.get("selected", [])
     if sel:
         for a in sel:
-            doc.add_paragraph(a, style='List Bullet')
+            styled(a, 'List Bullet')
     else:
         doc.add_paragraph("—")
 
-    doc.add_heading('Sub-Assessments (Step 3)', level=1)
+    heading('Sub-Assessments (Step 3)', 1)
     subs = story.sub_assessments.get("selected", {})
     if subs:
         for a, items in subs.items():
-            doc.add_heading(a, level=2)
+            heading(a, 2)
             if items:
                 for it in items:
-                    doc.add_paragraph(it, style='List Bullet')
+                    styled(it, 'List Bullet')
             else:
                 doc.add_paragraph("—")
     else:
@@ -0,0 +1,157 @@
+"""
+Speculative Step 2 / Step 3 model calls, started as soon as Step 1 signals it
+has enough (defer_to_next_step_signal) instead of when the user clicks on.
+
+Work is keyed on the prompt, the Step 1 fields and the story revision
+(step1_key). Any edit to the story produces a new key, so stale results are
+never served; the caller discards the old key, which cancels whatever hasn't
+started yet.
+
+Step 2 runs first; when it returns, one Step 3 call is queued for each of the
+first PREFETCH_STEP3_LIMIT assessments it pre-selects. Once the user commits a
+selection, retain() cancels the queued ones they turned off.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+from .canonical import CATALOG
+
+logger = logging.getLogger(__name__)
+
+# Speculative calls cost tokens whether or not the user continues; set WORKBENCH_PREFETCH=0 to turn them off
+PREFETCH_ENABLED = os.getenv("WORKBENCH_PREFETCH", "1") != "0"
+
+# Step 3 calls prefetched per Step 1 state, for the first pre-selected assessments; 0 prefetches Step 2 only
+PREFETCH_STEP3_LIMIT = int(os.getenv("WORKBENCH_PREFETCH_STEP3", "3"))
+
+# Calls in flight across all sessions of one process
+PREFETCH_WORKERS = 4
+
+# Step 1 states kept at once; the least recently started is dropped (and cancelled) first
+PREFETCH_ENTRIES = 16
+
+STEP1_FIELDS = ("focus_area", "purpose", "industry", "geography", "time_horizon", "decision_outcomes")
+
+def step1_key(prompt: str, step1: Dict[str, Any], revision: int = 0) -> str:
+    payload = {"prompt": prompt, "revision": revision, **{f: step1.get(f) for f in STEP1_FIELDS}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def project_context(prompt: str, step1: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": prompt[:50] + "..." if len(prompt) > 50 else prompt,
+        "purpose": step1.get("purpose", ""),
+        "industry": step1.get("industry", ""),
+        "geography": step1.get("geography", ""),
+        "time_horizon": step1.get("time_horizon", ""),
+        "decision_outcomes": step1.get("decision_outcomes", []),
+    }
+
+def step2_envelope(prompt: str, step1: Dict[str, Any]) -> Dict[str, Any]:
+    from mentat_protocol import ENVELOPES
+    return ENVELOPES.step2_assessment_toggle(project_context(prompt, step1), prompt, CATALOG.envelope())
+
+def step3_envelope(prompt: str, step1: Dict[str, Any], assessments: List[str]) -> Dict[str, Any]:
+    from mentat_protocol import ENVELOPES
+    return ENVELOPES.step3_subassessments(project_context(prompt, step1), prompt, list(assessments))
+
+def recommended_labels(step2: Dict[str, Any]) -> List[str]:
+    """Labels of a Step 2 response's recommendations, resolved through the catalog by id."""
+    labels = []
+    for item in step2.get("recommended_assessments", []):
+        entry = CATALOG.resolve(item)
+        labels.append(entry.label if entry else item["label"])
+    return labels
+
+class _Entry:
+    __slots__ = ("step2", "step3")
+
+    def __init__(self) -> None:
+        self.step2: Optional[Future] = None
+        self.step3: Dict[str, Future] = {}
+
+    def cancel(self) -> None:
+        for future in [self.step2, *self.step3.values()]:
+            if future is not None:
+                future.cancel()
+
+class Prefetcher:
+    def __init__(self, run: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None, workers: int = PREFETCH_WORKERS,
+                 entries: int = PREFETCH_ENTRIES, step3_limit: int = PREFETCH_STEP3_LIMIT):
+        if run is None:
+            from mentat_protocol import run_step as run
+        self._run = run
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._max_entries = entries
+        self._step3_limit = step3_limit
+        self._lock = threading.Lock()
+
+    def start(self, prompt: str, step1: Dict[str, Any], revision: int = 0) -> str:
+        """Queue Step 2 (then Step 3) for this Step 1 state and story revision unless already queued; returns its key."""
+        key = step1_key(prompt, step1, revision)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return key
+            entry = self._entries[key] = _Entry()
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)[1].cancel()
+            entry.step2 = self._pool.submit(self._step2_then_step3, key, entry, prompt, dict(step1))
+        return key
+
+    def _step2_then_step3(self, key: str, entry: _Entry, prompt: str, step1: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._run(step2_envelope(prompt, step1))
+        with self._lock:
+            # Discarded while Step 2 ran: don't spend calls on Step 3
+            if self._entries.get(key) is entry:
+                for label in recommended_labels(response)[:self._step3_limit]:
+                    entry.step3[label] = self._pool.submit(self._run, step3_envelope(prompt, step1, [label]))
+        return response
+
+    def _wait(self, future: Optional[Future], timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+        if future is None:
+            return None
+        try:
+            return future.result(timeout)
+        except (CancelledError, FutureTimeout):
+            return None
+        except Exception:
+            # The caller makes the call itself and surfaces the error there; keep the prefetch's own failure in the log
+            logger.warning("prefetched call failed; falling back to a foreground call", exc_info=True)
+            return None
+
+    def step2(self, key: Optional[str], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The Step 2 response for `key`, waiting up to `timeout` if still in flight; None if unavailable."""
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+        return self._wait(entry.step2 if entry else None, timeout)
+
+    def step3(self, key: Optional[str], assessment: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The single-assessment Step 3 response, if it was prefetched."""
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            future = entry.step3.get(assessment) if entry else None
+        return self._wait(future, timeout)
+
+    def retain(self, key: Optional[str], assessments: List[str]) -> None:
+        """Cancel the queued Step 3 calls for `key` outside `assessments` (the user's final selection)."""
+        keep = set(assessments)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            dropped = [f for a, f in entry.step3.items() if a not in keep] if entry else []
+        for future in dropped:
+            future.cancel()
+
+    def discard(self, key: Optional[str]) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None) if key else None
+        if entry is not None:
+            entry.cancel()
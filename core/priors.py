@@ -0,0 +1,160 @@
+"""
+Assessment priors from project history, for pre-setting Step 2 toggles.
+
+An offline job counts, over stored projects, how often each catalog
+assessment was selected together with each Step 1 feature (words of the
+industry, purpose and decision outcomes) and with each other assessment,
+and saves the counts as one compressed .npz file:
+
+  python -m core.priors                      # default store → PRIORS_PATH
+  python -m core.priors --store projects.sqlite3 --out priors.npz
+
+At runtime AssessmentPriors turns the counts into smoothed conditional
+probabilities once, so ranking a finished Step 1 is a row gather and a mean.
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .catalog import AssessmentCatalog
+from .ranker import terms
+from .store import STORE_PATH
+
+PRIORS_PATH = os.getenv("WORKBENCH_PRIORS_PATH", os.path.join(os.path.dirname(STORE_PATH), "assessment_priors.npz"))
+
+# Features seen in fewer projects than this are dropped; they are noise and bloat the file
+MIN_FEATURE_SUPPORT = 2
+
+# Pseudo-count pulling each conditional probability towards the base rate, so a feature seen in
+# three projects can't pin an assessment at 0% or 100%
+SMOOTHING = 5.0
+
+# Toggles pre-set on when the prior reaches this
+PRESELECT_THRESHOLD = 0.5
+
+def features_for(clarifications: Dict[str, Any]) -> Set[str]:
+    """Step 1 features of a story: `industry:`, `purpose:` and `outcome:` prefixed terms."""
+    out = {f"industry:{t}" for t in terms(str(clarifications.get("industry") or ""))}
+    out.update(f"purpose:{t}" for t in terms(str(clarifications.get("purpose") or "")))
+    for outcome in clarifications.get("decision_outcomes") or []:
+        out.update(f"outcome:{t}" for t in terms(str(outcome)))
+    return out
+
+class AssessmentPriors:
+    def __init__(self, labels: Sequence[str], features: Sequence[str], feature_assessment: np.ndarray,
+                 feature_counts: np.ndarray, cooccurrence: np.ndarray, projects: int, catalog_version: str = ""):
+        self.labels = list(labels)
+        self.features = list(features)
+        self.feature_assessment = feature_assessment
+        self.feature_counts = feature_counts
+        self.cooccurrence = cooccurrence
+        self.projects = int(projects)
+        self.catalog_version = catalog_version
+
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+        self._feature_index = {f: i for i, f in enumerate(self.features)}
+        selected = np.diag(cooccurrence).astype(np.float32)
+        self.base = selected / max(self.projects, 1)
+        # P(assessment | feature) and P(assessment | other assessment), smoothed towards the base rate
+        self._given_feature = ((feature_assessment + SMOOTHING * self.base)
+                               / (feature_counts[:, None] + SMOOTHING)).astype(np.float32)
+        self._given_assessment = ((cooccurrence + SMOOTHING * self.base)
+                                  / (selected[:, None] + SMOOTHING)).astype(np.float32)
+
+    @classmethod
+    def build(cls, stories: Iterable[Dict[str, Any]], catalog: AssessmentCatalog) -> "AssessmentPriors":
+        """Count selections in StrategyStory.to_dict() payloads; labels outside the catalog are ignored."""
+        labels = list(catalog.labels())
+        index = {label: i for i, label in enumerate(labels)}
+        n = len(labels)
+        cooccurrence = np.zeros((n, n), dtype=np.int32)
+        by_feature: Dict[str, List[int]] = {}
+        feature_rows: List[Tuple[Set[str], List[int]]] = []
+        projects = 0
+        for story in stories:
+            selected = sorted({index[a] for a in (story.get("assessments") or {}).get("selected") or [] if a in index})
+            if not selected:
+                continue
+            projects += 1
+            cooccurrence[np.ix_(selected, selected)] += 1
+            features = features_for(story.get("clarifications") or {})
+            for f in features:
+                by_feature.setdefault(f, []).append(len(feature_rows))
+            feature_rows.append((features, selected))
+
+        features = sorted(f for f, rows in by_feature.items() if len(rows) >= MIN_FEATURE_SUPPORT)
+        feature_assessment = np.zeros((len(features), n), dtype=np.int32)
+        feature_counts = np.zeros(len(features), dtype=np.int32)
+        for i, f in enumerate(features):
+            feature_counts[i] = len(by_feature[f])
+            for row in by_feature[f]:
+                feature_assessment[i, feature_rows[row][1]] += 1
+        return cls(labels, features, feature_assessment, feature_counts, cooccurrence, projects, catalog.version)
+
+    def save(self, path: str = PRIORS_PATH) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, labels=np.array(self.labels, dtype=str), features=np.array(self.features, dtype=str),
+                            feature_assessment=self.feature_assessment, feature_counts=self.feature_counts,
+                            cooccurrence=self.cooccurrence, projects=np.int64(self.projects),
+                            catalog_version=np.array(self.catalog_version))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = PRIORS_PATH, catalog_version: Optional[str] = None) -> "AssessmentPriors":
+        """Read a saved file; with `catalog_version`, refuse one built against a different catalog."""
+        with np.load(path, allow_pickle=False) as z:
+            saved = str(z["catalog_version"])
+            if catalog_version is not None and saved != catalog_version:
+                raise ValueError(f"{path} was built for catalog {saved or '?'}, not {catalog_version}; "
+                                 "rebuild it with `python -m core.priors`")
+            return cls(z["labels"].tolist(), z["features"].tolist(), z["feature_assessment"], z["feature_counts"],
+                       z["cooccurrence"], int(z["projects"]), saved)
+
+    def scores(self, clarifications: Dict[str, Any], given: Iterable[str] = ()) -> np.ndarray:
+        """Prior probability of each label being selected, from Step 1 and any assessments already chosen."""
+        rows = [self._feature_index[f] for f in features_for(clarifications) if f in self._feature_index]
+        picked = [self._label_index[a] for a in given if a in self._label_index]
+        if not rows and not picked:
+            return self.base
+        return np.concatenate([self._given_feature[rows], self._given_assessment[picked]]).mean(axis=0)
+
+    def rank(self, clarifications: Dict[str, Any], given: Iterable[str] = (),
+             only: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """(label, probability), most likely first; `only` restricts to those labels (e.g. canonical + dynamic)."""
+        scores = self.scores(clarifications, given)
+        if only is None:
+            ids = range(len(self.labels))
+        else:
+            ids = [self._label_index[a] for a in only if a in self._label_index]
+        return sorted(((self.labels[i], float(scores[i])) for i in ids), key=lambda p: -p[1])
+
+    def preselect(self, clarifications: Dict[str, Any], only: Optional[Iterable[str]] = None,
+                  threshold: float = PRESELECT_THRESHOLD) -> List[str]:
+        return [label for label, p in self.rank(clarifications, only=only) if p >= threshold]
+
+def main(argv: List[str] | None = None) -> int:
+    from .canonical import CATALOG
+    from .store import ProjectStore
+
+    parser = argparse.ArgumentParser(description="Build Step 2 assessment priors from stored projects")
+    parser.add_argument("--store", default=STORE_PATH, help="project store (SQLite)")
+    parser.add_argument("--out", default=PRIORS_PATH, help="output .npz")
+    args = parser.parse_args(argv)
+
+    store = ProjectStore(args.store)
+    try:
+        priors = AssessmentPriors.build(store.iter_stories(), CATALOG)
+    finally:
+        store.close()
+    priors.save(args.out)
+    print(f"✅ priors from {priors.projects} projects, {len(priors.features)} features → {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.1f} KB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
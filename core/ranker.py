@@ -0,0 +1,162 @@
+"""
+Local TF-IDF ranker over sub-assessments, for instant Step 3 defaults.
+
+Each document is one (assessment, sub-assessment) pair from the catalog: its
+label words, plus the prompt and clarification words of every stored project
+that selected it (when built with stories). The matrix is built once and
+kept term-major, so scoring a query is a gather of its few term rows and one
+vector-matrix product.
+
+Needs numpy (already installed with streamlit); core.canonical falls back to
+the generic defaults without it.
+"""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .catalog import AssessmentCatalog
+from .search import STOPWORDS, clarification_text
+
+# Label words count this many times a single context word, so a handful of
+# long prompts can't drown out what the sub-assessment is actually called
+LABEL_BOOST = 3
+
+# How much the assessment being filled in outweighs the project context when ranking
+FOCUS_WEIGHT = 2.0
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ers", "er", "es", "ed", "s")
+
+@lru_cache(maxsize=65536)
+def _stem(word: str) -> str:
+    # Crude suffix stripping, just enough to match "divest"/"divestiture"-style plurals and verb forms
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+def terms(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+def story_text(story: Dict[str, Any]) -> str:
+    """Prompt and Step 1 fields of a StrategyStory.to_dict() payload, as one string (the fields search indexes)."""
+    return f"{story.get('prompt') or ''} {clarification_text(story.get('clarifications') or {})}"
+
+class SubAssessmentRanker:
+    def __init__(self, docs: Dict[Tuple[str, str], Counter]):
+        # docs: (assessment, sub-assessment) -> term frequencies
+        self.docs: List[Tuple[str, str]] = list(docs)
+        vocab: Dict[str, int] = {}
+        for tf in docs.values():
+            for t in tf:
+                vocab.setdefault(t, len(vocab))
+        self.vocab = vocab
+
+        n = len(self.docs)
+        df = np.zeros(len(vocab), dtype=np.float32)
+        weights = np.zeros((len(vocab), n), dtype=np.float32)
+        for j, tf in enumerate(docs.values()):
+            for t, count in tf.items():
+                i = vocab[t]
+                df[i] += 1
+                weights[i, j] = 1.0 + math.log(count)
+        self.idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        weights *= self.idf[:, None]
+        # Unit-length documents, so long enriched bags don't win on size alone
+        norms = np.linalg.norm(weights, axis=0)
+        weights /= np.where(norms > 0, norms, 1.0)
+        self.weights = weights
+
+    @classmethod
+    def from_catalog(cls, catalog: AssessmentCatalog, stories: Iterable[Dict[str, Any]] = ()) -> "SubAssessmentRanker":
+        """Catalog defaults, enriched with the sub-assessments selected in `stories` (to_dict() payloads)."""
+        docs: Dict[Tuple[str, str], Counter] = {}
+
+        def doc(assessment: str, sub: str) -> Counter:
+            key = (assessment, sub)
+            if key not in docs:
+                docs[key] = Counter({t: LABEL_BOOST * c for t, c in Counter(terms(f"{sub} {sub} {assessment}")).items()})
+            return docs[key]
+
+        for a in catalog.entries:
+            for s in a.subs:
+                doc(a.label, s.label)
+        for story in stories:
+            context = Counter(terms(story_text(story)))
+            for assessment, subs in ((story.get("sub_assessments") or {}).get("selected") or {}).items():
+                for sub in subs:
+                    doc(assessment, sub).update(context)
+        return cls(docs)
+
+    def _query(self, text: str) -> Dict[int, float]:
+        # Unit-length tf-idf vector over known terms, as {row: weight}
+        vocab, idf = self.vocab, self.idf
+        q = {vocab[t]: (1.0 + math.log(c)) * float(idf[vocab[t]]) for t, c in Counter(terms(text)).items() if t in vocab}
+        norm = math.sqrt(sum(w * w for w in q.values()))
+        return {i: w / norm for i, w in q.items()} if norm else q
+
+    def scores(self, text: str, focus: str = "") -> np.ndarray:
+        """Cosine similarity of `text` to every document, plus FOCUS_WEIGHT × that of `focus`.
+
+        `focus` is the assessment being filled in: it decides the ranking, and the prompt and
+        clarifications in `text` break ties (or decide alone when focus has no known words).
+        """
+        q = self._query(text)
+        for i, w in self._query(focus).items():
+            q[i] = q.get(i, 0.0) + FOCUS_WEIGHT * w
+        if not q:
+            return np.zeros(len(self.docs), dtype=np.float32)
+        rows = list(q)
+        return np.fromiter(q.values(), dtype=np.float32, count=len(q)) @ self.weights[rows]
+
+    def rank(self, text: str, k: int = 3, exclude: Iterable[str] = (), focus: str = "") -> List[Tuple[str, str, float]]:
+        """Top-k (assessment, sub-assessment, score) for `text`, distinct sub-assessment labels, score > 0."""
+        scores = self.scores(text, focus)
+        skip = set(exclude)
+        # Partition a little past k so duplicate labels and exclusions rarely force a full sort
+        want = min(len(scores), 2 * k + len(skip))
+        if want == 0:
+            return []
+        top = np.argpartition(-scores, want - 1)[:want] if want < len(scores) else np.arange(len(scores))
+        order = top[np.argsort(-scores[top], kind="stable")]
+        out: List[Tuple[str, str, float]] = []
+        for j in order.tolist():
+            score = float(scores[j])
+            if score <= 0 or len(out) == k:
+                break
+            assessment, sub = self.docs[j]
+            if sub in skip:
+                continue
+            skip.add(sub)
+            out.append((assessment, sub, score))
+        else:
+            if len(out) < k and want < len(scores):
+                # Rare: the candidates were mostly duplicates or exclusions; rank everything
+                return self._rank_all(scores, k, set(exclude))
+        return out
+
+    def _rank_all(self, scores: np.ndarray, k: int, skip: set) -> List[Tuple[str, str, float]]:
+        out: List[Tuple[str, str, float]] = []
+        for j in np.argsort(-scores, kind="stable").tolist():
+            if scores[j] <= 0 or len(out) == k:
+                break
+            assessment, sub = self.docs[j]
+            if sub not in skip:
+                skip.add(sub)
+                out.append((assessment, sub, float(scores[j])))
+        return out
+
+_default: Optional[SubAssessmentRanker] = None
+
+def default_ranker() -> SubAssessmentRanker:
+    # Catalog-only ranker built on first use; callers with a project store can build an enriched one
+    global _default
+    if _default is None:
+        from .canonical import CATALOG
+        _default = SubAssessmentRanker.from_catalog(CATALOG)
+    return _default
@@ -0,0 +1,70 @@
+"""
+BM25 full-text index over stored projects, kept in the project store's SQLite
+file as an FTS5 table whose rowid is projects.search_rowid.
+
+ProjectStore updates it on every save; this module owns the index layout and
+turns free text (usually a new strategic prompt) into a ranked OR query.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .story import StrategyStory
+
+# Porter stemming so "divest", "divesting" and "divestiture" share postings
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS project_search USING fts5(
+    prompt, clarifications, sub_assessments, tokenize = 'porter unicode61'
+);
+"""
+
+# bm25() column weights: the prompt is what analysts type, so it dominates
+COLUMN_WEIGHTS = (1.0, 0.6, 0.3)
+
+# Query terms beyond this add latency but barely change the top results
+MAX_QUERY_TERMS = 32
+
+STOPWORDS = frozenset("""
+a about an and are as at be been but by can could do does for from had has have how i if in into is it its
+more most not of on or our should so some than that the their them then there these they this those to
+us was we were what when where whether which while who why will with would you your
+""".split())
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+@dataclass
+class SearchHit:
+    id: str
+    name: str
+    prompt: str
+    industry: str
+    geography: str
+    updated_at: str
+    score: float  # higher is more similar
+
+def clarification_text(c: Dict[str, Any]) -> str:
+    """The Step 1 fields of a story (its clarifications), as one string."""
+    return " ".join([*(str(c.get(k) or "") for k in ("focus_area", "purpose", "industry", "geography", "time_horizon")),
+                     *(str(o) for o in c.get("decision_outcomes") or [])])
+
+def document_for(story: StrategyStory) -> Tuple[str, str, str]:
+    """Indexed text for a story: (prompt, clarifications, assessments + selected sub-assessments)."""
+    clarifications = clarification_text(story.clarifications)
+    subs = story.sub_assessments.get("selected", {})
+    selections = " ".join([*story.assessments.get("selected", []), *(s for items in subs.values() for s in items)])
+    return story.prompt or "", clarifications, selections
+
+def match_query(text: str) -> Optional[str]:
+    """FTS5 query OR-ing the distinct content words of `text`; None if nothing is searchable."""
+    terms: List[str] = []
+    seen = set()
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS or word in seen or (len(word) < 2 and not word.isdigit()):
+            continue
+        seen.add(word)
+        # Quoted, so FTS5 operators and column filters in user text are treated as plain words
+        terms.append(f'"{word}"')
+        if len(terms) >= MAX_QUERY_TERMS:
+            break
+    return " OR ".join(terms) or None
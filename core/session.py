@@ -0,0 +1,197 @@
+"""
+One browser session's workbench state (project, story, transcript, step
+responses and where in the workflow it is) as a single object, with
+snapshot/restore so a restarted worker or redeploy loses nothing.
+
+After each step the app hands the session to SnapshotWriter, which saves the
+project record and a compact snapshot (zlib-compressed JSON) on a background
+thread; saves queued while an earlier one is still waiting collapse into the
+latest. The browser keeps the session id in its URL, so on reconnect restore()
+is one primary-key read and a decompress, and no model call is repeated.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from .store import ProjectRecord, ProjectStore
+from .story import StrategyStory
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# zlib level: transcripts and responses are repetitive JSON, and level 6 gets most of the gain of 9 at half the cost
+SNAPSHOT_COMPRESSION = 6
+
+# Snapshots not saved for this long are dropped when a writer starts
+SNAPSHOT_TTL_DAYS = 30
+
+# Saved with the project record (ProjectStore.save `state`), so resuming a project continues where it left off
+RESUME_STATE_KEYS = ("current_step", "project_context", "mentat_response", "mentat_defer_signal",
+                     "assessments_recommended", "step2_response")
+
+# Snapshots also carry the Step 3 results already paid for
+SNAPSHOT_KEYS = RESUME_STATE_KEYS + ("step2_initialized", "sub_assessments_generated")
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+def _shallow(value: Any) -> Any:
+    # The app replaces or appends to these, never edits them in place, so a shallow copy is a stable view
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+@dataclass
+class WorkbenchSession:
+    id: str = field(default_factory=_new_id)
+    project_id: Optional[str] = None
+    project_name: str = ""
+    project_started: bool = False
+    show_project_naming: bool = False
+    story: StrategyStory = field(default_factory=StrategyStory)
+    chat_messages: List[Dict[str, Any]] = field(default_factory=list)
+    current_step: float = 1
+    project_context: Optional[Dict[str, Any]] = None
+    mentat_response: Optional[Dict[str, Any]] = None
+    mentat_defer_signal: bool = False
+    assessments_recommended: List[str] = field(default_factory=list)
+    step2_initialized: bool = False
+    step2_response: Optional[Dict[str, Any]] = None
+    sub_assessments_generated: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    # Key of this session's speculative Step 2/3 calls (core.prefetch); per process, so never saved
+    prefetch_key: Optional[str] = None
+
+    def reset(self, name: str = "", project_id: Optional[str] = None) -> None:
+        """Start over: on a new project when `project_id` is given, else with none. The session id is kept."""
+        fresh = WorkbenchSession(self.id, project_id, name, project_started=project_id is not None)
+        for f in fields(self):
+            setattr(self, f.name, getattr(fresh, f.name))
+
+    def resume_state(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in RESUME_STATE_KEYS}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything restore needs, as JSON-shaped data that later edits to the session won't change.
+
+        Uses the story's last committed revision (call story.touch() first), which is already
+        immutable, so taking a snapshot copies no story data.
+        """
+        story = self.story.snapshot()
+        return {
+            "v": SNAPSHOT_VERSION,
+            "id": self.id,
+            "project_id": self.project_id,
+            "project_name": self.project_name,
+            "project_started": self.project_started,
+            "story": {**story.sections, "updated_at": story.updated_at, "revision": story.revision},
+            "chat_messages": list(self.chat_messages),
+            **{k: _shallow(getattr(self, k)) for k in SNAPSHOT_KEYS},
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "WorkbenchSession":
+        if data.get("v") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {data.get('v')!r}")
+        session = cls(data["id"], data["project_id"], data["project_name"], data["project_started"],
+                      story=StrategyStory.from_dict(data["story"]), chat_messages=data["chat_messages"])
+        for k in SNAPSHOT_KEYS:
+            if k in data:
+                setattr(session, k, data[k])
+        return session
+
+    @classmethod
+    def from_record(cls, record: ProjectRecord) -> "WorkbenchSession":
+        """A new session on a stored project, from the state saved with it."""
+        session = cls(project_id=record.id, project_name=record.name, project_started=True, story=record.story,
+                      chat_messages=record.messages)
+        for k in RESUME_STATE_KEYS:
+            if k in record.state:
+                setattr(session, k, record.state[k])
+        return session
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                         SNAPSHOT_COMPRESSION)
+
+def decode_snapshot(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+def _from_blob(blob: Optional[bytes]) -> Optional[WorkbenchSession]:
+    if blob is None:
+        return None
+    try:
+        return WorkbenchSession.from_snapshot(decode_snapshot(blob))
+    except (ValueError, TypeError, KeyError, zlib.error):
+        # Unreadable or from an older format: fall back as if there were none
+        logger.warning("ignoring unreadable session snapshot", exc_info=True)
+        return None
+
+def restore(store: ProjectStore, session_id: Optional[str] = None,
+            project_id: Optional[str] = None) -> Optional[WorkbenchSession]:
+    """Session `session_id` as last saved; else a new session on `project_id` from its latest snapshot or record.
+
+    Restored by project, the session gets a new id, so two browsers never overwrite each other's snapshot.
+    """
+    session = _from_blob(store.load_snapshot(session_id=session_id)) if session_id else None
+    if session is not None or not project_id:
+        return session
+    session = _from_blob(store.load_snapshot(project_id=project_id))
+    if session is not None:
+        session.id = _new_id()
+        return session
+    record = store.load(project_id)
+    return WorkbenchSession.from_record(record) if record else None
+
+class SnapshotWriter:
+    """Saves sessions on one background thread, so a step never waits on SQLite."""
+
+    def __init__(self, store: ProjectStore, ttl_days: float = SNAPSHOT_TTL_DAYS):
+        self._store = store
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        # (session id, project id) -> latest snapshot and the step responses queued with it
+        self._pending: Dict[Tuple[str, str], Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]] = {}
+        self._lock = threading.Lock()
+        self._pool.submit(store.prune_snapshots, time.time() - ttl_days * 86400)
+
+    def save(self, session: WorkbenchSession, step: Optional[str] = None,
+             response: Optional[Dict[str, Any]] = None) -> None:
+        """Queue the project record, `response` for `step` and a snapshot; returns at once."""
+        if not session.project_id:
+            return
+        key = (session.id, session.project_id)
+        snapshot = session.snapshot()
+        with self._lock:
+            pending = self._pending.get(key)
+            responses = pending[1] if pending else []
+            if step and response:
+                responses.append((step, response))
+            self._pending[key] = (snapshot, responses)
+            if pending is None:
+                self._pool.submit(self._write, key)
+
+    def _write(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            snapshot, responses = self._pending.pop(key)
+        session_id, project_id = key
+        try:
+            self._store.save(project_id, snapshot["project_name"], StrategyStory.from_dict(snapshot["story"]),
+                             snapshot["chat_messages"], {k: snapshot[k] for k in RESUME_STATE_KEYS})
+            for step, response in responses:
+                self._store.record_response(project_id, step, response)
+            self._store.save_snapshot(session_id, project_id, encode_snapshot(snapshot))
+        except Exception:
+            logger.exception("autosave of session %s failed", session_id)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until everything queued so far is written (one worker, so jobs finish in order)."""
+        self._pool.submit(lambda: None).result(timeout)
@@ -0,0 +1,355 @@
+"""
+Persistent SQLite store for projects: the StrategyStory, the chat transcript,
+per-step model responses and the UI state needed to resume, plus per-browser
+session snapshots (opaque blobs written by core.session).
+
+Filter columns (industry, geography, selected assessments, updated_at) are
+denormalized into indexed columns/tables on save, so listing never parses
+story JSON, and load() resumes a project with a single indexed statement.
+The BM25 search index (core.search) is updated in the same transaction.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .search import COLUMN_WEIGHTS, SEARCH_SCHEMA, SearchHit, document_for, match_query
+from .story import StrategyStory
+
+STORE_PATH = os.getenv("WORKBENCH_STORE_PATH", os.path.join(os.path.expanduser("~"), ".local", "share", "strategy_workbench", "projects.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    story TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    industry TEXT NOT NULL DEFAULT '',
+    geography TEXT NOT NULL DEFAULT '',
+    revision INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    -- rowid of the project's row in project_search; explicit, since VACUUM may renumber implicit rowids
+    search_rowid INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS projects_search_rowid ON projects(search_rowid);
+CREATE INDEX IF NOT EXISTS projects_updated ON projects(updated_at, id);
+CREATE INDEX IF NOT EXISTS projects_industry ON projects(industry, updated_at, id);
+CREATE INDEX IF NOT EXISTS projects_geography ON projects(geography, updated_at, id);
+
+CREATE TABLE IF NOT EXISTS project_assessments (
+    assessment TEXT NOT NULL,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    PRIMARY KEY (assessment, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS project_assessments_project ON project_assessments(project_id);
+
+CREATE TABLE IF NOT EXISTS messages (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    full_response TEXT,
+    PRIMARY KEY (project_id, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS step_responses (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (project_id, step)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    project_id TEXT,
+    snapshot BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_project ON sessions(project_id, updated_at);
+"""
+
+@dataclass
+class ProjectSummary:
+    id: str
+    name: str
+    industry: str
+    geography: str
+    revision: int
+    updated_at: str
+
+@dataclass
+class ProjectRecord:
+    id: str
+    name: str
+    story: StrategyStory
+    state: Dict[str, Any] = field(default_factory=dict)
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    created_at: float = 0.0
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+class ProjectStore:
+    """Projects in one SQLite file (WAL, so several app processes can share it)."""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps readers consistent; NORMAL only risks the last commit on power loss
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._migrate(conn)
+            conn.executescript(SCHEMA)
+            has_index = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'project_search'").fetchone()
+            conn.executescript(SEARCH_SCHEMA)
+            conn.commit()
+            self._conn = conn
+            if not has_index:
+                # Stores created before the search index existed get it backfilled once
+                self._reindex(conn)
+        return self._conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+        if columns and "search_rowid" not in columns:
+            # The index used to follow the implicit rowid; pin the current values so it stays valid
+            with conn:
+                conn.execute("ALTER TABLE projects ADD COLUMN search_rowid INTEGER")
+                conn.execute("UPDATE projects SET search_rowid = rowid")
+
+    def _write_projects(self, db: sqlite3.Connection, items: List[Tuple[str, str, StrategyStory, Optional[Dict[str, Any]]]]) -> None:
+        now = time.time()
+        rows = []
+        for project_id, name, story, state in items:
+            c = story.clarifications
+            rows.append((project_id, name, _dumps(story.to_dict()), _dumps(state or {}), c.get("industry") or "",
+                         c.get("geography") or "", story.revision, story.updated_at, now, state is not None))
+        db.executemany(
+            "INSERT INTO projects (id, name, story, state, industry, geography, revision, updated_at, created_at, search_rowid) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(search_rowid), 0) + 1 FROM projects)) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, story = excluded.story, "
+            "state = CASE WHEN ?10 THEN excluded.state ELSE projects.state END, "
+            "industry = excluded.industry, geography = excluded.geography, "
+            "revision = excluded.revision, updated_at = excluded.updated_at",
+            rows,
+        )
+        # search_rowid is assigned on first insert only, so an upsert keeps the project's FTS row id
+        db.executemany("DELETE FROM project_search WHERE rowid = (SELECT search_rowid FROM projects WHERE id = ?)", [(i[0],) for i in items])
+        db.executemany(
+            "INSERT INTO project_search (rowid, prompt, clarifications, sub_assessments) "
+            "SELECT search_rowid, ?, ?, ? FROM projects WHERE id = ?",
+            [(*document_for(story), project_id) for project_id, _, story, _ in items],
+        )
+        db.executemany("DELETE FROM project_assessments WHERE project_id = ?", [(i[0],) for i in items])
+        db.executemany(
+            "INSERT OR IGNORE INTO project_assessments (assessment, project_id) VALUES (?, ?)",
+            [(a, project_id) for project_id, _, story, _ in items for a in story.assessments.get("selected", [])],
+        )
+
+    def save(self, project_id: str, name: str, story: StrategyStory, messages: Optional[List[Dict[str, Any]]] = None,
+             state: Optional[Dict[str, Any]] = None) -> None:
+        """Upsert a project. `messages` is the full transcript; only new turns are written.
+
+        `state` (JSON-serializable UI state) is left untouched when None.
+        """
+        with self._lock:
+            db = self._db()
+            with db:
+                self._write_projects(db, [(project_id, name, story, state)])
+                if messages is not None:
+                    self._sync_messages(db, project_id, messages)
+
+    def _sync_messages(self, db: sqlite3.Connection, project_id: str, messages: List[Dict[str, Any]]) -> None:
+        # Transcripts are append-only in the app, so only rows past the stored tail are written
+        stored = db.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE project_id = ?", (project_id,)).fetchone()[0]
+        if stored > len(messages):
+            db.execute("DELETE FROM messages WHERE project_id = ? AND seq >= ?", (project_id, len(messages)))
+            stored = len(messages)
+        db.executemany(
+            "INSERT OR REPLACE INTO messages (project_id, seq, role, content, full_response) VALUES (?, ?, ?, ?, ?)",
+            [(project_id, seq, m.get("role", ""), m.get("content") or "",
+              _dumps(m["full_response"]) if m.get("full_response") is not None else None)
+             for seq, m in enumerate(messages[stored:], start=stored)],
+        )
+
+    def record_response(self, project_id: str, step: str, response: Dict[str, Any]) -> None:
+        """Keep the latest validated response per step, so resuming never repeats a model call."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO step_responses (project_id, step, response, created_at) VALUES (?, ?, ?, ?)",
+                    (project_id, step, _dumps(response), time.time()),
+                )
+
+    def bulk_insert(self, projects: Iterable[Tuple[str, str, StrategyStory]], batch_size: int = 500) -> int:
+        """Insert or replace many (id, name, story) projects, committing every `batch_size` rows."""
+        count = 0
+        with self._lock:
+            db = self._db()
+            batch: List[Tuple[str, str, StrategyStory]] = []
+
+            def flush() -> None:
+                with db:
+                    self._write_projects(db, [(project_id, name, story, None) for project_id, name, story in batch])
+                batch.clear()
+
+            for item in projects:
+                batch.append(item)
+                count += 1
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+        return count
+
+    def load(self, project_id: str) -> Optional[ProjectRecord]:
+        # One statement: the project row by primary key plus its transcript and responses by key prefix
+        with self._lock:
+            row = self._db().execute(
+                "SELECT id, name, story, state, created_at, "
+                "(SELECT json_group_array(json_array(seq, role, content, full_response)) FROM messages WHERE project_id = p.id), "
+                "(SELECT json_group_object(step, json(response)) FROM step_responses WHERE project_id = p.id) "
+                "FROM projects p WHERE id = ?",
+                (project_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        pid, name, story, state, created_at, transcript, responses = row
+        messages = []
+        for _, role, content, full_response in sorted(json.loads(transcript)):
+            message: Dict[str, Any] = {"role": role, "content": content}
+            if full_response is not None:
+                message["full_response"] = json.loads(full_response)
+            messages.append(message)
+        return ProjectRecord(pid, name, StrategyStory.from_dict(json.loads(story)), json.loads(state),
+                             messages, json.loads(responses), created_at)
+
+    def list_projects(self, industry: Optional[str] = None, geography: Optional[str] = None,
+                      assessment: Optional[str] = None, limit: int = 50,
+                      after: Optional[Tuple[str, str]] = None) -> Tuple[List[ProjectSummary], Optional[Tuple[str, str]]]:
+        """Most recently updated first. Returns (page, cursor); pass the cursor as `after` for the next page.
+
+        Keyset paging on (updated_at, id) keeps every page an index range scan, however deep.
+        """
+        where, params = [], []
+        if industry is not None:
+            where.append("p.industry = ?")
+            params.append(industry)
+        if geography is not None:
+            where.append("p.geography = ?")
+            params.append(geography)
+        if assessment is not None:
+            # Assessments come from a small catalog, so most match many projects: walking updated_at
+            # order and probing the (assessment, project_id) key stops after one page instead of sorting
+            where.append("EXISTS (SELECT 1 FROM project_assessments a WHERE a.assessment = ? AND a.project_id = p.id)")
+            params.append(assessment)
+        if after is not None:
+            where.append("(p.updated_at, p.id) < (?, ?)")
+            params.extend(after)
+        sql = ("SELECT id, name, industry, geography, revision, updated_at FROM projects p"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY p.updated_at DESC, p.id DESC LIMIT ?")
+        with self._lock:
+            rows = self._db().execute(sql, (*params, limit)).fetchall()
+        page = [ProjectSummary(*r) for r in rows]
+        cursor = (page[-1].updated_at, page[-1].id) if len(page) == limit else None
+        return page, cursor
+
+    def delete(self, project_id: str) -> None:
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM project_search WHERE rowid = (SELECT search_rowid FROM projects WHERE id = ?)", (project_id,))
+                db.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                db.execute("DELETE FROM sessions WHERE project_id = ?", (project_id,))
+
+    def save_snapshot(self, session_id: str, project_id: Optional[str], snapshot: bytes) -> None:
+        """Replace a session's snapshot."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("INSERT OR REPLACE INTO sessions (id, project_id, snapshot, updated_at) VALUES (?, ?, ?, ?)",
+                           (session_id, project_id, snapshot, time.time()))
+
+    def load_snapshot(self, session_id: Optional[str] = None, project_id: Optional[str] = None) -> Optional[bytes]:
+        """A session's snapshot by id, or (with project_id instead) the most recently saved one for that project."""
+        with self._lock:
+            if session_id is not None:
+                row = self._db().execute("SELECT snapshot FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            else:
+                row = self._db().execute("SELECT snapshot FROM sessions WHERE project_id = ? ORDER BY updated_at DESC LIMIT 1",
+                                         (project_id,)).fetchone()
+        return row[0] if row else None
+
+    def prune_snapshots(self, older_than: float) -> int:
+        """Drop snapshots last saved before `older_than` (epoch seconds); returns how many."""
+        with self._lock:
+            db = self._db()
+            with db:
+                return db.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,)).rowcount
+
+    def search(self, text: str, limit: int = 5, exclude_id: Optional[str] = None) -> List[SearchHit]:
+        """Past projects most similar to `text` (BM25 over prompt, clarifications and selections)."""
+        query = match_query(text)
+        if query is None:
+            return []
+        # Rank inside FTS5 first and join only the top rows; one extra row covers exclude_id
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT p.id, p.name, json_extract(p.story, '$.prompt'), p.industry, p.geography, p.updated_at, -s.rank "
+                "FROM (SELECT rowid, bm25(project_search, ?, ?, ?) AS rank FROM project_search "
+                "      WHERE project_search MATCH ? ORDER BY rank LIMIT ?) s "
+                "JOIN projects p ON p.search_rowid = s.rowid ORDER BY s.rank",
+                (*COLUMN_WEIGHTS, query, limit + 1),
+            ).fetchall()
+        rows = [r for r in rows if r[0] != exclude_id][:limit]
+        return [SearchHit(*r) for r in rows]
+
+    def iter_stories(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Every stored story as its to_dict() payload, in insertion order.
+
+        Paged by rowid so the lock is never held while the caller works on a batch.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db().execute("SELECT rowid, story FROM projects WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                          (last, batch_size)).fetchall()
+            for _, story in rows:
+                yield json.loads(story)
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def reindex(self) -> None:
+        with self._lock:
+            self._reindex(self._db())
+
+    def _reindex(self, db: sqlite3.Connection) -> None:
+        with db:
+            db.execute("DELETE FROM project_search")
+            for rowid, story in db.execute("SELECT search_rowid, story FROM projects").fetchall():
+                db.execute("INSERT INTO project_search (rowid, prompt, clarifications, sub_assessments) VALUES (?, ?, ?, ?)",
+                           (rowid, *document_for(StrategyStory.from_dict(json.loads(story)))))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,6 +1,57 @@
 from __future__ import annotations
+import copy
+import itertools
+import marshal
 from dataclasses import dataclass, field
-from typing import Dict, List, Any
+from datetime import datetime
+from typing import Dict, List, Any, Set, Tuple
+
+# Top-level parts of a story that are revisioned, diffed and restored
+SECTIONS = ("prompt", "clarifications", "assessments", "sub_assessments")
+
+# Undo depth; snapshots share unchanged sections, so each one only costs what changed
+HISTORY_LIMIT = 100
+
+_instances = itertools.count(1)
+
+def _copy(value: Any) -> Any:
+    # Stories are plain JSON-shaped data, which marshal deep-copies in C (~3x faster than recursion)
+    try:
+        return marshal.loads(marshal.dumps(value))
+    except ValueError:
+        return copy.deepcopy(value)
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable state of a story at one revision. Treat `sections` as read-only."""
+    revision: int
+    updated_at: str
+    sections: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**{k: _copy(v) for k, v in self.sections.items()}, "updated_at": self.updated_at, "revision": self.revision}
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> List[Dict[str, Any]]:
+    """Patch ops turning `old` into `new`: {"op": "set"|"remove", "path": [section, key?], "value": ...}.
+
+    Dict sections are diffed per key; other sections are replaced whole.
+    """
+    ops: List[Dict[str, Any]] = []
+    for name in SECTIONS:
+        a, b = old.sections[name], new.sections[name]
+        # Unchanged sections are shared between snapshots, so identity is the fast path
+        if a is b or a == b:
+            continue
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key, value in b.items():
+                if key not in a or a[key] != value:
+                    ops.append({"op": "set", "path": [name, key], "value": _copy(value)})
+            for key in a:
+                if key not in b:
+                    ops.append({"op": "remove", "path": [name, key]})
+        else:
+            ops.append({"op": "set", "path": [name], "value": _copy(b)})
+    return ops
 
 @dataclass
 class StrategyStory:
@@ -23,6 +74,20 @@ class StrategyStory:
         "selected": {},
     })
     updated_at: str = ""
+    revision: int = field(default=0, compare=False)
+    # Unique per object in this process (never reused, unlike id()); see cache_key
+    _instance: int = field(default_factory=lambda: next(_instances), init=False, repr=False, compare=False)
+    # Sections that changed in the latest revision
+    dirty: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Latest committed revision; built on first use, so stories that are only read never copy their content
+    _head: Snapshot | None = field(default=None, init=False, repr=False, compare=False)
+    _undo: List[Snapshot] = field(default_factory=list, init=False, repr=False, compare=False)
+    _redo: List[Snapshot] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    @property
+    def cache_key(self) -> Tuple[int, int]:
+        """Names this object's committed content for in-process caches: changes with every revision."""
+        return self._instance, self.revision
 
     @property
     def clarifications_complete(self) -> bool:
@@ -47,9 +112,98 @@ class StrategyStory:
         self.clarifications["decision_outcomes"] = decision_outcomes or []
         self.touch()
 
-    def touch(self) -> None:
-        from datetime import datetime
+    def touch(self) -> int:
+        """Commit in-place edits as a new revision and return its number.
+
+        Callers may mutate the section dicts directly; touch() works out which
+        sections changed by comparing against the previous snapshot. History
+        starts at the first touch(): with no baseline yet, everything counts as
+        changed.
+        """
+        head = self._head
+        sections: Dict[str, Any] = {}
+        dirty: Set[str] = set()
+        for name in SECTIONS:
+            current = getattr(self, name)
+            if head is not None and current == head.sections[name]:
+                sections[name] = head.sections[name]
+            else:
+                sections[name] = _copy(current)
+                dirty.add(name)
+        if head is not None and not dirty:
+            return self.revision
         self.updated_at = datetime.utcnow().isoformat()
+        self._push(sections, dirty)
+        del self._redo[:]
+        return self.revision
+
+    def _push(self, sections: Dict[str, Any], dirty: Set[str]) -> None:
+        if self._head is not None:
+            self._undo.append(self._head)
+            del self._undo[:-HISTORY_LIMIT]
+        self.revision += 1
+        self.dirty = dirty
+        self._head = Snapshot(self.revision, self.updated_at, sections)
+
+    def snapshot(self) -> Snapshot:
+        """The latest committed revision (call touch() first to include pending edits)."""
+        if self._head is None:
+            # Nothing committed yet: the current content is the baseline, without recording history
+            self._head = Snapshot(self.revision, self.updated_at, {n: _copy(getattr(self, n)) for n in SECTIONS})
+        return self._head
+
+    def history(self) -> List[Snapshot]:
+        """Snapshots still reachable by undo/redo, oldest first, including the current one."""
+        return self._undo + [self.snapshot()] + self._redo[::-1]
+
+    def changed_since(self, revision: int) -> Set[str]:
+        """Sections that differ between `revision` and now (all of them if it's no longer in history)."""
+        old = next((s for s in self.history() if s.revision == revision), None)
+        if old is None:
+            return set(SECTIONS)
+        head = self.snapshot()
+        return {n for n in SECTIONS if old.sections[n] is not head.sections[n] and old.sections[n] != head.sections[n]}
+
+    def diff(self, from_revision: int, to_revision: int | None = None) -> List[Dict[str, Any]]:
+        by_rev = {s.revision: s for s in self.history()}
+        if from_revision not in by_rev or (to_revision is not None and to_revision not in by_rev):
+            raise KeyError(f"revision not in history: {from_revision if from_revision not in by_rev else to_revision}")
+        return diff_snapshots(by_rev[from_revision], by_rev[to_revision] if to_revision is not None else self.snapshot())
+
+    def apply_patch(self, ops: List[Dict[str, Any]]) -> int:
+        for op in ops:
+            path = op["path"]
+            if len(path) == 1:
+                setattr(self, path[0], _copy(op["value"]))
+            elif op["op"] == "remove":
+                getattr(self, path[0]).pop(path[1], None)
+            else:
+                getattr(self, path[0])[path[1]] = _copy(op["value"])
+        return self.touch()
+
+    def _restore(self, target: Snapshot) -> None:
+        for name in SECTIONS:
+            setattr(self, name, _copy(target.sections[name]))
+        self.updated_at = datetime.utcnow().isoformat()
+        dirty = {n for n in SECTIONS if target.sections[n] is not self._head.sections[n]}
+        # Restoring is a new revision too, so revision-keyed caches never serve stale content
+        self.revision += 1
+        self.dirty = dirty
+        self._head = Snapshot(self.revision, self.updated_at, dict(target.sections))
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        self._redo.append(self._head)
+        self._restore(self._undo.pop())
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        self._undo.append(self._head)
+        self._restore(self._redo.pop())
+        return True
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -58,14 +212,17 @@ class StrategyStory:
             "assessments": self.assessments,
             "sub_assessments": self.sub_assessments,
             "updated_at": self.updated_at,
+            "revision": self.revision,
         }
 
     @classmethod
     def from_dict(cls, d: Dict[str, Any]) -> "StrategyStory":
-        s = cls()
-        s.prompt = d.get("prompt", "")
-        s.clarifications = d.get("clarifications", s.clarifications)
-        s.assessments = d.get("assessments", s.assessments)
-        s.sub_assessments = d.get("sub_assessments", s.sub_assessments)
-        s.updated_at = d.get("updated_at", "")
-        return s
+        # Copy so the story never aliases (or later mutates) the caller's dicts
+        kwargs: Dict[str, Any] = {}
+        for k in SECTIONS:
+            if k in d:
+                expected = str if k == "prompt" else dict
+                if not isinstance(d[k], expected):
+                    raise TypeError(f"{k}: expected {expected.__name__}, got {type(d[k]).__name__}")
+                kwargs[k] = _copy(d[k])
+        return cls(**kwargs, updated_at=d.get("updated_at", ""), revision=d.get("revision", 0))
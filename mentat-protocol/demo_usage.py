@@ -1,5 +1,6 @@
 import json
-from mentat_protocol import run_step, ENVELOPES
+import mentat_protocol
+from mentat_protocol import load_env, ENVELOPES
 
 def demo():
     project_context = {
@@ -33,8 +34,9 @@ def demo():
         user_input="We think customer dependency matters due to specimen collection kit volumes.",
         canonical=canonical
     )
-    resp = run_step(env)
+    resp = mentat_protocol.run_step(env)
     print(json.dumps(resp, indent=2))
 
 if __name__ == "__main__":
+    load_env()
     demo()
@@ -1,13 +1,33 @@
-from .client import run_step
+from importlib import import_module
+
+# Public names are resolved on first access so `import mentat_protocol` stays free of
+# openai/httpx imports and config side effects; call load_env() before first use.
+_LAZY = {
+    "run_step": ".client",
+    "warm_up": ".client",
+    "arun_step": ".aio",
+    "gather": ".aio",
+    "compact_history": ".history",
+    "load_env": ".env",
+}
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
 class ENVELOPES:
     @staticmethod
     def step1_clarify(project_context: dict, user_input: str, conversation_history: list = None) -> dict:
+        from .history import compact_history
         return {
             "project_context": project_context,
             "step": "step_1_clarify",
             "user_input": user_input,
-            "conversation_history": conversation_history or [],
+            "conversation_history": compact_history(conversation_history or []),
             "constraints": {
                 "style": "comprehensive-summary",
                 "max_chars": 1000,
@@ -0,0 +1,72 @@
+import asyncio, time
+from typing import Any, Dict, Iterable, List
+
+from .backends import get_backend
+from .client import (
+    enforce_fields_only, validate_or_repair, get_cache, step_cache_key,
+    _build_messages, _retry_envelope, _parse_content,
+)
+from .config import (
+    MODEL, TEMPERATURE, RESPONSE_FORMAT, CACHE_ENABLED,
+)
+from .telemetry import CallMetrics, emit
+
+async def _acall_openai(envelope: Dict[str, Any], model: str = MODEL, temperature: float = TEMPERATURE, metrics: CallMetrics | None = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    completion = await get_backend().acomplete(_build_messages(envelope), model, temperature, RESPONSE_FORMAT)
+    if metrics is not None:
+        metrics.network_ms += (time.perf_counter() - started) * 1000
+        metrics.record_usage(completion.usage)
+    return _parse_content(completion.content, metrics)
+
+async def arun_step(envelope: Dict[str, Any], use_cache: bool = CACHE_ENABLED) -> Dict[str, Any]:
+    metrics = CallMetrics(step=envelope["step"], model=MODEL)
+    started = time.perf_counter()
+    try:
+        if not use_cache:
+            return await _arun_step_uncached(envelope, metrics)
+
+        cache = get_cache()
+        key = step_cache_key(envelope)
+        # The disk tier locks, commits and evicts; keep it off the event loop
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            metrics.cache = "hit"
+            return hit
+        metrics.cache = "miss"
+        result = await _arun_step_uncached(envelope, metrics)
+        await asyncio.to_thread(cache.put, key, result)
+        return result
+    except Exception as e:
+        metrics.error = type(e).__name__
+        raise
+    finally:
+        metrics.total_ms = (time.perf_counter() - started) * 1000
+        emit(metrics)
+
+async def _arun_step_uncached(envelope: Dict[str, Any], metrics: CallMetrics | None = None) -> Dict[str, Any]:
+    step = envelope["step"]
+    fields = envelope.get("fields", [])
+    raw = await _acall_openai(envelope, metrics=metrics)
+    clean, err = validate_or_repair(step, enforce_fields_only(raw, fields), metrics)
+    if err is None:
+        return clean
+
+    if metrics is not None:
+        metrics.retries += 1
+    raw_retry = await _acall_openai(_retry_envelope(envelope), temperature=0.0, metrics=metrics)
+    clean_retry, err2 = validate_or_repair(step, enforce_fields_only(raw_retry, fields), metrics)
+    if err2 is not None:
+        raise ValueError(f"Model response invalid: {err2}")
+    return clean_retry
+
+async def gather(envelopes: Iterable[Dict[str, Any]], limit: int = 8, return_exceptions: bool = False,
+                 use_cache: bool = CACHE_ENABLED) -> List[Any]:
+    """Run many envelopes on one event loop with at most `limit` model calls in flight; results keep input order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(env: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await arun_step(env, use_cache=use_cache)
+
+    return await asyncio.gather(*(bounded(env) for env in envelopes), return_exceptions=return_exceptions)
@@ -0,0 +1,237 @@
+import hashlib, json, os, threading, weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Protocol, Tuple
+
+from .config import (
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
+
+def _pool_settings() -> Tuple["httpx.Timeout", "httpx.Limits"]:
+    # openai/httpx are imported on first use; together they dominate package import time
+    import httpx
+    return (
+        httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+# One pooled client per (api key, base url); OpenAI clients are safe to share across threads
+_sync_clients: Dict[Tuple[str | None, str | None], "OpenAI"] = {}
+_sync_clients_lock = threading.Lock()
+
+def get_client(api_key: str | None = None, base_url: str | None = None) -> "OpenAI":
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    key = (api_key, base_url)
+    with _sync_clients_lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            from openai import OpenAI, DefaultHttpxClient
+            timeout, limits = _pool_settings()
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                http_client=DefaultHttpxClient(timeout=timeout, limits=limits),
+            )
+            _sync_clients[key] = client
+        return client
+
+# Async HTTP pools are bound to the event loop that created them, so keep one set per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str | None, str | None], 'AsyncOpenAI']]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+def get_async_client(api_key: str | None = None, base_url: str | None = None) -> "AsyncOpenAI":
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    import asyncio
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get((api_key, base_url))
+        if client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            timeout, limits = _pool_settings()
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                http_client=DefaultAsyncHttpxClient(timeout=timeout, limits=limits),
+            )
+            per_loop[(api_key, base_url)] = client
+        return client
+
+@dataclass
+class Completion:
+    content: str
+    usage: Dict[str, int] | None = None
+
+def usage_dict(usage: Any) -> Dict[str, int] | None:
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+class Backend(Protocol):
+    """What run_step needs from a chat-completions provider.
+
+    stream() yields (content_delta, usage) pairs; usage is only set on the final item.
+    """
+
+    def complete(self, messages: List[Dict[str, Any]], model: str, temperature: float, response_format: Dict[str, Any]) -> Completion: ...
+
+    def stream(self, messages: List[Dict[str, Any]], model: str, temperature: float, response_format: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, int] | None]]: ...
+
+    async def acomplete(self, messages: List[Dict[str, Any]], model: str, temperature: float, response_format: Dict[str, Any]) -> Completion: ...
+
+class OpenAIBackend:
+    def complete(self, messages, model, temperature, response_format) -> Completion:
+        resp = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format
+        )
+        return Completion(resp.choices[0].message.content, usage_dict(resp.usage))
+
+    def stream(self, messages, model, temperature, response_format):
+        chunks = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content, None
+            if chunk.usage is not None:
+                yield "", usage_dict(chunk.usage)
+
+    async def acomplete(self, messages, model, temperature, response_format) -> Completion:
+        resp = await get_async_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format
+        )
+        return Completion(resp.choices[0].message.content, usage_dict(resp.usage))
+
+def request_key(messages: List[Dict[str, Any]], model: str, temperature: float, response_format: Dict[str, Any]) -> str:
+    blob = json.dumps([messages, model, temperature, response_format], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class RecordingBackend:
+    """Wraps another backend and appends every request/response pair to a JSONL file."""
+
+    def __init__(self, inner: Backend, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _record(self, messages, model, temperature, response_format, completion: Completion) -> None:
+        line = json.dumps({
+            "key": request_key(messages, model, temperature, response_format),
+            "request": {"messages": messages, "model": model, "temperature": temperature, "response_format": response_format},
+            "content": completion.content,
+            "usage": completion.usage,
+        }, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def complete(self, messages, model, temperature, response_format) -> Completion:
+        completion = self.inner.complete(messages, model, temperature, response_format)
+        self._record(messages, model, temperature, response_format, completion)
+        return completion
+
+    def stream(self, messages, model, temperature, response_format):
+        parts, usage = [], None
+        for delta, u in self.inner.stream(messages, model, temperature, response_format):
+            parts.append(delta)
+            usage = u or usage
+            yield delta, u
+        self._record(messages, model, temperature, response_format, Completion("".join(parts), usage))
+
+    async def acomplete(self, messages, model, temperature, response_format) -> Completion:
+        completion = await self.inner.acomplete(messages, model, temperature, response_format)
+        self._record(messages, model, temperature, response_format, completion)
+        return completion
+
+class ReplayMiss(KeyError):
+    pass
+
+class ReplayBackend:
+    """Serves responses captured by RecordingBackend; unknown requests raise ReplayMiss.
+
+    With strict=False, unknown requests fall back to the recording for the same
+    step (matched on the envelope's "step"), which keeps replays usable after
+    small prompt changes.
+    """
+
+    def __init__(self, path: str, strict: bool = True, chunk_chars: int = 16):
+        self.strict = strict
+        self.chunk_chars = chunk_chars
+        self._by_key: Dict[str, Completion] = {}
+        self._by_step: Dict[str, Completion] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                completion = Completion(rec["content"], rec.get("usage"))
+                self._by_key[rec["key"]] = completion
+                step = _envelope_step(rec["request"]["messages"])
+                if step:
+                    self._by_step.setdefault(step, completion)
+
+    def _lookup(self, messages, model, temperature, response_format) -> Completion:
+        completion = self._by_key.get(request_key(messages, model, temperature, response_format))
+        if completion is None and not self.strict:
+            completion = self._by_step.get(_envelope_step(messages) or "")
+        if completion is None:
+            raise ReplayMiss(f"no recorded response for {_envelope_step(messages) or 'request'}")
+        return completion
+
+    def complete(self, messages, model, temperature, response_format) -> Completion:
+        return self._lookup(messages, model, temperature, response_format)
+
+    def stream(self, messages, model, temperature, response_format):
+        completion = self._lookup(messages, model, temperature, response_format)
+        for i in range(0, len(completion.content), self.chunk_chars):
+            yield completion.content[i:i + self.chunk_chars], None
+        yield "", completion.usage
+
+    async def acomplete(self, messages, model, temperature, response_format) -> Completion:
+        return self._lookup(messages, model, temperature, response_format)
+
+def _envelope_step(messages: List[Dict[str, Any]]) -> str | None:
+    try:
+        return json.loads(messages[-1]["content"]).get("step")
+    except (ValueError, KeyError, IndexError, AttributeError):
+        return None
+
+_backend: Backend = OpenAIBackend()
+
+def get_backend() -> Backend:
+    return _backend
+
+def set_backend(backend: Backend) -> Backend:
+    """Swap the backend used by run_step/arun_step; returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
@@ -1,39 +1,17 @@
-import os, json
-from typing import Tuple, Dict, Any, List
-from jsonschema import validate, ValidationError
-from openai import OpenAI
+import json, threading, time
+from typing import Tuple, Dict, Any, List, Callable
 
 from . import schemas
-from .config import MODEL, TEMPERATURE, RESPONSE_FORMAT
-
-# Load environment variables from config.env file if it exists
-def load_env_file():
-    # Try multiple possible locations for the config file
-    possible_paths = [
-        os.path.join(os.path.dirname(__file__), '..', '..', 'config.env'),
-        os.path.join(os.path.dirname(__file__), '..', '..', '.env'),
-        os.path.join(os.getcwd(), 'config.env'),
-        os.path.join(os.getcwd(), '.env')
-    ]
-    
-    for env_path in possible_paths:
-        if os.path.exists(env_path):
-            try:
-                with open(env_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            os.environ[key.strip()] = value.strip()
-                print(f"✅ Loaded environment variables from: {env_path}")
-                return
-            except Exception as e:
-                print(f"❌ Error loading {env_path}: {e}")
-    
-    print("ℹ️  No config.env file found. Set OPENAI_API_KEY environment variable manually.")
-
-# Load config file on import
-load_env_file()
+from .backends import get_backend, get_client
+from .cache import ResponseCache, cache_key
+from .streaming import JsonFieldStream
+from .validation import compile_schema, jsonschema_validator
+from .repair import repair_response, record_repairs
+from .telemetry import CallMetrics, classify_validation_error, emit
+from .config import (
+    MODEL, TEMPERATURE, RESPONSE_FORMAT,
+    CACHE_ENABLED, CACHE_PATH, CACHE_TTL_SECONDS, CACHE_MAX_BYTES, CACHE_MEMORY_ENTRIES,
+)
 
 SYSTEM_PROMPT = """
 You are Mentat, a stepwise strategy workbench copilot.
@@ -77,7 +55,7 @@ For Step 1 (clarification):
 - If you lack data, show it under 'assumption_gaps' as an array of strings (not an object)
 - Return assumption_gaps as: ["gap 1", "gap 2", "gap 3"] not as an object
 - In the "initial_response" field, provide an acknowledgment that shows confidence in understanding the prompt, asks the user to contemplate the analysis below, and mentions clarification questions if they exist. Example: "I've analyzed your strategic situation and have what I need to proceed. Please review the summary and strategic categorization below, and consider any clarification questions I've included to help refine our focus."
-- IMPORTANT: If conversation_history is provided, this is a clarification round. Provide a dynamic response that acknowledges the new information and indicates whether Step 1 is complete or needs more clarification. Examples: "Thank you for that clarification, I now have what I need to proceed" or "That helps, but I still need clarification on [specific field]" or "Perfect, that clarifies the strategic focus completely."
+- IMPORTANT: If the request has "clarification_round": true, the earlier turns precede it as messages and this is a clarification round. Provide a dynamic response that acknowledges the new information and indicates whether Step 1 is complete or needs more clarification. Examples: "Thank you for that clarification, I now have what I need to proceed" or "That helps, but I still need clarification on [specific field]" or "Perfect, that clarifies the strategic focus completely."
 - For clarification rounds, the "brief_summary" should summarize the updated strategic understanding based on the user's clarification input, incorporating any new information provided.
 """
 
@@ -91,17 +69,69 @@ SCHEMA_BY_STEP = {
 def enforce_fields_only(data: Dict[str, Any], allowed_fields: List[str]) -> Dict[str, Any]:
     return {k: v for k, v in data.items() if k in allowed_fields}
 
+# Validators are compiled once per step schema and reused for every response
+_validators: Dict[str, Callable[[Any], List[str]]] = {}
+
+def _validator_for(step: str) -> Callable[[Any], List[str]]:
+    validator = _validators.get(step)
+    if validator is None:
+        schema = SCHEMA_BY_STEP[step]
+        try:
+            validator = compile_schema(schema)
+        except ValueError:
+            compiled = jsonschema_validator(schema)
+            validator = lambda payload: [e.message for e in compiled.iter_errors(payload)]
+        _validators[step] = validator
+    return validator
+
+def validation_errors(step: str, payload: Dict[str, Any]) -> List[str]:
+    return _validator_for(step)(payload)
+
 def validate_response(step: str, payload: Dict[str, Any]) -> Tuple[bool, str | None]:
-    schema = SCHEMA_BY_STEP[step]
+    errors = validation_errors(step, payload)
+    if errors:
+        return False, "; ".join(errors)
+    return True, None
+
+def validate_or_repair(step: str, payload: Dict[str, Any], metrics: CallMetrics | None = None) -> Tuple[Dict[str, Any], str | None]:
+    """Validate, and on failure try the local schema-driven repairs before giving up."""
+    started = time.perf_counter()
     try:
-        validate(payload, schema)
-        return True, None
-    except ValidationError as e:
-        return False, str(e)
+        ok, err = validate_response(step, payload)
+        if ok:
+            return payload, None
+        if metrics is not None:
+            metrics.validation_error = classify_validation_error(err)
+        repaired, repairs = repair_response(SCHEMA_BY_STEP[step], payload)
+        if not repairs:
+            return payload, err
+        if metrics is not None:
+            metrics.repairs += len(repairs)
+        ok, repaired_err = validate_response(step, repaired)
+        record_repairs(step, repairs, avoided_retry=ok)
+        return (repaired, None) if ok else (payload, repaired_err)
+    finally:
+        if metrics is not None:
+            metrics.validate_ms += (time.perf_counter() - started) * 1000
 
-def _call_openai(envelope: Dict[str, Any], model: str = MODEL, temperature: float = TEMPERATURE) -> Dict[str, Any]:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
+def warm_up(connections: int = 1) -> None:
+    """Open keep-alive connections (TCP + TLS) before the first model call."""
+    client = get_client().with_options(max_retries=0)
+
+    def ping():
+        try:
+            client.models.list()
+        except Exception:
+            # Any response (even 401) leaves a warm connection in the pool
+            pass
+
+    threads = [threading.Thread(target=ping, daemon=True) for _ in range(max(1, connections))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def _build_messages(envelope: Dict[str, Any]) -> List[Dict[str, Any]]:
     # Build messages with conversation history if provided
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
     
@@ -110,37 +140,130 @@ def _call_openai(envelope: Dict[str, Any], model: str = MODEL, temperature: floa
     if conversation_history:
         messages.extend(conversation_history)
     
-    # Add current envelope as user message
-    messages.append({"role": "user", "content": json.dumps(envelope)})
-    
-    resp = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        response_format=RESPONSE_FORMAT
-    )
-    content = resp.choices[0].message.content
-    return json.loads(content)
-
-def run_step(envelope: Dict[str, Any]) -> Dict[str, Any]:
-    step = envelope["step"]
-    fields = envelope.get("fields", [])
-    raw = _call_openai(envelope)
-    clean = enforce_fields_only(raw, fields)
-    ok, err = validate_response(step, clean)
-    if ok:
-        return clean
+    # Add current envelope as user message; history is already sent as messages above, so only flag it
+    payload = {k: v for k, v in envelope.items() if k != "conversation_history"}
+    if conversation_history:
+        payload["clarification_round"] = True
+    messages.append({"role": "user", "content": json.dumps(payload)})
+    return messages
 
-    retry_env = {
+def _retry_envelope(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         **envelope,
         "constraints": {
             **envelope.get("constraints", {}),
             "do": ["Return JSON that exactly matches the step schema and the 'fields' keys only."]
         }
     }
-    raw_retry = _call_openai(retry_env, temperature=0.0)
-    clean_retry = enforce_fields_only(raw_retry, fields)
-    ok2, err2 = validate_response(step, clean_retry)
-    if not ok2:
-        raise ValueError(f"Model response invalid: {err2}")
-    return clean_retry
+
+def _parse_content(content: str, metrics: CallMetrics | None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        return json.loads(content)
+    finally:
+        if metrics is not None:
+            metrics.parse_ms += (time.perf_counter() - started) * 1000
+
+def _call_openai(envelope: Dict[str, Any], model: str = MODEL, temperature: float = TEMPERATURE, metrics: CallMetrics | None = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    completion = get_backend().complete(_build_messages(envelope), model, temperature, RESPONSE_FORMAT)
+    if metrics is not None:
+        metrics.network_ms += (time.perf_counter() - started) * 1000
+        metrics.record_usage(completion.usage)
+    return _parse_content(completion.content, metrics)
+
+def _call_openai_stream(envelope: Dict[str, Any], on_field: Callable[[str, Any], None], model: str = MODEL, temperature: float = TEMPERATURE, metrics: CallMetrics | None = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    fields = envelope.get("fields", [])
+    parser = JsonFieldStream()
+    for delta, usage in get_backend().stream(_build_messages(envelope), model, temperature, RESPONSE_FORMAT):
+        if usage is not None and metrics is not None:
+            metrics.record_usage(usage)
+        if not delta:
+            continue
+        for name, value in parser.feed(delta):
+            if name in fields:
+                on_field(name, value)
+    if metrics is not None:
+        # Includes time spent in on_field callbacks and incremental parsing
+        metrics.network_ms += (time.perf_counter() - started) * 1000
+    return _parse_content(parser.text, metrics)
+
+_cache: ResponseCache | None = None
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(
+            path=CACHE_PATH,
+            ttl_seconds=CACHE_TTL_SECONDS,
+            max_bytes=CACHE_MAX_BYTES,
+            memory_entries=CACHE_MEMORY_ENTRIES,
+        )
+    return _cache
+
+def step_cache_key(envelope: Dict[str, Any]) -> str:
+    return cache_key(envelope, MODEL, TEMPERATURE, schemas.SCHEMA_VERSION, SYSTEM_PROMPT)
+
+def run_step(
+    envelope: Dict[str, Any],
+    use_cache: bool = CACHE_ENABLED,
+    on_field: Callable[[str, Any], None] | None = None,
+) -> Dict[str, Any]:
+    """Run one envelope through the model.
+
+    With on_field set the response is streamed and on_field(name, value) is
+    called as each requested field completes; the returned payload is still
+    schema-validated as a whole.
+    """
+    metrics = CallMetrics(step=envelope["step"], model=MODEL, streamed=on_field is not None)
+    started = time.perf_counter()
+    try:
+        if not use_cache:
+            return _run_step_uncached(envelope, on_field, metrics)
+
+        cache = get_cache()
+        key = step_cache_key(envelope)
+        hit = cache.get(key)
+        if hit is not None:
+            metrics.cache = "hit"
+            if on_field:
+                for name, value in hit.items():
+                    on_field(name, value)
+            return hit
+        metrics.cache = "miss"
+        result = _run_step_uncached(envelope, on_field, metrics)
+        cache.put(key, result)
+        return result
+    except Exception as e:
+        metrics.error = type(e).__name__
+        raise
+    finally:
+        metrics.total_ms = (time.perf_counter() - started) * 1000
+        emit(metrics)
+
+def _run_step_uncached(envelope: Dict[str, Any], on_field: Callable[[str, Any], None] | None = None, metrics: CallMetrics | None = None) -> Dict[str, Any]:
+    step = envelope["step"]
+    fields = envelope.get("fields", [])
+    streamed: Dict[str, Any] = {}
+    if on_field:
+        def stream_field(name: str, value: Any) -> None:
+            streamed[name] = value
+            on_field(name, value)
+        raw = _call_openai_stream(envelope, stream_field, metrics=metrics)
+    else:
+        raw = _call_openai(envelope, metrics=metrics)
+    result, err = validate_or_repair(step, enforce_fields_only(raw, fields), metrics)
+    if err is not None:
+        if metrics is not None:
+            metrics.retries += 1
+        raw_retry = _call_openai(_retry_envelope(envelope), temperature=0.0, metrics=metrics)
+        result, err = validate_or_repair(step, enforce_fields_only(raw_retry, fields), metrics)
+        if err is not None:
+            raise ValueError(f"Model response invalid: {err}")
+    if on_field:
+        # Repairs and the non-streamed retry replace values the caller already saw; send the final ones
+        for name, value in result.items():
+            if name not in streamed or streamed[name] != value:
+                on_field(name, value)
+    return result
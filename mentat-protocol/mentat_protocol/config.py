@@ -1,3 +1,26 @@
+import os
+
 MODEL = "gpt-4o-mini"
 TEMPERATURE = 1.0
 RESPONSE_FORMAT = {"type": "json_object"}
+
+# Response cache (in-process LRU + on-disk SQLite store)
+CACHE_ENABLED = os.getenv("MENTAT_CACHE", "1") != "0"
+CACHE_PATH = os.getenv("MENTAT_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "mentat_protocol", "responses.sqlite3"))
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MEMORY_ENTRIES = 256
+
+# Shared HTTP client pool used for every model call
+HTTP_MAX_CONNECTIONS = int(os.getenv("MENTAT_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MENTAT_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = 120.0
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_TIMEOUT = 120.0
+HTTP_WARM_UP = os.getenv("MENTAT_WARM_UP", "1") != "0"
+
+# Approximate token budget for conversation_history sent with clarification rounds
+HISTORY_TOKEN_BUDGET = int(os.getenv("MENTAT_HISTORY_TOKEN_BUDGET", "1500"))
+
+# Per-call telemetry: set to a file path to append one JSON line per run_step call
+TELEMETRY_JSONL_PATH = os.getenv("MENTAT_TELEMETRY_JSONL")
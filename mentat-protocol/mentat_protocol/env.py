@@ -0,0 +1,44 @@
+import logging, os
+from typing import List
+
+logger = logging.getLogger("mentat_protocol")
+
+_loaded: str | None = None
+_attempted = False
+
+def load_env(extra_dirs: List[str] | None = None) -> str | None:
+    """Load KEY=VALUE lines from the first config.env/.env found, once per process.
+
+    Searches extra_dirs, then the repository root, then the working directory.
+    Call it before importing mentat_protocol.config so settings such as
+    MENTAT_CACHE_PATH take effect. Returns the file that was loaded, if any.
+    """
+    global _loaded, _attempted
+    if _attempted:
+        return _loaded
+    _attempted = True
+
+    dirs = list(extra_dirs or []) + [
+        os.path.join(os.path.dirname(__file__), '..', '..'),
+        os.getcwd(),
+    ]
+    for d in dirs:
+        for name in ('config.env', '.env'):
+            env_path = os.path.join(d, name)
+            if not os.path.exists(env_path):
+                continue
+            try:
+                with open(env_path, 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith('#') and '=' in line:
+                            key, value = line.split('=', 1)
+                            os.environ[key.strip()] = value.strip()
+                logger.info("Loaded environment variables from: %s", env_path)
+                _loaded = env_path
+                return _loaded
+            except Exception as e:
+                logger.warning("Error loading %s: %s", env_path, e)
+
+    logger.info("No config.env file found. Set OPENAI_API_KEY environment variable manually.")
+    return None
@@ -0,0 +1,47 @@
+import json
+from typing import Any, Dict, List
+
+from .config import HISTORY_TOKEN_BUDGET
+
+STATE_FIELDS = ["brief_summary", "focus_area", "purpose", "industry", "geography", "time_horizon", "decision_outcomes", "clarifying_questions"]
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; close enough for budgeting
+    return len(text) // 4 + 1
+
+def compact_history(messages: List[Dict[str, Any]], token_budget: int = HISTORY_TOKEN_BUDGET) -> List[Dict[str, str]]:
+    """Encode chat messages as a bounded conversation_history.
+
+    Keeps only role/content, drops anything before the user's first message
+    (welcome text), replaces older turns with the latest structured Step 1
+    state, and fills the remaining budget with the most recent turns.
+    """
+    turns = [
+        {"role": m["role"], "content": m["content"]}
+        for m in messages
+        if m.get("role") in ("user", "assistant") and m.get("content")
+    ]
+    first_user = next((i for i, m in enumerate(turns) if m["role"] == "user"), None)
+    if first_user is None:
+        return []
+
+    prompt, recent_pool = turns[first_user], turns[first_user + 1:]
+    budget_chars = token_budget * 4
+    if len(prompt["content"]) > budget_chars // 2:
+        prompt = {"role": "user", "content": prompt["content"][:budget_chars // 2]}
+
+    state = next((m["full_response"] for m in reversed(messages) if m.get("full_response")), None)
+    tail: List[Dict[str, str]] = []
+    if state:
+        snapshot = {k: state[k] for k in STATE_FIELDS if state.get(k)}
+        tail.append({"role": "assistant", "content": "Current Step 1 state: " + json.dumps(snapshot, ensure_ascii=False)})
+
+    used = estimate_tokens(prompt["content"]) + sum(estimate_tokens(m["content"]) for m in tail)
+    recent: List[Dict[str, str]] = []
+    for m in reversed(recent_pool):
+        cost = estimate_tokens(m["content"])
+        if used + cost > token_budget:
+            break
+        recent.append(m)
+        used += cost
+    return [prompt] + recent[::-1] + tail
@@ -0,0 +1,202 @@
+"""
+Local stand-in for the chat-completions API, for offline benchmarking and load tests.
+
+  python -m mentat_protocol.mock_server --port 8765 --latency lognormal:400:0.5 --error-429 0.05
+  OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock streamlit run app.py
+
+Responses are schema-valid payloads for the envelope's step (or a recorded
+JSONL file from RecordingBackend via --replay). Latency, 429s, timeouts,
+malformed JSON and SSE streaming are configurable.
+"""
+
+import argparse, json, math, random, threading, time, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+
+from .backends import ReplayBackend, ReplayMiss
+from .client import SCHEMA_BY_STEP
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """"fixed:MS", "uniform:LO_MS:HI_MS" or "lognormal:MEDIAN_MS:SIGMA" → sampler returning seconds."""
+    kind, *args = spec.split(":")
+    nums = [float(a) for a in args]
+    if kind == "fixed":
+        return lambda: nums[0] / 1000.0
+    if kind == "uniform":
+        return lambda: random.uniform(nums[0], nums[1]) / 1000.0
+    if kind == "lognormal":
+        mu = math.log(nums[0] / 1000.0)
+        return lambda: random.lognormvariate(mu, nums[1])
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+def example_for(schema: Dict[str, Any], name: str, envelope: Dict[str, Any]) -> Any:
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][-1]
+    if kind == "string":
+        return f"Mock {name.replace('_', ' ')}"[:schema.get("maxLength", 200)]
+    if kind == "boolean":
+        return True
+    if kind == "array":
+        count = min(3, schema.get("maxItems", 3))
+        if name == "recommended_assessments":
+            # Canonical entries are plain labels or {"id", "label"} catalog items
+            items = [a for group in (envelope.get("canonical") or {}).values() for a in group][:count]
+            items = [a if isinstance(a, dict) else {"id": f"a{i}", "label": a} for i, a in enumerate(items)]
+            return [
+                {"id": a["id"], "label": a["label"], "reason": "Mock reason", "priority": "high"}
+                for a in items or [{"id": f"a{i}", "label": f"Assessment {i}"} for i in range(count)]
+            ]
+        return [example_for(schema.get("items", {}), f"{name} {i + 1}", envelope) for i in range(count)]
+    if kind == "object":
+        props = schema.get("properties", {})
+        if isinstance(schema.get("additionalProperties"), dict):
+            keys = envelope.get("selected_assessments") or ["Mock assessment"]
+            return {k: example_for(schema["additionalProperties"], k, envelope) for k in keys}
+        wanted = set(schema.get("required", [])) | (set(envelope.get("fields", [])) if name == "$" else set())
+        return {k: example_for(props[k], k, envelope) for k in props if k in wanted}
+    return None
+
+class MockConfig:
+    def __init__(self, latency: str = "fixed:0", error_429: float = 0.0, timeout: float = 0.0,
+                 malformed: float = 0.0, timeout_seconds: float = 30.0, chunk_chars: int = 16,
+                 chunk_delay_ms: float = 0.0, replay: str | None = None):
+        self.sample_latency = parse_latency(latency)
+        self.error_429 = error_429
+        self.timeout = timeout
+        self.malformed = malformed
+        self.timeout_seconds = timeout_seconds
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay_ms / 1000.0
+        self.replay = ReplayBackend(replay, strict=False) if replay else None
+
+    def content_for(self, request: Dict[str, Any]) -> str:
+        messages = request["messages"]
+        if self.replay is not None:
+            try:
+                return self.replay.complete(messages, request["model"], request.get("temperature", 1.0), request.get("response_format")).content
+            except ReplayMiss:
+                pass
+        envelope = json.loads(messages[-1]["content"])
+        schema = SCHEMA_BY_STEP[envelope["step"]]
+        return json.dumps(example_for(schema, "$", envelope))
+
+def make_handler(config: MockConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; without this, delayed ACKs add ~40 ms per call
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: Dict[str, Any], headers: List[Tuple[str, str]] = ()) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers:
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "created": 0, "owned_by": "mock"}]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(config.sample_latency())
+            roll = random.random()
+            if roll < config.error_429:
+                self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}}, [("Retry-After", "0")])
+                return
+            if roll < config.error_429 + config.timeout:
+                time.sleep(config.timeout_seconds)
+                return
+
+            content = config.content_for(request)
+            if random.random() < config.malformed:
+                content = content[: max(1, len(content) // 2)]
+            prompt_tokens = sum(len(m.get("content") or "") for m in request["messages"]) // 4
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                     "total_tokens": prompt_tokens + len(content) // 4}
+            completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+
+            if request.get("stream"):
+                self._stream(completion_id, request["model"], content, usage, (request.get("stream_options") or {}).get("include_usage"))
+                return
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": usage,
+            })
+
+        def _stream(self, completion_id: str, model: str, content: str, usage: Dict[str, int], include_usage: bool) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def event(payload: str) -> None:
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def chunk(delta: Dict[str, Any], finish: str | None = None, with_usage: Dict[str, int] | None = None) -> str:
+                return json.dumps({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if delta is not None else [],
+                    "usage": with_usage,
+                })
+
+            event(chunk({"role": "assistant", "content": ""}))
+            for i in range(0, len(content), config.chunk_chars):
+                if config.chunk_delay:
+                    time.sleep(config.chunk_delay)
+                event(chunk({"content": content[i:i + config.chunk_chars]}))
+            event(chunk({}, finish="stop"))
+            if include_usage:
+                event(chunk(None, with_usage=usage))
+            event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the server on a daemon thread; returns (server, base_url). Use server.shutdown() to stop."""
+    server = ThreadingHTTPServer((host, port), make_handler(MockConfig(**config)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Mock chat-completions server for Mentat benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN_MS:SIGMA")
+    parser.add_argument("--error-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--timeout", type=float, default=0.0, help="fraction of requests that hang for --timeout-seconds")
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--malformed", type=float, default=0.0, help="fraction of responses with truncated JSON")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="characters per streamed chunk")
+    parser.add_argument("--chunk-delay-ms", type=float, default=0.0)
+    parser.add_argument("--replay", help="JSONL recorded by RecordingBackend to serve instead of generated payloads")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(MockConfig(
+        latency=args.latency, error_429=args.error_429, timeout=args.timeout, malformed=args.malformed,
+        timeout_seconds=args.timeout_seconds, chunk_chars=args.chunk_chars,
+        chunk_delay_ms=args.chunk_delay_ms, replay=args.replay,
+    )))
+    print(f"Mock chat-completions server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
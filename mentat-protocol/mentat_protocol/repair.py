@@ -0,0 +1,82 @@
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger("mentat_protocol")
+
+# Counts of repairs that fired, plus how often a local repair made the model retry unnecessary
+repair_stats: Counter = Counter()
+
+def repair_response(schema: Dict[str, Any], payload: Any) -> Tuple[Any, List[str]]:
+    """Deterministically fix mechanical schema violations.
+
+    Returns the repaired payload and the list of repairs applied, as
+    "<kind> at <path>" strings. Structural failures such as missing required
+    fields are left alone for the model retry to handle.
+    """
+    repairs: List[str] = []
+    return _repair(schema, payload, "$", repairs), repairs
+
+def record_repairs(step: str, repairs: List[str], avoided_retry: bool) -> None:
+    for r in repairs:
+        repair_stats[r.split(" at ", 1)[0]] += 1
+    repair_stats["avoided_retry" if avoided_retry else "retry_after_repair"] += 1
+    logger.info("%s: %d local repair(s) %s: %s", step, len(repairs),
+                "avoided the model retry" if avoided_retry else "were not enough", ", ".join(repairs))
+
+def _repair(schema: Dict[str, Any], value: Any, path: str, repairs: List[str]) -> Any:
+    kind = schema.get("type")
+
+    if kind == "array":
+        if isinstance(value, dict):
+            items = list(value.values())
+            if schema.get("items", {}).get("type") == "string" and not all(isinstance(v, str) for v in items):
+                items = [f"{k}: {v}" for k, v in value.items()]
+            value = items
+            repairs.append(f"object_to_array at {path}")
+        elif isinstance(value, str) and schema.get("items", {}).get("type") == "string":
+            value = [value]
+            repairs.append(f"string_to_array at {path}")
+        if isinstance(value, list):
+            if "items" in schema:
+                value = [_repair(schema["items"], v, f"{path}[{i}]", repairs) for i, v in enumerate(value)]
+            max_items = schema.get("maxItems")
+            if max_items is not None and len(value) > max_items:
+                value = value[:max_items]
+                repairs.append(f"maxItems at {path}")
+        return value
+
+    if kind == "object" and isinstance(value, dict):
+        props = schema.get("properties", {})
+        extra = schema.get("additionalProperties", True)
+        repaired = {}
+        for name, v in value.items():
+            if name in props:
+                repaired[name] = _repair(props[name], v, f"{path}.{name}", repairs)
+            elif extra is False:
+                repairs.append(f"additional_property at {path}.{name}")
+            elif isinstance(extra, dict):
+                repaired[name] = _repair(extra, v, f"{path}.{name}", repairs)
+            else:
+                repaired[name] = v
+        return repaired
+
+    if kind == "boolean" and isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        repairs.append(f"string_to_boolean at {path}")
+        return value.strip().lower() == "true"
+
+    if kind == "string" and isinstance(value, str):
+        enum = schema.get("enum")
+        if enum is not None and value not in enum:
+            by_lower = {e.lower(): e for e in enum}
+            match = by_lower.get(value.strip().lower())
+            if match is not None:
+                repairs.append(f"enum_case at {path}")
+                value = match
+        max_len = schema.get("maxLength")
+        if max_len is not None and len(value) > max_len:
+            value = value[:max_len - 1].rstrip() + "…"
+            repairs.append(f"maxLength at {path}")
+        return value
+
+    return value
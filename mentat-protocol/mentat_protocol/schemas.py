@@ -1,3 +1,6 @@
+# Bump whenever a schema below changes so cached responses are not reused across versions
+SCHEMA_VERSION = "1"
+
 STEP1 = {
     "type": "object",
     "required": ["brief_summary", "assumption_gaps", "clarifying_questions", "defer_to_next_step_signal", "initial_response"],
@@ -0,0 +1,66 @@
+import json
+from typing import Any, List, Tuple
+
+class JsonFieldStream:
+    """Incremental scanner for a streamed top-level JSON object.
+
+    feed() accepts raw token text and returns the (key, value) pairs whose
+    values finished in that chunk, so callers can render fields while the
+    rest of the object is still being generated.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._key_start: int | None = None
+        self._key: str | None = None
+        self._value_start: int | None = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        done: List[Tuple[str, Any]] = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_str = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if c == '"':
+                self._in_str = True
+                # A string at the top level with no pending value is the next key
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif c in "{[":
+                self._depth += 1
+            elif c == ":" and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif c in ",}]" and self._depth == 1:
+                self._finish_field(text[self._value_start:i] if self._value_start is not None else None, done)
+                if c != ",":
+                    self._depth -= 1
+            elif c in "}]":
+                self._depth -= 1
+        self._pos = len(text)
+        return done
+
+    def _finish_field(self, raw: str | None, done: List[Tuple[str, Any]]) -> None:
+        if self._key is not None and raw is not None:
+            try:
+                done.append((self._key, json.loads(raw)))
+            except json.JSONDecodeError:
+                # Leave malformed fields to final parsing and schema validation
+                pass
+        self._key = None
+        self._value_start = None
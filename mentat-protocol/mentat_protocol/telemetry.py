@@ -0,0 +1,154 @@
+import json, logging, os, threading, time
+from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Protocol, Tuple
+
+from .config import TELEMETRY_JSONL_PATH
+
+logger = logging.getLogger("mentat_protocol")
+
+@dataclass
+class CallMetrics:
+    step: str
+    model: str
+    cache: str = "off"  # "hit", "miss" or "off"
+    streamed: bool = False
+    network_ms: float = 0.0
+    parse_ms: float = 0.0
+    validate_ms: float = 0.0
+    total_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    retries: int = 0
+    repairs: int = 0
+    validation_error: str | None = None
+    error: str | None = None
+    timestamp: float = field(default_factory=time.time)
+
+    def record_usage(self, usage: Dict[str, int] | None) -> None:
+        if not usage:
+            return
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+        self.cached_tokens += usage.get("cached_tokens", 0)
+
+def classify_validation_error(err: str) -> str:
+    for needle, name in [
+        ("is a required property", "required"),
+        ("is not of type", "type"),
+        ("additional property", "additionalProperties"),
+        ("is longer than", "maxLength"),
+        ("has more than", "maxItems"),
+        ("is not one of", "enum"),
+    ]:
+        if needle in err:
+            return name
+    return "other"
+
+class MetricsSink(Protocol):
+    def emit(self, metrics: CallMetrics) -> None: ...
+
+class JsonlSink:
+    """Appends one JSON object per call to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def emit(self, metrics: CallMetrics) -> None:
+        line = json.dumps(asdict(metrics), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+class PrometheusSink:
+    """Aggregates calls into counters and histograms; render() returns Prometheus text format."""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, prefix: str = "mentat"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+
+    def _inc(self, name: str, labels: Dict[str, str], value: float = 1.0) -> None:
+        self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def _observe(self, labels: Dict[str, str], seconds: float) -> None:
+        key = tuple(sorted(labels.items()))
+        # Per-bucket counts followed by running sum and count
+        h = self._histograms.setdefault(key, [0.0] * (len(self.BUCKETS) + 2))
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+    def emit(self, metrics: CallMetrics) -> None:
+        base = {"step": metrics.step, "model": metrics.model}
+        with self._lock:
+            self._inc("calls_total", {**base, "cache": metrics.cache})
+            self._inc("tokens_total", {**base, "kind": "prompt"}, metrics.prompt_tokens)
+            self._inc("tokens_total", {**base, "kind": "completion"}, metrics.completion_tokens)
+            self._inc("tokens_total", {**base, "kind": "cached"}, metrics.cached_tokens)
+            self._inc("retries_total", base, metrics.retries)
+            self._inc("repairs_total", base, metrics.repairs)
+            if metrics.validation_error:
+                self._inc("validation_failures_total", {**base, "error_class": metrics.validation_error})
+            if metrics.error:
+                self._inc("errors_total", {**base, "error": metrics.error})
+            for phase in ("network", "parse", "validate", "total"):
+                self._observe({**base, "phase": phase}, getattr(metrics, f"{phase}_ms") / 1000.0)
+
+    def render(self) -> str:
+        def fmt(labels) -> str:
+            return ",".join(f'{k}="{v}"' for k, v in labels)
+
+        lines: List[str] = []
+        with self._lock:
+            seen = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {self.prefix}_{name} counter")
+                    seen.add(name)
+                lines.append(f"{self.prefix}_{name}{{{fmt(labels)}}} {value:g}")
+
+            hist = f"{self.prefix}_call_duration_seconds"
+            if self._histograms:
+                lines.append(f"# TYPE {hist} histogram")
+            for labels, h in sorted(self._histograms.items()):
+                for bound, count in zip(self.BUCKETS, h):
+                    lines.append(f'{hist}_bucket{{{fmt(labels + (("le", f"{bound:g}"),))}}} {count:g}')
+                lines.append(f'{hist}_bucket{{{fmt(labels + (("le", "+Inf"),))}}} {h[-1]:g}')
+                lines.append(f"{hist}_sum{{{fmt(labels)}}} {h[-2]:g}")
+                lines.append(f"{hist}_count{{{fmt(labels)}}} {h[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+_sinks: List[MetricsSink] = []
+
+def add_sink(sink: MetricsSink) -> MetricsSink:
+    _sinks.append(sink)
+    return sink
+
+def remove_sink(sink: MetricsSink) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+def emit(metrics: CallMetrics) -> None:
+    for sink in list(_sinks):
+        try:
+            sink.emit(metrics)
+        except Exception:
+            # Telemetry must never break a model call
+            logger.exception("metrics sink %r failed", sink)
+
+if TELEMETRY_JSONL_PATH:
+    add_sink(JsonlSink(TELEMETRY_JSONL_PATH))
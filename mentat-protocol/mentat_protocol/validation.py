@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, List
+
+# Keywords the step schemas use; anything else falls back to a compiled jsonschema validator
+FAST_KEYWORDS = {"type", "required", "properties", "additionalProperties", "maxLength", "maxItems", "items", "enum"}
+
+TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+Check = Callable[[Any, str, List[str]], None]
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """Compile a schema into a specialized validator that returns every violation.
+
+    Raises ValueError if the schema uses keywords outside FAST_KEYWORDS.
+    """
+    check = _compile(schema)
+
+    def validate(instance: Any) -> List[str]:
+        errors: List[str] = []
+        check(instance, "$", errors)
+        return errors
+
+    return validate
+
+def jsonschema_validator(schema: Dict[str, Any]):
+    # Only needed for schemas the fast path can't compile, so keep jsonschema off the import path
+    from jsonschema.validators import validator_for
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+def _compile(schema: Dict[str, Any]) -> Check:
+    unknown = set(schema) - FAST_KEYWORDS
+    if unknown:
+        raise ValueError(f"unsupported schema keywords: {sorted(unknown)}")
+
+    checks: List[Check] = []
+
+    if "type" in schema:
+        expected = schema["type"]
+        type_ok = TYPE_CHECKS[expected]
+        checks.append(_type_check(expected, type_ok))
+    else:
+        type_ok = None
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(v, path, errors):
+            if v not in allowed:
+                errors.append(f"{path}: {v!r} is not one of {allowed}")
+        checks.append(check_enum)
+
+    if "maxLength" in schema:
+        max_len = schema["maxLength"]
+
+        def check_max_length(v, path, errors):
+            if isinstance(v, str) and len(v) > max_len:
+                errors.append(f"{path}: string is longer than {max_len} characters ({len(v)})")
+        checks.append(check_max_length)
+
+    if "maxItems" in schema:
+        max_items = schema["maxItems"]
+
+        def check_max_items(v, path, errors):
+            if isinstance(v, list) and len(v) > max_items:
+                errors.append(f"{path}: array has more than {max_items} items ({len(v)})")
+        checks.append(check_max_items)
+
+    if "items" in schema:
+        item_check = _compile(schema["items"])
+
+        def check_items(v, path, errors):
+            if isinstance(v, list):
+                for i, item in enumerate(v):
+                    item_check(item, f"{path}[{i}]", errors)
+        checks.append(check_items)
+
+    if "required" in schema:
+        required = list(schema["required"])
+
+        def check_required(v, path, errors):
+            if isinstance(v, dict):
+                for name in required:
+                    if name not in v:
+                        errors.append(f"{path}: {name!r} is a required property")
+        checks.append(check_required)
+
+    if "properties" in schema or "additionalProperties" in schema:
+        props = {name: _compile(sub) for name, sub in schema.get("properties", {}).items()}
+        extra = schema.get("additionalProperties", True)
+        extra_check = _compile(extra) if isinstance(extra, dict) else None
+
+        def check_properties(v, path, errors):
+            if not isinstance(v, dict):
+                return
+            for name, value in v.items():
+                sub = props.get(name)
+                if sub is not None:
+                    sub(value, f"{path}.{name}", errors)
+                elif extra is False:
+                    errors.append(f"{path}: additional property {name!r} is not allowed")
+                elif extra_check is not None:
+                    extra_check(value, f"{path}.{name}", errors)
+        checks.append(check_properties)
+
+    if type_ok is not None and len(checks) > 1:
+        # Skip keyword checks when the type is already wrong, like jsonschema does for typed keywords
+        type_check, rest = checks[0], checks[1:]
+
+        def check_all(v, path, errors):
+            if not type_ok(v):
+                type_check(v, path, errors)
+                return
+            for c in rest:
+                c(v, path, errors)
+        return check_all
+
+    def check_each(v, path, errors):
+        for c in checks:
+            c(v, path, errors)
+    return check_each
+
+def _type_check(expected: str, type_ok: Callable[[Any], bool]) -> Check:
+    def check_type(v, path, errors):
+        if not type_ok(v):
+            errors.append(f"{path}: {v!r} is not of type {expected!r}")
+    return check_type
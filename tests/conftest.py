@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'mentat-protocol'))
+
+# Store, priors and response cache paths are read at import, so point them at a scratch directory first
+_scratch = tempfile.mkdtemp(prefix="workbench-tests-")
+os.environ.setdefault("WORKBENCH_STORE_PATH", os.path.join(_scratch, "projects.sqlite3"))
+os.environ.setdefault("WORKBENCH_PRIORS_PATH", os.path.join(_scratch, "priors.npz"))
+os.environ.setdefault("MENTAT_CACHE", "0")
+os.environ.setdefault("MENTAT_WARM_UP", "0")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,67 @@
+"""Projects saved by the app itself (persist_project → SnapshotWriter → ProjectStore) are searchable by Step 1 fields."""
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+from core.search import document_for
+from core.store import ProjectStore
+from mentat_protocol.mock_server import start_mock_server
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROMPT = "We are a lab products distributor weighing a divestiture"
+
+@pytest.fixture(scope="module")
+def mock_model():
+    _, base_url = start_mock_server(latency="fixed:0")
+    previous = os.environ.get("OPENAI_BASE_URL")
+    os.environ["OPENAI_BASE_URL"] = base_url
+    yield base_url
+    if previous is None:
+        os.environ.pop("OPENAI_BASE_URL", None)
+    else:
+        os.environ["OPENAI_BASE_URL"] = previous
+
+def click(at: AppTest, label: str) -> None:
+    next(b for b in at.button if b.label == label).click().run()
+
+def saved_record(store: ProjectStore, project_id: str, timeout: float = 10.0):
+    # Saves happen on the autosave thread; wait for the one carrying the Step 1 fields
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = store.load(project_id)
+        if record is not None and record.story.clarifications.get("industry"):
+            return record
+        time.sleep(0.05)
+    return store.load(project_id)
+
+def test_step1_fields_are_stored_and_indexed(mock_model):
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    click(at, "Start a New Project")
+    at.text_input(key="project_name_input").input("Searchable").run()
+    click(at, "Begin Project")
+    at.text_area(key="strategic_prompt_input").input(PROMPT).run()
+    click(at, "Submit Strategic Prompt")
+    assert not at.exception
+
+    session = at.session_state["workbench"]
+    store = ProjectStore()
+    try:
+        record = saved_record(store, session.project_id)
+        assert record is not None
+        step1 = session.mentat_response
+        assert record.story.clarifications["industry"] == step1["industry"]
+        assert record.story.clarifications["decision_outcomes"] == step1["decision_outcomes"]
+        assert document_for(record.story)[1]
+
+        # A word that only appears in the Step 1 fields finds the project
+        word = step1["industry"].split()[-1]
+        assert word.lower() not in PROMPT.lower()
+        assert session.project_id in [hit.id for hit in store.search(word)]
+    finally:
+        store.close()
@@ -0,0 +1,29 @@
+"""Malformed compact rows fail with a ValueError naming the problem, not an IndexError."""
+
+import pytest
+
+from core.compact import CompactStory, loads_json
+from core.story import StrategyStory
+
+def row() -> list:
+    story = StrategyStory(prompt="Should we enter the Nordic market?")
+    story.update_clarifications("Market entry", "Decide on entry", "retail", "Nordics", "12 months", ["Go or no-go"])
+    return CompactStory.from_story(story).to_row()
+
+def test_row_round_trips():
+    story = CompactStory.from_row(row())
+    assert CompactStory.from_row(story.to_row()) == story
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda r: r[:6], "compact story row: expected a list of 8 items, got 6 items"),
+    (lambda r: r[:2] + [r[2][:5]] + r[3:], "clarifications: expected a list of 6 items, got 5 items"),
+    (lambda r: r[:3] + [r[3][:2]] + r[4:], "assessments: expected a list of 3 items, got 2 items"),
+    (lambda r: r[:3] + [{}] + r[4:], "assessments: expected a list of 3 items, got dict"),
+])
+def test_short_rows_raise_value_error(mutate, message):
+    with pytest.raises(ValueError, match=message):
+        CompactStory.from_row(mutate(row()))
+
+def test_old_dict_form_raises_value_error():
+    with pytest.raises(ValueError, match="expected a list, got dict"):
+        loads_json(b'{"prompt": "x"}')
@@ -0,0 +1,49 @@
+"""Compacted conversation_history stays within its token budget however long the clarification goes on."""
+
+import pytest
+
+from mentat_protocol import ENVELOPES
+from mentat_protocol.config import HISTORY_TOKEN_BUDGET
+from mentat_protocol.history import compact_history, estimate_tokens
+
+def step1_response(round_no: int) -> dict:
+    return {
+        "brief_summary": f"Round {round_no}: a lab products distributor weighing divestiture of its acute-care unit. " * 8,
+        "clarifying_questions": ["Which segments are in scope?", "What is the deadline?"],
+        "initial_response": "Thank you for that clarification, but I still need a bit more detail.",
+        "focus_area": "Acute-care distribution unit",
+        "purpose": "Decide whether to retain or divest",
+        "industry": "laboratory/healthcare",
+        "geography": "United States",
+        "time_horizon": "12-24 months",
+        "decision_outcomes": ["Whether to divest", "How to restructure"],
+    }
+
+def transcripts(rounds: int):
+    """The app's chat after each clarification round (welcome, prompt, then assistant/user turns)."""
+    chat = [{"role": "assistant", "content": "### Welcome to the Strategy Workbench! " * 10},
+            {"role": "user", "content": "We are a laboratory products distribution business considering options. " * 4}]
+    for r in range(1, rounds + 1):
+        response = step1_response(r)
+        chat.append({"role": "assistant", "content": response["initial_response"], "full_response": response})
+        chat.append({"role": "user", "content": f"Clarification {r}: the deadline is end of quarter {r}. " * 3})
+        yield list(chat)
+
+def tokens(history: list) -> int:
+    return sum(estimate_tokens(m["content"]) for m in history)
+
+@pytest.mark.parametrize("budget", [600, 1000])
+def test_compacted_history_is_bounded(budget):
+    verbatim = 0
+    for chat in transcripts(40):
+        assert tokens(compact_history(chat, token_budget=budget)) <= budget
+        verbatim = tokens(chat)
+    # The bound was actually exercised: uncompacted, the transcript is far past it
+    assert verbatim > 2 * budget
+
+def test_step1_envelope_history_is_bounded_by_default_budget():
+    sizes = [tokens(ENVELOPES.step1_clarify({"title": "Lab unit"}, "More detail.", chat)["conversation_history"])
+             for chat in transcripts(60)]
+    assert max(sizes) <= HISTORY_TOKEN_BUDGET
+    # Compaction reached the budget (it takes ~25 rounds) and held there
+    assert sizes[-1] > 0.8 * HISTORY_TOKEN_BUDGET
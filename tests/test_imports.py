@@ -0,0 +1,36 @@
+"""Cold imports stay light: heavy dependencies load on first use, and config.env can still be applied after them."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY = {"openai", "httpx", "jsonschema", "docx", "lxml", "numpy", "msgpack"}
+
+def loaded_after(stmt: str) -> set:
+    """Modules in sys.modules after `stmt`, in a fresh interpreter."""
+    code = f"import sys; sys.path.append('mentat-protocol'); {stmt}; print('\\n'.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(proc.stdout.split())
+
+@pytest.mark.parametrize("stmt", [
+    "import mentat_protocol",
+    "from mentat_protocol import run_step, ENVELOPES, load_env",
+    "import core.export",
+    "import core.story, core.canonical, core.session",
+])
+def test_no_heavy_imports(stmt):
+    heavy = sorted(m for m in loaded_after(stmt) if m.split(".")[0] in HEAVY)
+    assert not heavy, f"{stmt} imported {heavy}"
+
+@pytest.mark.parametrize("stmt", [
+    "import mentat_protocol",
+    "from mentat_protocol import ENVELOPES, load_env",
+    "import core.story, core.canonical, core.export",
+])
+def test_settings_not_read_before_load_env(stmt):
+    # MENTAT_* settings are read when mentat_protocol.config is imported; entry points call load_env() first
+    assert "mentat_protocol.config" not in loaded_after(stmt)
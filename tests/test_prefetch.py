@@ -0,0 +1,15 @@
+"""A failed prefetch falls back to the foreground call, but leaves its error in the log."""
+
+import logging
+
+from core.prefetch import Prefetcher
+
+def failing_run(envelope):
+    raise RuntimeError("401 invalid api key")
+
+def test_failed_prefetch_is_logged(caplog):
+    prefetcher = Prefetcher(run=failing_run, workers=1)
+    key = prefetcher.start("Should we enter the Nordic market?", {"industry": "retail"})
+    with caplog.at_level(logging.WARNING, logger="core.prefetch"):
+        assert prefetcher.step2(key, timeout=5) is None
+    assert any(r.exc_info and "401 invalid api key" in str(r.exc_info[1]) for r in caplog.records)
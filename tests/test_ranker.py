@@ -0,0 +1,34 @@
+"""Sub-assessment ranking learns from the Step 1 fields of stored projects, not just their prompts."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.canonical import CATALOG
+from core.ranker import SubAssessmentRanker
+from core.store import ProjectStore
+from core.story import StrategyStory
+
+def stored_story(prompt: str, industry: str, assessment: str, subs: list) -> StrategyStory:
+    story = StrategyStory(prompt=prompt)
+    # As the app commits a Step 1 response
+    story.update_clarifications("Coastal unit", "Decide whether to divest", industry, "Norway", "12-24 months",
+                                ["Whether to exit the segment"])
+    story.assessments["selected"] = [assessment]
+    story.sub_assessments["selected"] = {assessment: subs}
+    story.touch()
+    return story
+
+def test_enrichment_uses_stored_clarifications(tmp_path):
+    assessment = CATALOG.labels()[0]
+    store = ProjectStore(str(tmp_path / "projects.sqlite3"))
+    try:
+        store.bulk_insert((f"p{i}", "n", stored_story("Weighing options for a business unit", "aquaculture feed",
+                                                      assessment, ["Hatchery licence review"]))
+                          for i in range(3))
+        ranker = SubAssessmentRanker.from_catalog(CATALOG, store.iter_stories())
+    finally:
+        store.close()
+    # "aquaculture" only ever appears in the stored industry field
+    top = ranker.rank("aquaculture", k=1)
+    assert top[0][:2] == (assessment, "Hatchery licence review")
@@ -0,0 +1,53 @@
+"""Streamed fields end on the values run_step returns, even after a local repair or the model retry."""
+
+import json
+
+import pytest
+
+from mentat_protocol import ENVELOPES
+from mentat_protocol.backends import Completion, set_backend
+from mentat_protocol.client import SCHEMA_BY_STEP, run_step
+from mentat_protocol.mock_server import example_for
+
+ENVELOPE = ENVELOPES.step1_clarify({"title": "Lab unit"}, "We are a lab products distributor.")
+VALID = example_for(SCHEMA_BY_STEP["step_1_clarify"], "step_1_clarify", ENVELOPE)
+
+class ScriptedBackend:
+    """Streams the first reply, then answers each non-streamed call with the next one."""
+
+    def __init__(self, *replies):
+        self.replies = [json.dumps(r) for r in replies]
+
+    def complete(self, messages, model, temperature, response_format):
+        return Completion(self.replies.pop(0))
+
+    def stream(self, messages, model, temperature, response_format):
+        text = self.replies.pop(0)
+        for i in range(0, len(text), 16):
+            yield text[i:i + 16], None
+
+@pytest.fixture
+def backend():
+    previous = set_backend(None)
+    yield lambda *replies: set_backend(ScriptedBackend(*replies))
+    set_backend(previous)
+
+def final_fields(envelope):
+    seen = {}
+    result = run_step(envelope, use_cache=False, on_field=lambda name, value: seen.__setitem__(name, value))
+    return seen, result
+
+def test_retry_values_replace_streamed_ones(backend):
+    invalid = {k: v for k, v in VALID.items() if k != "initial_response"}   # required: forces the retry
+    invalid["brief_summary"] = "First attempt"
+    backend(invalid, VALID)
+    seen, result = final_fields(ENVELOPE)
+    assert result == VALID
+    assert seen == result
+
+def test_repaired_values_replace_streamed_ones(backend):
+    broken = dict(VALID, assumption_gaps="one gap")   # repaired locally to ["one gap"]
+    backend(broken)
+    seen, result = final_fields(ENVELOPE)
+    assert result["assumption_gaps"] == ["one gap"]
+    assert seen == result